@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Offline Sync Benchmark
+
+Runs the real sync pipeline (build_full_state / build_incremental_state,
+save_db, save_json, save_summary) against fake_clickup_server.py and reports,
+per sync mode and space size:
+  - wall time and per-phase time
+  - HTTP requests and 429 responses
+  - peak Python heap (tracemalloc, in a second traced pass)
+  - output sizes (state file, SQLite store, summary)
+
+The fake server runs in its own process so its memory and CPU stay out of the
+numbers. Outputs go to a scratch directory; docs/ is never touched. Results
+are appended to logs/sync-bench.jsonl so later changes can be compared with a
+baseline.
+
+Modes:
+  serial        full sync, one list at a time (the original behaviour)
+  concurrent    full sync, lists and pages on --workers threads
+  team          full sync through the workspace filtered-tasks endpoint
+  incremental   delta sync after --touch tasks changed (seeded by a full sync)
+  raw           concurrent full sync keeping full task payloads (--keep-raw)
+
+Usage:
+  python3 scripts/bench_sync.py                                   # 1k tasks, all modes
+  python3 scripts/bench_sync.py --tasks 1000 10000 100000 --modes concurrent team incremental
+  python3 scripts/bench_sync.py --latency-ms 80 --rate-limit 600 --throttle 0.01
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+from fake_clickup_server import add_space_arguments
+from state_io import DEFAULT_STATE_FORMAT, STATE_FORMATS, state_path
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+LOGS_DIR = PROJECT_ROOT / "logs"
+RESULTS_FILE = LOGS_DIR / "sync-bench.jsonl"
+SERVER_SCRIPT = Path(__file__).resolve().parent / "fake_clickup_server.py"
+
+MODES = {
+    "serial": {"workers": 1, "engine": "list"},
+    "concurrent": {"engine": "list"},
+    "team": {"engine": "team"},
+    "incremental": {"engine": "list", "incremental": True},
+    "raw": {"engine": "list", "keep_raw": True},
+}
+DEFAULT_MODES = ("serial", "concurrent", "team", "incremental")
+
+
+# ── Fake server ───────────────────────────────────────────────────────────────
+
+@contextlib.contextmanager
+def fake_server(tasks: int, args: argparse.Namespace):
+    """Run fake_clickup_server.py in a subprocess; yields its base URL."""
+    cmd = [
+        sys.executable, str(SERVER_SCRIPT), "--port", "0", "--tasks", str(tasks),
+        "--folders", str(args.folders), "--lists-per-folder", str(args.lists_per_folder),
+        "--folderless", str(args.folderless), "--subtask-ratio", str(args.subtask_ratio),
+        "--seed", str(args.seed), "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms), "--rate-limit", str(args.rate_limit),
+        "--throttle", str(args.throttle),
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    try:
+        for line in proc.stdout:
+            if line.startswith("READY "):
+                yield line.split()[1]
+                break
+        else:
+            raise RuntimeError("fake_clickup_server.py exited before it was ready")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def server_stats(base_url: str) -> dict:
+    return requests.get(f"{base_url}/_fake/stats", timeout=10).json()
+
+
+def touch_tasks(base_url: str, count: int):
+    requests.post(f"{base_url}/_fake/touch", json={"count": count}, timeout=10).raise_for_status()
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+def redirect_outputs(sync, root: Path):
+    """Point the sync module's output paths at a scratch directory."""
+    sync.PROJECT_ROOT = root
+    sync.DOCS_DIR = root / "docs"
+    sync.LOGS_DIR = root / "logs"
+    sync.STATE_FILE = sync.DOCS_DIR / "clickup-project-state.json"
+    sync.SUMMARY_FILE = sync.DOCS_DIR / "clickup-daily-summary.md"
+    sync.STATE_DB = sync.DOCS_DIR / "clickup-project-state.sqlite"
+    sync.SUMMARY_CACHE_FILE = sync.DOCS_DIR / "clickup-summary-cache.json"
+    sync.CHECKPOINT_DB = sync.DOCS_DIR / "clickup-sync-checkpoint.sqlite"
+    sync.HISTORY_DB = sync.DOCS_DIR / "clickup-history.sqlite"
+    sync.ANALYTICS_FILE = sync.DOCS_DIR / "clickup-analytics.md"
+    sync.TASK_INDEX_FILE = sync.DOCS_DIR / "clickup-task-index.bin"
+
+
+def sync_args(mode: str, args: argparse.Namespace) -> argparse.Namespace:
+    """Namespace equivalent to the sync CLI flags for one mode."""
+    import sync_clickup_state as sync
+
+    parser = argparse.ArgumentParser()
+    sync.add_sync_arguments(parser)
+    ns = parser.parse_args(["--workers", str(args.workers), "--rate-limit", str(args.client_rate_limit),
+                            "--state-format", args.state_format])
+    for key, value in MODES[mode].items():
+        setattr(ns, key, value)
+    return ns
+
+
+def output_sizes(sync, fmt: str) -> dict:
+    files = {"state": state_path(sync.STATE_FILE, fmt), "db": sync.STATE_DB, "summary": sync.SUMMARY_FILE}
+    return {name: (path.stat().st_size if path.exists() else 0) for name, path in files.items()}
+
+
+def run_once(sync, ns: argparse.Namespace, traced: bool, verbose: bool) -> dict:
+    """One sync_state() call; returns wall time, metrics record and peak heap."""
+    from sync_metrics import finish_run, start_run
+
+    out = io.StringIO()
+    start_run("bench")
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(sys.stdout if verbose else out):
+            sync.sync_state(ns)
+    finally:
+        wall = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if traced else None
+        if traced:
+            tracemalloc.stop()
+        with contextlib.redirect_stdout(io.StringIO()):
+            record = finish_run(sync.LOGS_DIR)
+    return {"wall": wall, "record": record, "peak": peak}
+
+
+def bench_mode(sync, mode: str, tasks: int, base_url: str, args: argparse.Namespace) -> dict:
+    """Benchmark one mode in a fresh scratch directory."""
+    ns = sync_args(mode, args)
+    with tempfile.TemporaryDirectory(prefix=f"bench-{mode}-") as tmp:
+        redirect_outputs(sync, Path(tmp))
+        passes = []
+        for traced in (False, True) if args.memory else (False,):
+            if ns.incremental:
+                # Seed with a full sync, then change some tasks so the delta has work to do
+                seed = argparse.Namespace(**{**vars(ns), "incremental": False})
+                run_once(sync, seed, traced=False, verbose=False)
+                touch_tasks(base_url, args.touch)
+            passes.append(run_once(sync, ns, traced, args.verbose))
+        sizes = output_sizes(sync, ns.state_format)
+
+    timed = passes[0]
+    rec = timed["record"]
+    return {
+        "mode": mode,
+        "tasks": tasks,
+        "workers": ns.workers,
+        "state_format": ns.state_format,
+        "wall_seconds": round(timed["wall"], 3),
+        "phases": rec["phases"],
+        "requests": rec["requests"],
+        "rate_limited": rec["rate_limited"],
+        "backoff_seconds": rec["backoff_seconds"],
+        "bytes_received": rec["bytes_received"],
+        "peak_mb": round(passes[-1]["peak"] / 1e6, 1) if args.memory else None,
+        "output_bytes": sizes,
+    }
+
+
+def print_results(results: list[dict]):
+    print(f"\n{'mode':<12} {'tasks':>7} {'wall':>8} {'reqs':>6} {'429':>4} {'peak MB':>8} "
+          f"{'state KB':>9} {'db KB':>7} {'md KB':>6}  phases")
+    for r in results:
+        peak = f"{r['peak_mb']:.1f}" if r["peak_mb"] is not None else "-"
+        phases = " ".join(f"{k}={v:.2f}" for k, v in r["phases"].items())
+        out = r["output_bytes"]
+        print(f"{r['mode']:<12} {r['tasks']:>7} {r['wall_seconds']:>7.2f}s {r['requests']:>6} "
+              f"{r['rate_limited']:>4} {peak:>8} {out['state'] / 1024:>9.0f} {out['db'] / 1024:>7.0f} "
+              f"{out['summary'] / 1024:>6.0f}  {phases}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync modes against a synthetic ClickUp server")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000],
+                        help="Space sizes to benchmark (default: 1000)")
+    parser.add_argument("--modes", nargs="+", choices=tuple(MODES), default=list(DEFAULT_MODES))
+    parser.add_argument("--workers", type=int, default=8, help="Workers for concurrent modes (default: 8)")
+    parser.add_argument("--client-rate-limit", type=int, default=60_000,
+                        help="Client token-bucket budget per minute (default: 60000, effectively off)")
+    parser.add_argument("--state-format", choices=STATE_FORMATS, default=DEFAULT_STATE_FORMAT)
+    parser.add_argument("--touch", type=int, default=50,
+                        help="Tasks changed before an incremental run (default: 50)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="Skip the tracemalloc pass")
+    parser.add_argument("--verbose", action="store_true", help="Show the sync's own output")
+    parser.add_argument("--results", type=Path, default=RESULTS_FILE,
+                        help=f"Append JSON results here (default: {RESULTS_FILE.relative_to(PROJECT_ROOT)})")
+    add_space_arguments(parser)
+    args = parser.parse_args()
+
+    results = []
+    for tasks in args.tasks:
+        with fake_server(tasks, args) as base_url:
+            # The client reads its base URL at import, so import the sync only now
+            os.environ["CLICKUP_BASE_URL"] = base_url
+            import sync_clickup_state as sync
+            client = sync.get_client()
+            client.base_url = base_url
+            client.budget = None  # the fake server's limit isn't the real token's
+
+            for mode in args.modes:
+                print(f"⏱️  {mode} @ {tasks} tasks...", flush=True)
+                results.append(bench_mode(sync, mode, tasks, base_url, args))
+            print(f"  🧪 Server: {server_stats(base_url)}")
+
+    print_results(results)
+
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    run_at = datetime.now(timezone.utc).isoformat()
+    with open(args.results, "a") as f:
+        for r in results:
+            f.write(json.dumps({"run_at": run_at, **r}) + "\n")
+    print(f"\n📈 Results appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
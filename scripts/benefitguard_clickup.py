@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — ClickUp Command Line
+
+One entry point for the ClickUp scripts. Each subcommand's module (and its
+heavy dependencies: requests, numpy, asyncio, ...) is imported only when
+that subcommand runs, so `--help` and store queries start without loading
+the HTTP stack, and importing any of the modules makes no API calls.
+
+Subcommands forward their arguments to the underlying script, e.g.
+`benefitguard-clickup query --help` is `query_tasks.py --help`.
+
+`importtime` runs each fast-path command under `python -X importtime` and
+reports the import cost on top of bare interpreter startup; it exits
+non-zero if one of them pulls in a heavy module or exceeds the budget.
+
+Usage:
+  python3 scripts/benefitguard_clickup.py <command> [args...]
+  python3 scripts/benefitguard_clickup.py sync --workers 4 --incremental
+  python3 scripts/benefitguard_clickup.py query --due-within 7 --open
+  python3 scripts/benefitguard_clickup.py importtime [--budget-ms 50]
+
+  (ln -s "$PWD/scripts/benefitguard_clickup.py" ~/.local/bin/benefitguard-clickup)
+"""
+
+import sys
+from pathlib import Path
+
+PROG = "benefitguard-clickup"
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# name → (module or script file in scripts/, one-line help)
+COMMANDS = {
+    "sync": ("sync_clickup_state", "Sort the inbox, then fetch and save the project state"),
+    "sort": ("sort_inbox_tasks", "Classify To Sort inbox tasks and move them to their lists"),
+    "apply": ("clickup-update-apr11.py", "Apply the April 11 batch of task updates"),
+    "query": ("query_tasks", "Filter the synced task store by due date, priority, list"),
+    "analytics": ("project_analytics", "Write the velocity / cycle time / estimate report"),
+    "history": ("snapshot_history", "List, show and diff archived sync snapshots"),
+    "index": ("retrieval_index", "Search or rebuild the sorter's related-task index"),
+    "task": ("task_index", "Look up a synced task's list, folder, parent and status"),
+    "match": ("name_matcher", "Fuzzy-match a task name against the synced tasks"),
+    "spaces": ("sync_spaces", "Sync several spaces from a config in parallel processes"),
+    "budget": ("rate_budget", "Show the shared per-token rate budgets and who is waiting"),
+    "webhooks": ("clickup_webhooks", "Run or replay the webhook live mirror"),
+    "db": ("state_db", "Inspect the SQLite store or export it to a state file"),
+    "importtime": (None, "Measure subcommand startup with python -X importtime"),
+}
+
+# Commands that must start fast, and modules they must not import
+FAST_COMMANDS = (["--help"], ["query", "--help"], ["history", "--help"], ["db", "--help"])
+HEAVY_MODULES = ("requests", "urllib3", "numpy", "asyncio", "dotenv", "concurrent.futures")
+DEFAULT_BUDGET_MS = 50
+
+
+def usage() -> str:
+    width = max(len(name) for name in COMMANDS)
+    lines = [f"usage: {PROG} <command> [args...]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {help_text}" for name, (_, help_text) in COMMANDS.items()]
+    lines += ["", f"Run '{PROG} <command> --help' for a command's options."]
+    return "\n".join(lines)
+
+
+def load_module(target: str):
+    """Import a scripts/ module by name, or a hyphenated script by file name."""
+    if SCRIPTS_DIR.as_posix() not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR.as_posix())
+    if not target.endswith(".py"):
+        import importlib
+
+        return importlib.import_module(target)
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location(target[:-3].replace("-", "_"), SCRIPTS_DIR / target)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ── importtime check ──────────────────────────────────────────────────────────
+
+def import_times(argv: list[str]) -> dict[str, int]:
+    """Top-level modules imported by ``python -X importtime`` + argv → cumulative µs."""
+    import subprocess
+
+    proc = subprocess.run([sys.executable, "-X", "importtime", *argv],
+                          capture_output=True, text=True, cwd=SCRIPTS_DIR)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not name.startswith("  "):  # nested imports are indented further
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def import_check(argv: list[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=f"{PROG} importtime",
+                                     description="Measure fast-path startup with python -X importtime")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Max import time per fast command on top of interpreter startup "
+                             f"(default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--all", action="store_true",
+                        help="Also report (without failing) every other command's --help")
+    args = parser.parse_args(argv)
+
+    startup = set(import_times(["-c", "pass"]))
+    checks = list(FAST_COMMANDS)
+    if args.all:
+        checks += [[name, "--help"] for name, (target, _) in COMMANDS.items()
+                   if target and [name, "--help"] not in checks]
+
+    failed = False
+    print(f"{'command':<22} {'imports':>9}  {'heavy modules':<28} slowest")
+    for cmd in checks:
+        times = {k: v for k, v in import_times([__file__, *cmd]).items() if k not in startup}
+        total_ms = sum(times.values()) / 1000
+        heavy = [m for m in HEAVY_MODULES if any(k == m or k.startswith(m + ".") for k in times)]
+        slowest = ", ".join(f"{k} {v / 1000:.1f}" for k, v in sorted(times.items(), key=lambda kv: -kv[1])[:3])
+        fast = cmd in FAST_COMMANDS
+        bad = fast and (heavy or total_ms > args.budget_ms)
+        failed |= bool(bad)
+        icon = "❌" if bad else ("✅" if fast else "  ")
+        print(f"{icon} {' '.join(cmd):<20} {total_ms:>7.1f}ms  {', '.join(heavy) or '–':<28} {slowest}")
+    print(f"\nBudget: {args.budget_ms:.0f} ms of imports per fast command, none of {', '.join(HEAVY_MODULES)}")
+    return 1 if failed else 0
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def main(argv: list[str] | None = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"{usage()}\n\n{PROG}: unknown command {name!r}", file=sys.stderr)
+        sys.exit(2)
+
+    target = COMMANDS[name][0]
+    if target is None:
+        sys.exit(import_check(rest))
+
+    # The script's own argparse sees "benefitguard-clickup <name>" as its program name
+    sys.argv = [f"{PROG} {name}", *rest]
+    load_module(target).main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Inbox Classification Cache
+
+On-disk SQLite cache of LLM classifications for sort_inbox_tasks.py, so a
+sort rerun after a failure (LLM timeout, move error) and re-filed brain
+dumps don't pay for the same classification twice.
+
+Entries are keyed by a hash of the normalized task name and description,
+the model, the temperature and a hash of the system prompt; any change to
+the prompt (list descriptions, existing task names) misses the cache.
+Entries expire after a TTL and the least recently used ones are evicted
+beyond a size cap. Hit/miss counters go into the sort log.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS classifications (
+    cache_key TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    classification TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_classifications_last_used ON classifications(last_used);
+"""
+
+
+def normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", (text or "").strip().lower())
+
+
+def prompt_hash(system_prompt: str) -> str:
+    return hashlib.sha256(system_prompt.encode()).hexdigest()
+
+
+def cache_key(name: str, description: str, model: str, temperature: float, system_prompt_hash: str) -> str:
+    raw = json.dumps([normalize(name), normalize(description), model, temperature, system_prompt_hash])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ClassificationCache:
+    """LRU/TTL cache of classifications shared by one sort run."""
+
+    def __init__(self, path: Path, max_entries: int, ttl_seconds: float):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        cur = self.conn.execute("DELETE FROM classifications WHERE created_at < ?", (time.time() - ttl_seconds,))
+        self.stats["evicted"] += cur.rowcount
+        self.conn.commit()
+
+    def get(self, key: str) -> dict | None:
+        row = self.conn.execute("SELECT classification FROM classifications WHERE cache_key = ?",
+                                (key,)).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self.conn.execute("UPDATE classifications SET last_used = ?, hits = hits + 1 WHERE cache_key = ?",
+                          (time.time(), key))
+        self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, classification: dict):
+        """Store one classification (committed immediately so a crash keeps it)."""
+        now = time.time()
+        self.conn.execute("INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, 0, ?)",
+                          (key, now, now, json.dumps(classification, default=str)))
+        self.conn.commit()
+        self.stats["stored"] += 1
+
+    def evict(self):
+        """Drop the least recently used entries beyond max_entries."""
+        cur = self.conn.execute(
+            "DELETE FROM classifications WHERE cache_key IN ("
+            "  SELECT cache_key FROM classifications ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self.stats["evicted"] += cur.rowcount
+        self.conn.commit()
+
+    def close(self):
+        self.evict()
+        self.conn.close()
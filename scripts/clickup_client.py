@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Shared ClickUp API Client
+
+One pooled, keep-alive transport used by every ClickUp script:
+  - sync_clickup_state.py
+  - sort_inbox_tasks.py
+  - clickup-update-apr11.py
+
+Each script builds a ClickUpClient and calls get/put/post/delete (or the
+a-prefixed coroutine variants). The client owns the retry loop, connection
+pool sizing, timeouts and per-call latency records (also fed to the
+active sync_metrics run, if any).
+
+Pacing follows ClickUp's own headers rather than fixed sleeps: requests go
+out at full speed while X-RateLimit-Remaining has budget, and every caller
+waits exactly until X-RateLimit-Reset (or Retry-After on a 429) once it runs
+out. Transient 5xx responses and connection errors are retried with jittered
+backoff out of a client-wide retry budget, and a circuit breaker (fed by
+every 5xx) fails calls fast while the API keeps failing. Processes sharing an API key also draw from one
+cross-process bucket (rate_budget.py); pass priority="interactive" for
+user-facing scripts so they go ahead of background syncs.
+
+Usage:
+  from clickup_client import ClickUpClient
+  client = ClickUpClient(os.getenv("CLICKUP_API_KEY", ""))
+  data = client.get(f"/list/{list_id}/task", {"page": "0"})
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import sync_metrics
+from rate_budget import retry_after_seconds, shared_budget
+
+# requests (and asyncio for the a-prefixed calls) are imported on first use,
+# so importing this module — and every script built on it — stays cheap
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+# CLICKUP_BASE_URL points every script at another server (e.g. fake_clickup_server.py)
+BASE_URL = os.getenv("CLICKUP_BASE_URL", "https://api.clickup.com/api/v2")
+DEFAULT_TIMEOUT = (5.0, 30.0)  # (connect, read) seconds
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 5
+# Latency records kept for p95 (a long-lived client would otherwise grow without bound)
+CALL_HISTORY = 5000
+
+# ClickUp allows 100 requests per minute per token on Free/Unlimited/Business
+CLICKUP_RATE_LIMIT_PER_MIN = 100
+
+# Longest wait a rate-limit header can impose (guards against clock skew)
+MAX_RATE_LIMIT_WAIT = 65.0
+# X-RateLimit-Reset has whole-second resolution; wait this much past it
+RESET_SLACK = 1.0
+# Jittered backoff for 5xx / connection errors: uniform(0, min(cap, base * 2**attempt))
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_CAP = 20.0
+# Error retries allowed per client: a floor plus a share of all requests sent
+RETRY_BUDGET_MIN = 10
+RETRY_BUDGET_RATIO = 0.2
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+# POSTs create tasks, so only retry failures where the request surely wasn't applied
+POST_RETRY_STATUSES = frozenset({503})
+# Consecutive failures that open the circuit, and seconds before a trial call
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+
+# ── Rate limiting ─────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every caller of a client.
+
+    Refills continuously at ``rate_per_min / 60`` tokens per second and holds
+    at most ``burst`` tokens, so a pool of workers can never exceed the
+    per-minute budget no matter how many of them are waiting.
+    """
+
+    def __init__(self, rate_per_min: int = CLICKUP_RATE_LIMIT_PER_MIN, burst: int | None = None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = float(burst if burst is not None else max(1, rate_per_min // 10))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until one token is available, then consume it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_s = (1 - self.tokens) / self.rate
+            time.sleep(wait_s)
+
+
+class AdaptiveLimiter:
+    """Paces a client from ClickUp's X-RateLimit-* and Retry-After headers.
+
+    Every response updates the remaining budget and the reset time of the
+    current window. While budget remains, acquire() returns immediately
+    (requests still in flight count against it, so concurrent callers don't
+    all spend the last one); once it runs out, every caller sleeps until the
+    reset. A 429 blocks all callers for its Retry-After (or until the reset).
+    """
+
+    def __init__(self, reserve: int = 0):
+        self.reserve = reserve              # requests to leave unspent in each window
+        self.remaining: int | None = None   # None: unknown, go ahead
+        self.reset_at = 0.0                 # epoch seconds
+        self.blocked_until = 0.0            # epoch seconds, set by a 429
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def _wait(self, now: float) -> float:
+        if self.blocked_until > now:
+            return self.blocked_until - now
+        if self.remaining is not None and self.remaining - self.in_flight <= self.reserve:
+            if self.reset_at + RESET_SLACK > now:
+                return min(self.reset_at + RESET_SLACK - now, MAX_RATE_LIMIT_WAIT)
+            self.remaining = None  # window over; the next response reports the new one
+        return 0.0
+
+    def acquire(self) -> float:
+        """Block until the budget allows one request. Returns the seconds slept."""
+        slept = 0.0
+        while True:
+            with self.lock:
+                wait = self._wait(time.time())
+                if wait <= 0:
+                    self.in_flight += 1
+                    return slept
+            time.sleep(wait)
+            slept += wait
+
+    def release(self):
+        """The request acquire() admitted has finished (response or error)."""
+        with self.lock:
+            self.in_flight -= 1
+
+    def update(self, headers) -> None:
+        """Take the budget from a response's X-RateLimit-Remaining / Reset."""
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_at = float(headers["X-RateLimit-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+        with self.lock:
+            if reset_at > self.reset_at or self.remaining is None:
+                self.remaining, self.reset_at = remaining, reset_at
+            else:  # same window: responses can arrive out of order, keep the lowest count
+                self.remaining = min(self.remaining, remaining)
+
+    def rate_limited(self, headers) -> float:
+        """Handle a 429: block every caller until Retry-After or the reset. Returns the wait."""
+        now = time.time()
+        wait = retry_after_seconds(headers.get("Retry-After"))
+        if wait is None:
+            try:
+                wait = float(headers["X-RateLimit-Reset"]) + RESET_SLACK - now
+            except (KeyError, TypeError, ValueError):
+                wait = 1.0
+        wait = min(max(wait, 0.0), MAX_RATE_LIMIT_WAIT)
+        with self.lock:
+            self.remaining = 0
+            self.blocked_until = max(self.blocked_until, now + wait)
+        return wait
+
+
+class RetryBudget:
+    """Caps error retries to a share of all requests, so an outage isn't multiplied."""
+
+    def __init__(self, minimum: int = RETRY_BUDGET_MIN, ratio: float = RETRY_BUDGET_RATIO):
+        self.minimum = minimum
+        self.ratio = ratio
+        self.requests = 0
+        self.retries = 0
+        self.lock = threading.Lock()
+
+    def record_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        with self.lock:
+            if self.retries >= self.minimum + self.ratio * self.requests:
+                return False
+            self.retries += 1
+            return True
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures; one trial call after ``cooldown``."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go out."""
+        with self.lock:
+            if self.opened_at is None:
+                return
+            left = self.opened_at + self.cooldown - time.monotonic()
+            if left > 0 or self.trial:
+                raise CircuitOpenError(f"ClickUp API circuit open after {self.failures} failures"
+                                       + (f", retrying in {left:.0f}s" if left > 0 else ""))
+            self.trial = True  # half-open: let this one call through
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial or self.failures >= self.threshold:
+                if self.opened_at is None or self.trial:
+                    print(f"  🔌 ClickUp API failing ({self.failures} in a row), pausing calls for {self.cooldown:.0f}s")
+                self.opened_at = time.monotonic()
+                self.trial = False
+
+
+# ── Client ────────────────────────────────────────────────────────────────────
+
+@dataclass
+class CallRecord:
+    """Latency record for one HTTP attempt."""
+    method: str
+    path: str
+    status: int
+    seconds: float
+    bytes: int
+
+
+class ClickUpClient:
+    """Pooled ClickUp API client with header-aware pacing, retries and latency recording."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = BASE_URL,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        gzip: bool = True,
+        retries: int = DEFAULT_RETRIES,
+        limiter: TokenBucket | None = None,
+        priority: str = "background",
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.limiter = limiter  # optional fixed ceiling on top of the header-driven pacing
+        self.adaptive = AdaptiveLimiter()
+        self.budget = shared_budget(api_key, priority)  # None when disabled or keyless
+        self.retry_budget = RetryBudget()
+        self.breaker = CircuitBreaker()
+        self.calls: deque[CallRecord] = deque(maxlen=CALL_HISTORY)  # recent calls only
+        self.call_totals: dict[str, list] = {}  # method → [calls, seconds], all calls
+        self._totals_lock = threading.Lock()
+        self.pool_size = pool_size
+        self.headers = {
+            "Authorization": api_key,
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate" if gzip else "identity",
+        }
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """The pooled requests session, created on the first call."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+
+                    session = requests.Session()
+                    session.headers.update(self.headers)
+                    self._mount(session)
+                    self._session = session
+        return self._session
+
+    def resize_pool(self, pool_size: int):
+        """Mount a keep-alive adapter sized for ``pool_size`` concurrent callers."""
+        self.pool_size = pool_size
+        if self._session is not None:
+            self._mount(self._session)
+
+    def _mount(self, session):
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, self.pool_size))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    # ── Sync calls ────────────────────────────────────────────────────────────
+
+    def request(self, method: str, path: str, params: dict | None = None,
+                body: dict | None = None, retries: int | None = None) -> dict:
+        """Send a request, retrying 429s, 5xx and connection errors. Returns the JSON body ({} if empty)."""
+        import requests
+
+        url = f"{self.base_url}{path}"
+        retries = self.retries if retries is None else retries
+        retry_statuses = POST_RETRY_STATUSES if method == "POST" else RETRY_STATUSES
+        run = sync_metrics.active()
+        for attempt in range(retries):
+            self.breaker.allow()
+            if self.limiter:
+                self.limiter.acquire()
+            waited = self.budget.acquire() if self.budget else 0.0
+            waited += self.adaptive.acquire()
+            if waited and run:
+                run.record_backoff(waited)
+            self.retry_budget.record_request()
+            start = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, params=params, json=body, timeout=self.timeout)
+                self.adaptive.update(resp.headers)
+                if self.budget:
+                    self.budget.observe(resp.headers, resp.status_code)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                resp, error = None, e
+            except BaseException:
+                self.breaker.failure()  # also ends a half-open trial
+                raise
+            finally:
+                self.adaptive.release()
+            if resp is None:
+                self.breaker.failure()
+                retryable = method != "POST" or isinstance(error, requests.ConnectTimeout)
+                if not retryable or attempt == retries - 1 or not self.retry_budget.try_spend():
+                    raise error
+                self._backoff(attempt, type(error).__name__, run)
+                continue
+            record = CallRecord(method, path, resp.status_code,
+                                time.perf_counter() - start, len(resp.content))
+            self.calls.append(record)
+            with self._totals_lock:
+                totals = self.call_totals.setdefault(method, [0, 0.0])
+                totals[0] += 1
+                totals[1] += record.seconds
+            if run:
+                run.record_call(method, path, record.status, record.seconds, record.bytes)
+            if 200 <= resp.status_code < 300:
+                self.breaker.success()
+                return resp.json() if resp.content else {}
+            if resp.status_code == 429:
+                self.breaker.success()  # the API is up, just busy
+                wait = self.adaptive.rate_limited(resp.headers)
+                print(f"  ⏳ Rate limited, waiting {wait:.1f}s...")
+                continue
+            if resp.status_code >= 500:
+                self.breaker.failure()  # any 5xx means the API is unwell; only some are retried
+                if (resp.status_code in retry_statuses and attempt < retries - 1
+                        and self.retry_budget.try_spend()):
+                    self._backoff(attempt, f"HTTP {resp.status_code}", run)
+                    continue
+            else:
+                self.breaker.success()
+            resp.raise_for_status()
+        raise RuntimeError(f"Failed after {retries} retries: {method} {path}")
+
+    def _backoff(self, attempt: int, reason: str, run):
+        wait = random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2 ** attempt))
+        print(f"  🔁 {reason}, retrying in {wait:.1f}s...")
+        if run:
+            run.record_backoff(wait)
+        time.sleep(wait)
+
+    def get(self, path: str, params: dict | None = None, retries: int | None = None) -> dict:
+        return self.request("GET", path, params=params, retries=retries)
+
+    def put(self, path: str, body: dict, retries: int | None = None) -> dict:
+        return self.request("PUT", path, body=body, retries=retries)
+
+    def post(self, path: str, body: dict, retries: int | None = None) -> dict:
+        return self.request("POST", path, body=body, retries=retries)
+
+    def delete(self, path: str, retries: int | None = None) -> dict:
+        return self.request("DELETE", path, retries=retries)
+
+    # ── Async calls ───────────────────────────────────────────────────────────
+    # The pooled session is shared, so coroutines run the blocking call on the
+    # default executor; size the pool to the number of concurrent coroutines.
+
+    async def arequest(self, method: str, path: str, params: dict | None = None,
+                       body: dict | None = None, retries: int | None = None) -> dict:
+        import asyncio
+
+        return await asyncio.to_thread(self.request, method, path, params, body, retries)
+
+    async def aget(self, path: str, params: dict | None = None, retries: int | None = None) -> dict:
+        return await self.arequest("GET", path, params=params, retries=retries)
+
+    async def aput(self, path: str, body: dict, retries: int | None = None) -> dict:
+        return await self.arequest("PUT", path, body=body, retries=retries)
+
+    async def apost(self, path: str, body: dict, retries: int | None = None) -> dict:
+        return await self.arequest("POST", path, body=body, retries=retries)
+
+    async def adelete(self, path: str, retries: int | None = None) -> dict:
+        return await self.arequest("DELETE", path, retries=retries)
+
+    # ── Latency ───────────────────────────────────────────────────────────────
+
+    def latency_summary(self) -> dict:
+        """Call count, mean and p95 latency (ms) per HTTP method.
+
+        Counts and means cover every call; p95 covers the last CALL_HISTORY.
+        """
+        by_method: dict[str, list[float]] = {}
+        for call in list(self.calls):
+            by_method.setdefault(call.method, []).append(call.seconds * 1000)
+        summary = {}
+        with self._totals_lock:
+            totals = {method: list(t) for method, t in self.call_totals.items()}
+        for method, samples in by_method.items():
+            samples.sort()
+            calls, seconds = totals.get(method, [len(samples), sum(samples) / 1000])
+            summary[method] = {
+                "calls": calls,
+                "mean_ms": round(seconds * 1000 / calls, 1),
+                "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+            }
+        return summary
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — ClickUp Webhook Live Mirror
+
+Long-running alternative to cron full syncs. Keeps
+docs/clickup-project-state.sqlite fresh within seconds:
+  - a local HTTP receiver accepts ClickUp webhook events (task created,
+    updated, deleted, moved, ...)
+  - every event is applied to the SQLite store as soon as it arrives (one
+    GET /task/{id} per event; deletions need no request)
+  - a periodic reconciling sync (incremental, with the usual scheduled full
+    resync) repairs anything a missed event left behind
+  - every applied event is committed at once; the markdown summary is
+    re-rendered after each burst (at least every RENDER_MAX_DELAY seconds
+    under steady traffic)
+  - when a cron sync swaps in a new store file, the mirror reopens it
+
+Events can be replayed offline from a JSONL/JSON file of webhook payloads.
+A replayed payload may carry the task body under "task", in which case no
+API call is made — handy for fixtures and tests. Live events always fetch
+the task from ClickUp, and `serve` refuses to start without
+CLICKUP_WEBHOOK_SECRET unless --insecure is given.
+
+Usage:
+  python3 scripts/clickup_webhooks.py serve [--port 8787] [--reconcile-minutes 15]
+  python3 scripts/clickup_webhooks.py replay events.jsonl
+  python3 scripts/clickup_webhooks.py register https://example.com/clickup/webhook
+
+Requires: CLICKUP_API_KEY in .env (CLICKUP_WEBHOOK_SECRET to verify signatures)
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import sync_clickup_state as sync
+from state_db import delete_task, open_state_db_rw, read_meta, refresh_stats, upsert_task
+from task_model import project_tasks
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+WEBHOOK_SECRET = os.getenv("CLICKUP_WEBHOOK_SECRET", "")
+WEBHOOK_PATH = "/clickup/webhook"
+DEFAULT_PORT = 8787
+DEFAULT_RECONCILE_MINUTES = 15
+# While the store can't be opened, retry the reconciling sync at most this often
+RECONCILE_RETRY_SECONDS = 60
+# Re-render the summary after a 1 s lull, or after this long under steady traffic
+RENDER_MAX_DELAY = 30
+
+# Events that change fields the store keeps; everything else is acknowledged and ignored
+TASK_EVENTS = (
+    "taskCreated",
+    "taskUpdated",
+    "taskDeleted",
+    "taskMoved",
+    "taskStatusUpdated",
+    "taskPriorityUpdated",
+    "taskDueDateUpdated",
+    "taskTimeEstimateUpdated",
+    "taskTagUpdated",
+)
+
+RECONCILE = object()  # queue sentinel
+
+
+def verify_signature(body: bytes, signature: str, secret: str | None = None) -> bool:
+    """Check ClickUp's X-Signature header (hex HMAC-SHA256 of the raw body)."""
+    secret = WEBHOOK_SECRET if secret is None else secret
+    if not secret:
+        return True
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+def fetch_task(task_id: str) -> dict | None:
+    """Fetch and project one task; None if it no longer exists."""
+    import requests
+
+    try:
+        raw = sync.api_get(f"/task/{task_id}")
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return None
+        raise
+    return project_tasks([raw], sync.task_fields)[0]
+
+
+# ── Event application ─────────────────────────────────────────────────────────
+
+def apply_event(conn, payload: dict, fetch=fetch_task, trust_embedded: bool = False) -> str:
+    """Apply one webhook payload to the store. Returns what happened.
+
+    A task body embedded under "task" is only used with ``trust_embedded``
+    (replayed files); otherwise the task is fetched from ClickUp.
+    """
+    event = payload.get("event", "")
+    task_id = payload.get("task_id")
+    if event not in TASK_EVENTS or not task_id:
+        return "ignored"
+
+    if event == "taskDeleted":
+        return "deleted" if delete_task(conn, task_id) else "ignored"
+
+    task = (payload.get("task") if trust_embedded else None) or fetch(task_id)
+    if task is None:
+        return "deleted" if delete_task(conn, task_id) else "ignored"
+    if upsert_task(conn, task):
+        return "upserted"
+    # Moved to a list outside the space (or the store predates the list)
+    return "removed" if delete_task(conn, task_id) else "ignored"
+
+
+def render_summary(conn):
+    """Refresh stats and re-render the markdown summary from the store."""
+    refresh_stats(conn)
+    conn.commit()
+    sync.save_summary(read_meta(conn), conn)
+
+
+class LiveMirror:
+    """Serializes event application and reconciling syncs on one worker thread."""
+
+    def __init__(self, sync_args: argparse.Namespace, reconcile_minutes: float):
+        self.sync_args = sync_args
+        self.reconcile_seconds = reconcile_minutes * 60
+        self.events: queue.Queue = queue.Queue()
+        self.conn = None
+        self.store_inode = None  # inode self.conn was opened on
+        self.last_reconcile_attempt = 0.0
+        self.stats_lock = threading.Lock()  # handler threads count "received"
+        self.stats = {"received": 0, "applied": 0, "ignored": 0, "dropped": 0, "reconciles": 0,
+                      "last_event_at": None, "last_reconcile_at": None}
+
+    def count(self, key: str, **updates):
+        with self.stats_lock:
+            self.stats[key] += 1
+            self.stats.update(updates)
+
+    def snapshot(self) -> dict:
+        with self.stats_lock:
+            return dict(self.stats)
+
+    def submit(self, payload: dict):
+        self.count("received")
+        self.events.put(payload)
+
+    def open_store(self):
+        self.conn = open_state_db_rw(sync.STATE_DB)
+        self.store_inode = os.stat(sync.STATE_DB).st_ino if self.conn is not None else None
+
+    def store_swapped(self) -> bool:
+        """True when another sync has replaced the store file under self.conn."""
+        try:
+            return os.stat(sync.STATE_DB).st_ino != self.store_inode
+        except FileNotFoundError:
+            return True
+
+    def reconcile(self):
+        """Run a sync through the normal pipeline, then reopen the swapped-in store."""
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+        self.last_reconcile_attempt = time.monotonic()
+        print("🔁 Reconciling with ClickUp...")
+        try:
+            sync.sync_state(self.sync_args)
+            self.count("reconciles", last_reconcile_at=datetime.now(timezone.utc).isoformat())
+        except Exception as e:
+            print(f"⚠️  Reconcile failed: {e}")
+        self.open_store()
+
+    def run_worker(self):
+        dirty_since = None  # monotonic time of the first change not yet rendered
+        while True:
+            try:
+                job = self.events.get(timeout=1.0)
+            except queue.Empty:
+                job = None
+            if self.conn is not None and self.store_swapped():
+                # A cron sync os.replace()d the store; writes to the old inode would be lost
+                print("🔄 Store replaced by another sync — reopening")
+                self.conn.close()
+                self.open_store()
+                dirty_since = None
+            if dirty_since is not None and self.conn is not None and (
+                    job is None or time.monotonic() - dirty_since >= RENDER_MAX_DELAY):
+                render_summary(self.conn)
+                dirty_since = None
+            if job is None:
+                continue
+            if job is RECONCILE or self.conn is None:
+                # Without a store (API down?) retry the sync at most every RECONCILE_RETRY_SECONDS;
+                # events dropped meanwhile are picked up by that sync
+                if job is RECONCILE or time.monotonic() - self.last_reconcile_attempt >= RECONCILE_RETRY_SECONDS:
+                    self.reconcile()
+                    dirty_since = None
+                if job is RECONCILE:
+                    continue
+                if self.conn is None:
+                    self.count("dropped")
+                    continue
+            label = f"{job.get('event')} {job.get('task_id')}" if isinstance(job, dict) else repr(job)[:80]
+            try:
+                outcome = apply_event(self.conn, job)
+                self.conn.commit()  # don't hold a write transaction open between events
+            except Exception as e:
+                self.conn.rollback()
+                print(f"⚠️  Failed to apply {label}: {e}")
+                continue
+            print(f"  ⚡ {label} → {outcome}")
+            self.count("applied" if outcome != "ignored" else "ignored",
+                       last_event_at=datetime.now(timezone.utc).isoformat())
+            if outcome != "ignored" and dirty_since is None:
+                dirty_since = time.monotonic()
+
+    def run_scheduler(self):
+        while True:
+            time.sleep(self.reconcile_seconds)
+            self.events.put(RECONCILE)
+
+
+def make_handler(mirror: LiveMirror):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):
+            pass
+
+        def _reply(self, status: int, body: dict):
+            raw = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self):
+            if self.path == "/healthz":
+                self._reply(200, {"queued": mirror.events.qsize(), **mirror.snapshot()})
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != WEBHOOK_PATH:
+                self._reply(404, {"error": "not found"})
+                return
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not verify_signature(body, self.headers.get("X-Signature", "")):
+                self._reply(401, {"error": "bad signature"})
+                return
+            try:
+                payload = json.loads(body)
+            except json.JSONDecodeError:
+                self._reply(400, {"error": "invalid json"})
+                return
+            if not isinstance(payload, dict):
+                self._reply(400, {"error": "payload must be a JSON object"})
+                return
+            mirror.submit(payload)
+            self._reply(200, {"ok": True})
+
+    return WebhookHandler
+
+
+# ── Commands ──────────────────────────────────────────────────────────────────
+
+def serve(args: argparse.Namespace):
+    if not WEBHOOK_SECRET and not args.insecure:
+        print("❌ CLICKUP_WEBHOOK_SECRET not set — refusing to accept unsigned events "
+              "(pass --insecure to run without signature checks)")
+        sys.exit(1)
+    args.incremental = True
+    mirror = LiveMirror(args, args.reconcile_minutes)
+    mirror.events.put(RECONCILE)  # make sure the store exists and is current
+    threading.Thread(target=mirror.run_worker, daemon=True).start()
+    threading.Thread(target=mirror.run_scheduler, daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(mirror))
+    print(f"👂 Listening on http://{args.host}:{args.port}{WEBHOOK_PATH} "
+          f"(reconcile every {args.reconcile_minutes:g} min)")
+    if not WEBHOOK_SECRET:
+        print("⚠️  --insecure: CLICKUP_WEBHOOK_SECRET not set, signatures are not verified")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+
+
+def load_payloads(path: Path) -> list[dict]:
+    """Read webhook payloads from a JSON array or a JSONL file."""
+    text = path.read_text().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def replay(args: argparse.Namespace):
+    conn = open_state_db_rw(sync.STATE_DB)
+    if conn is None:
+        print(f"❌ {sync.STATE_DB.relative_to(sync.PROJECT_ROOT)} not found — run sync_clickup_state.py first")
+        sys.exit(1)
+    payloads = load_payloads(args.file)
+    counts: dict[str, int] = {}
+    for payload in payloads:
+        outcome = apply_event(conn, payload, trust_embedded=True)
+        counts[outcome] = counts.get(outcome, 0) + 1
+        print(f"  ⚡ {payload.get('event')} {payload.get('task_id')} → {outcome}")
+    render_summary(conn)
+    conn.close()
+    print(f"✅ Replayed {len(payloads)} event(s): "
+          + ", ".join(f"{n} {outcome}" for outcome, n in sorted(counts.items())))
+
+
+def register(args: argparse.Namespace):
+    data = sync.get_client().post(f"/team/{sync.WORKSPACE_ID}/webhook", {
+        "endpoint": args.endpoint,
+        "events": list(TASK_EVENTS),
+        "space_id": sync.SPACE_ID,
+    })
+    webhook = data.get("webhook", {})
+    print(f"✅ Registered webhook {data.get('id') or webhook.get('id')}")
+    if webhook.get("secret"):
+        print(f"🔑 Add to .env: CLICKUP_WEBHOOK_SECRET={webhook['secret']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live ClickUp state mirror driven by webhooks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Run the webhook receiver and periodic reconcile")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p_serve.add_argument("--insecure", action="store_true",
+                         help="Accept unsigned events when CLICKUP_WEBHOOK_SECRET is not set")
+    p_serve.add_argument("--reconcile-minutes", type=float, default=DEFAULT_RECONCILE_MINUTES,
+                         help=f"Minutes between reconciling syncs (default: {DEFAULT_RECONCILE_MINUTES})")
+    sync.add_sync_arguments(p_serve)
+
+    p_replay = sub.add_parser("replay", help="Apply recorded webhook payloads to the store")
+    p_replay.add_argument("file", type=Path, help="JSON array or JSONL of webhook payloads")
+
+    p_register = sub.add_parser("register", help="Register a ClickUp webhook for this space")
+    p_register.add_argument("endpoint", help="Public URL that forwards to the receiver")
+
+    args = parser.parse_args()
+    global WEBHOOK_SECRET
+    sync.load_env()
+    WEBHOOK_SECRET = os.getenv("CLICKUP_WEBHOOK_SECRET", "")
+    if not sync.CLICKUP_API_KEY and args.command != "replay":
+        print("❌ CLICKUP_API_KEY not found in .env")
+        sys.exit(1)
+
+    {"serve": serve, "replay": replay, "register": register}[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
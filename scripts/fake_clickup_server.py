@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Synthetic Local ClickUp Server
+
+A stand-in for the parts of the ClickUp v2 API the sync scripts use, serving
+a generated space of configurable size so syncs can be measured offline:
+  - GET /space/{id}/folder, /space/{id}/list
+  - GET /list/{id}/task      (pages of 100, subtasks, date_updated_gt)
+  - GET /team/{id}/task      (pages of 100, last_page, date_updated_gt)
+  - GET /task/{id}
+  - simulated latency, per-minute rate limit and random 429s
+
+Task payloads carry the same bulky fields as real ones (custom fields,
+assignees, description, ...) and are rendered on demand, so a 100k-task
+space costs a few compact rows per task in memory, not the full JSON.
+
+Test hooks (not part of ClickUp):
+  POST /_fake/touch {"count": 50}  mark N random tasks as updated now
+  GET  /_fake/stats                requests served and 429s sent
+
+Point any script at it with CLICKUP_BASE_URL=http://127.0.0.1:8900.
+
+Usage:
+  python3 scripts/fake_clickup_server.py                          # 1,000 tasks on :8900
+  python3 scripts/fake_clickup_server.py --tasks 100000 --folders 10 --lists-per-folder 10
+  python3 scripts/fake_clickup_server.py --latency-ms 120 --rate-limit 100 --throttle 0.02
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+DEFAULT_PORT = 8900
+PAGE_SIZE = 100
+WORKSPACE_ID = "9017067210"
+SPACE_ID = "90174101415"
+
+STATUSES = (
+    {"status": "to do", "color": "#87909e", "type": "open", "orderindex": 0},
+    {"status": "in progress", "color": "#5f55ee", "type": "custom", "orderindex": 1},
+    {"status": "review", "color": "#f8ae00", "type": "custom", "orderindex": 2},
+    {"status": "complete", "color": "#008844", "type": "closed", "orderindex": 3},
+)
+STATUS_WEIGHTS = (45, 20, 5, 30)
+
+PRIORITIES = (
+    None,
+    {"id": "1", "priority": "urgent", "color": "#f50000", "orderindex": "1"},
+    {"id": "2", "priority": "high", "color": "#f8ae00", "orderindex": "2"},
+    {"id": "3", "priority": "normal", "color": "#6fddff", "orderindex": "3"},
+    {"id": "4", "priority": "low", "color": "#d8d8d8", "orderindex": "4"},
+)
+PRIORITY_WEIGHTS = (40, 5, 15, 30, 10)
+
+USER = {
+    "id": 81234567,
+    "username": "Bench User",
+    "color": "#7b68ee",
+    "initials": "BU",
+    "email": "bench@example.com",
+    "profilePicture": None,
+}
+
+DAY_MS = 86_400_000
+HOUR_MS = 3_600_000
+
+_LIST_TASKS = re.compile(r"^/list/([^/]+)/task$")
+_TEAM_TASKS = re.compile(r"^/team/([^/]+)/task$")
+_TASK = re.compile(r"^/task/([^/]+)$")
+_SPACE = re.compile(r"^/space/([^/]+)/(folder|list)$")
+
+
+# ── Synthetic space ───────────────────────────────────────────────────────────
+
+class FakeSpace:
+    """A deterministic synthetic space; tasks are compact rows rendered on demand.
+
+    Row layout: [task_id, list_idx, parent_id, status_idx, priority_idx,
+    start_ms, due_ms, estimate_ms, created_ms, updated_ms].
+    """
+
+    def __init__(self, tasks: int = 1000, folders: int = 3, lists_per_folder: int = 4,
+                 folderless: int = 2, subtask_ratio: float = 0.3, seed: int = 1):
+        rng = random.Random(seed)
+        now = int(time.time() * 1000)
+        self.lock = threading.Lock()
+
+        self.folders: list[dict] = []
+        self.lists: list[dict] = []  # {"id", "name", "folder": folder dict | None}
+        for f in range(folders):
+            folder = {"id": f"9017{seed:02d}{f:05d}", "name": f"Workstream {f + 1}", "lists": []}
+            for j in range(lists_per_folder):
+                lst = {"id": f"9017{seed:02d}{f:03d}{j:03d}1", "name": f"Sprint {f + 1}.{j + 1}"}
+                folder["lists"].append(lst)
+                self.lists.append({**lst, "folder": folder})
+            self.folders.append(folder)
+        self.folderless = []
+        for j in range(folderless):
+            lst = {"id": f"9017{seed:02d}999{j:03d}1", "name": "To Sort" if j == 0 else f"Milestones {j}"}
+            self.folderless.append(lst)
+            self.lists.append({**lst, "folder": None})
+
+        # Uneven list sizes, like a real space: a few big backlogs, many small lists
+        weights = [rng.paretovariate(1.5) for _ in self.lists]
+        scale = tasks / sum(weights)
+        sizes = [int(w * scale) for w in weights]
+        sizes[0] += tasks - sum(sizes)
+
+        self.by_list: list[list[list]] = []
+        self.index: dict[str, list] = {}
+        n = 0
+        for list_idx, size in enumerate(sizes):
+            rows: list[list] = []
+            parents: list[str] = []
+            for _ in range(size):
+                n += 1
+                task_id = f"86{n:07x}"
+                parent = None
+                if parents and rng.random() < subtask_ratio:
+                    parent = rng.choice(parents[-20:])
+                created = now - rng.randint(7, 120) * DAY_MS
+                start = created + rng.randint(0, 10) * DAY_MS if rng.random() < 0.4 else None
+                due = now + rng.randint(-20, 60) * DAY_MS if rng.random() < 0.6 else None
+                row = [
+                    task_id,
+                    list_idx,
+                    parent,
+                    rng.choices(range(len(STATUSES)), STATUS_WEIGHTS)[0],
+                    rng.choices(range(len(PRIORITIES)), PRIORITY_WEIGHTS)[0],
+                    start,
+                    due,
+                    rng.choice((None, None, HOUR_MS, 2 * HOUR_MS, 4 * HOUR_MS, 8 * HOUR_MS)),
+                    created,
+                    created + rng.randint(0, 6) * DAY_MS,  # well before any real "last sync"
+                ]
+                if parent is None:
+                    parents.append(task_id)
+                rows.append(row)
+                self.index[task_id] = row
+            self.by_list.append(rows)
+        self.all_rows = [row for rows in self.by_list for row in rows]
+        self.rng = rng
+
+    def touch(self, count: int) -> list[str]:
+        """Mark ``count`` random tasks as updated now (status bumped); returns their ids."""
+        now = int(time.time() * 1000)
+        with self.lock:
+            rows = self.rng.sample(self.all_rows, min(count, len(self.all_rows)))
+            for row in rows:
+                row[3] = (row[3] + 1) % len(STATUSES)
+                row[9] = now
+        return [row[0] for row in rows]
+
+    def render(self, row: list) -> dict:
+        """Full ClickUp-shaped payload for one task row."""
+        task_id, list_idx, parent, status_idx, priority_idx, start, due, estimate, created, updated = row
+        lst = self.lists[list_idx]
+        folder = lst["folder"]
+        status = STATUSES[status_idx]
+        closed = status["type"] == "closed"
+        description = f"Synthetic task {task_id} for sync benchmarks. " * 6
+        return {
+            "id": task_id,
+            "custom_id": None,
+            "custom_item_id": 0,
+            "name": f"Task {task_id} — {lst['name']}",
+            "text_content": description,
+            "description": description,
+            "status": status,
+            "orderindex": f"{int(task_id[2:], 16)}.00000000000000000000000000000000",
+            "date_created": str(created),
+            "date_updated": str(updated),
+            "date_closed": str(updated) if closed else None,
+            "date_done": str(updated) if closed else None,
+            "archived": False,
+            "creator": USER,
+            "assignees": [USER],
+            "group_assignees": [],
+            "watchers": [USER],
+            "checklists": [],
+            "tags": [{"name": "bench", "tag_fg": "#800000", "tag_bg": "#2ecd6f", "creator": USER["id"]}],
+            "parent": parent,
+            "top_level_parent": parent,
+            "priority": PRIORITIES[priority_idx],
+            "due_date": str(due) if due else None,
+            "start_date": str(start) if start else None,
+            "points": None,
+            "time_estimate": estimate,
+            "time_spent": 0,
+            "custom_fields": [
+                {"id": "c0ffee01-0000-4000-8000-000000000001", "name": "Effort", "type": "drop_down",
+                 "type_config": {"options": [{"id": f"opt{i}", "name": s, "orderindex": i}
+                                             for i, s in enumerate(("S", "M", "L", "XL"))]},
+                 "required": False},
+                {"id": "c0ffee01-0000-4000-8000-000000000002", "name": "Notes", "type": "text",
+                 "type_config": {}, "required": False, "value": "n/a"},
+            ],
+            "dependencies": [],
+            "linked_tasks": [],
+            "locations": [],
+            "team_id": WORKSPACE_ID,
+            "url": f"https://app.clickup.com/t/{task_id}",
+            "sharing": {"public": False, "public_share_expires_on": None, "public_fields": [],
+                        "token": None, "seo_optimized": False},
+            "permission_level": "create",
+            "list": {"id": lst["id"], "name": lst["name"], "access": True},
+            "project": {"id": folder["id"], "name": folder["name"], "hidden": False, "access": True}
+            if folder else {"id": "0", "name": "hidden", "hidden": True, "access": True},
+            "folder": {"id": folder["id"], "name": folder["name"], "hidden": False, "access": True}
+            if folder else {"id": "0", "name": "hidden", "hidden": True, "access": True},
+            "space": {"id": SPACE_ID},
+        }
+
+    def page(self, rows: list[list], page: int, updated_gt: int | None) -> tuple[list[dict], bool]:
+        if updated_gt is not None:
+            rows = [row for row in rows if row[9] > updated_gt]
+        chunk = rows[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+        return [self.render(row) for row in chunk], (page + 1) * PAGE_SIZE >= len(rows)
+
+
+# ── HTTP ──────────────────────────────────────────────────────────────────────
+
+class Throttle:
+    """Sliding one-minute request window plus random 429s, shared by all handlers."""
+
+    def __init__(self, rate_per_min: int = 0, probability: float = 0.0, seed: int = 1):
+        self.rate = rate_per_min
+        self.probability = probability
+        self.window: deque[float] = deque()
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.served = 0
+        self.limited = 0
+
+    def check(self) -> tuple[bool, dict]:
+        """Admit one request. Returns (allowed, X-RateLimit-* headers)."""
+        now = time.time()
+        with self.lock:
+            while self.window and now - self.window[0] >= 60:
+                self.window.popleft()
+            limit = self.rate or 100
+            reset = int((self.window[0] if self.window else now) + 60)
+            over = self.rate and len(self.window) >= self.rate
+            allowed = not over and not (self.probability and self.rng.random() < self.probability)
+            if allowed:
+                self.window.append(now)
+                self.served += 1
+            else:
+                self.limited += 1
+            remaining = max(0, limit - len(self.window)) if allowed and self.rate else (limit if allowed else 0)
+        return allowed, {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset),
+        }
+
+
+def make_handler(space: FakeSpace, throttle: Throttle, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+    class FakeClickUpHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _reply(self, status: int, body: dict, headers: dict | None = None):
+            raw = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def _delay(self):
+            if latency_ms or jitter_ms:
+                time.sleep(max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            path = url.path.removeprefix("/api/v2")
+            query = parse_qs(url.query)
+            if path == "/_fake/stats":
+                self._reply(200, {"served": throttle.served, "rate_limited": throttle.limited,
+                                  "tasks": len(space.all_rows), "lists": len(space.lists)})
+                return
+
+            allowed, limits = throttle.check()
+            self._delay()
+            if not allowed:
+                self._reply(429, {"err": "Rate limit reached", "ECODE": "APP_002"}, limits)
+                return
+
+            page = int(query.get("page", ["0"])[0])
+            updated_gt = int(query["date_updated_gt"][0]) if "date_updated_gt" in query else None
+            include_subtasks = query.get("subtasks", ["false"])[0] == "true"
+
+            if m := _SPACE.match(path):
+                if m.group(2) == "folder":
+                    body = {"folders": [{"id": f["id"], "name": f["name"], "lists": f["lists"]}
+                                        for f in space.folders]}
+                else:
+                    body = {"lists": space.folderless}
+            elif m := _LIST_TASKS.match(path):
+                list_idx = next((i for i, lst in enumerate(space.lists) if lst["id"] == m.group(1)), None)
+                if list_idx is None:
+                    self._reply(404, {"err": "List not found", "ECODE": "ITEM_013"}, limits)
+                    return
+                rows = space.by_list[list_idx]
+                if not include_subtasks:
+                    rows = [row for row in rows if row[2] is None]
+                tasks, _ = space.page(rows, page, updated_gt)
+                body = {"tasks": tasks}
+            elif _TEAM_TASKS.match(path):
+                rows = space.all_rows if include_subtasks else [r for r in space.all_rows if r[2] is None]
+                tasks, last_page = space.page(rows, page, updated_gt)
+                body = {"tasks": tasks, "last_page": last_page}
+            elif m := _TASK.match(path):
+                row = space.index.get(m.group(1))
+                if row is None:
+                    self._reply(404, {"err": "Task not found", "ECODE": "ITEM_015"}, limits)
+                    return
+                body = space.render(row)
+            else:
+                self._reply(404, {"err": "Route not found", "ECODE": "APP_001"}, limits)
+                return
+            self._reply(200, body, limits)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+            if urlsplit(self.path).path.removeprefix("/api/v2") != "/_fake/touch":
+                self._reply(404, {"err": "Route not found", "ECODE": "APP_001"})
+                return
+            count = int((json.loads(body) if body else {}).get("count", 10))
+            self._reply(200, {"touched": space.touch(count)})
+
+    return FakeClickUpHandler
+
+
+def start_server(space: FakeSpace, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 throttle: Throttle | None = None, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0) -> ThreadingHTTPServer:
+    """Start serving on a daemon thread; returns the server (``server_port`` has the bound port)."""
+    server = ThreadingHTTPServer((host, port), make_handler(space, throttle or Throttle(), latency_ms, jitter_ms))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_space_arguments(parser: argparse.ArgumentParser):
+    """Register the synthetic space and network simulation options."""
+    parser.add_argument("--folders", type=int, default=3)
+    parser.add_argument("--lists-per-folder", type=int, default=4)
+    parser.add_argument("--folderless", type=int, default=2, help="Lists outside any folder")
+    parser.add_argument("--subtask-ratio", type=float, default=0.3,
+                        help="Share of tasks generated as subtasks (default: 0.3)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="± random spread on the latency")
+    parser.add_argument("--rate-limit", type=int, default=0,
+                        help="Requests per minute before answering 429 (default: 0, unlimited)")
+    parser.add_argument("--throttle", type=float, default=0.0,
+                        help="Probability of a random 429 on any request (default: 0)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic local ClickUp API for offline benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0 picks a free port")
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks in the space, subtasks included")
+    add_space_arguments(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    space = FakeSpace(args.tasks, args.folders, args.lists_per_folder, args.folderless,
+                      args.subtask_ratio, args.seed)
+    throttle = Throttle(args.rate_limit, args.throttle, args.seed)
+    server = start_server(space, args.host, args.port, throttle, args.latency_ms, args.jitter_ms)
+    print(f"🧪 Fake ClickUp: {len(space.all_rows)} tasks in {len(space.lists)} lists "
+          f"(generated in {time.perf_counter() - start:.1f}s)")
+    # The benchmark runner reads the bound port from this line
+    print(f"READY http://{args.host}:{server.server_port}/api/v2", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
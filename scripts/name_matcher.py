@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Fuzzy Task Name Matcher
+
+Resolves the parent task names an LLM returns ("rate limiting and abuse
+prevention", "🔒 Production infra complete!") to existing tasks when the
+exact lower-cased lookup misses on casing, punctuation or an emoji.
+
+Names are normalized (case, accents, emoji and punctuation dropped,
+whitespace collapsed) and split into character trigrams. An inverted list
+per trigram finds candidates through the query's rarer trigrams; candidates
+are then scored by the Dice coefficient of the two trigram sets (1.0 for
+identical normalized names). A match is accepted at or above a threshold
+and flagged ambiguous when another task scores within a small margin.
+
+Usage:
+  python3 scripts/name_matcher.py "rate limiting & abuse prevention" [--threshold 0.6]
+"""
+
+import argparse
+import re
+import sys
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+
+DEFAULT_THRESHOLD = 0.6
+AMBIGUITY_MARGIN = 0.05
+# Trigrams in more than this share of names don't generate candidates on their own
+COMMON_TRIGRAM_SHARE = 0.1
+# Only the names sharing the most trigrams with the query are scored exactly
+MAX_CANDIDATES = 64
+
+
+def normalize_name(name: str) -> str:
+    text = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode().lower()
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def trigrams(normalized: str) -> set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class NameMatch:
+    query: str
+    task_id: str | None
+    name: str | None
+    score: float
+    accepted: bool
+    ambiguous: list[tuple[str, float]] = field(default_factory=list)  # close runners-up (name, score)
+
+    def as_log(self) -> dict:
+        return {"query": self.query, "matched": self.name, "task_id": self.task_id,
+                "score": round(self.score, 3), "accepted": self.accepted,
+                "ambiguous_with": [{"name": n, "score": round(s, 3)} for n, s in self.ambiguous]}
+
+
+class TrigramIndex:
+    """Approximate name → task id index, built once per sort run."""
+
+    def __init__(self, entries, threshold: float = DEFAULT_THRESHOLD, margin: float = AMBIGUITY_MARGIN):
+        """``entries``: (name, task_id) pairs; for duplicate names the last one wins."""
+        self.threshold = threshold
+        self.margin = margin
+        self.names: list[str] = []
+        self.ids: list[str] = []
+        self.grams: list[set[str]] = []
+        self.postings: dict[str, list[int]] = {}
+        self.exact: dict[str, int] = {}
+        for name, task_id in entries:
+            norm = normalize_name(name)
+            if not norm:
+                continue
+            if norm in self.exact:  # keep one document per normalized name: the last one
+                doc = self.exact[norm]
+                self.names[doc], self.ids[doc] = name, task_id
+                continue
+            doc = len(self.names)
+            self.exact[norm] = doc
+            self.names.append(name)
+            self.ids.append(task_id)
+            grams = trigrams(norm)
+            self.grams.append(grams)
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(doc)
+        self.common = max(1, int(len(self.names) * COMMON_TRIGRAM_SHARE))
+
+    def __len__(self):
+        return len(self.names)
+
+    def match(self, query: str) -> NameMatch:
+        norm = normalize_name(query)
+        if norm in self.exact:
+            doc = self.exact[norm]
+            return NameMatch(query, self.ids[doc], self.names[doc], 1.0, True)
+        grams = trigrams(norm) if norm else set()
+        if not grams:
+            return NameMatch(query, None, None, 0.0, False)
+
+        # Candidates from the query's selective trigrams (all of them if none are)
+        selective = [g for g in grams if len(self.postings.get(g, ())) <= self.common]
+        counts = Counter()
+        for gram in selective or grams:
+            counts.update(self.postings.get(gram, ()))
+        scored = sorted(
+            ((2 * len(grams & self.grams[doc]) / (len(grams) + len(self.grams[doc])), doc)
+             for doc, _ in counts.most_common(MAX_CANDIDATES)),
+            reverse=True,
+        )
+        if not scored:
+            return NameMatch(query, None, None, 0.0, False)
+        best_score, best = scored[0]
+        close = [(self.names[doc], score) for score, doc in scored[1:4] if best_score - score <= self.margin]
+        return NameMatch(query, self.ids[best], self.names[best], best_score,
+                         best_score >= self.threshold, close)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzzy-match a task name against the synced tasks")
+    parser.add_argument("name")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    from state_db import STATE_DB, open_state_db, task_names
+
+    conn = open_state_db(STATE_DB)
+    if conn is None:
+        print(f"❌ {STATE_DB} not found — run sync_clickup_state.py first")
+        sys.exit(1)
+    start = time.perf_counter()
+    index = TrigramIndex(task_names(conn), args.threshold)
+    built = time.perf_counter()
+    match = index.match(args.name)
+    elapsed = time.perf_counter() - built
+    icon = "✅" if match.accepted else "❌"
+    print(f"{icon} {match.name!r} ({match.task_id}) score {match.score:.3f}")
+    for name, score in match.ambiguous:
+        print(f"   ⚠️  also close: {name!r} {score:.3f}")
+    print(f"\nIndexed {len(index)} names in {(built - start) * 1000:.1f} ms, matched in {elapsed * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
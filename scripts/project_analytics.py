@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Project Analytics
+
+Throughput metrics over the synced ClickUp tasks, computed on NumPy column
+arrays (epoch-ms timestamps, priority codes, list codes) with vectorized
+group-bys instead of per-task Python loops:
+  - completion velocity: tasks closed per list per week
+  - cycle time: date_created → date_closed (median, p90, mean days)
+  - estimate accuracy: time_spent / time_estimate on closed tasks
+  - due date slips: tasks closed late, open and overdue, and (with the
+    snapshot history) due dates pushed back between syncs
+
+Columns come from the SQLite state store; due date changes come from the
+snapshot history (docs/clickup-history.sqlite) when it exists. The report
+is written to docs/clickup-analytics.md.
+
+Usage:
+  python3 scripts/project_analytics.py [--weeks 8] [--output docs/clickup-analytics.md]
+
+Requires: numpy (optional elsewhere; the sync skips analytics without it)
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # analytics are optional; callers check HAVE_NUMPY
+    np = None
+
+from snapshot_history import HISTORY_DB, apply_delta, decompress, open_history
+from state_db import STATE_DB, open_state_db, read_meta
+
+HAVE_NUMPY = np is not None
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DOCS_DIR = PROJECT_ROOT / "docs"
+REPORT_FILE = DOCS_DIR / "clickup-analytics.md"
+
+DAY_MS = 86_400_000
+WEEK_MS = 7 * DAY_MS
+DEFAULT_WEEKS = 8
+
+TASK_QUERY = """
+SELECT task_id, list_id, parent IS NOT NULL, status_type = 'closed', priority, due_date, time_estimate,
+       json_extract(payload, '$.date_created', '$.date_closed', '$.date_done', '$.time_spent')
+FROM all_tasks
+"""
+
+
+@dataclass
+class TaskColumns:
+    """Synced tasks as parallel arrays; 0 means "not set" in the ms columns."""
+    task_ids: list[str]
+    list_names: list[str]
+    list_code: "np.ndarray"   # int32 index into list_names
+    subtask: "np.ndarray"     # bool
+    closed: "np.ndarray"      # bool
+    priority: "np.ndarray"    # int8, 0 = none, 1 = Urgent ... 4 = Low
+    due: "np.ndarray"         # int64 epoch ms
+    estimate: "np.ndarray"    # int64 ms
+    created: "np.ndarray"     # int64 epoch ms
+    closed_at: "np.ndarray"   # int64 epoch ms
+    spent: "np.ndarray"       # int64 ms
+
+    def __len__(self):
+        return len(self.task_ids)
+
+
+def load_columns(conn) -> TaskColumns:
+    """Load every task and subtask of the store into column arrays."""
+    lists = conn.execute("SELECT list_id, list_name FROM lists ORDER BY position").fetchall()
+    list_index = {row[0]: i for i, row in enumerate(lists)}
+    rows = conn.execute(TASK_QUERY).fetchall()
+    n = len(rows)
+    cols = list(zip(*rows)) if rows else [()] * 8
+    # One json_extract per row (a JSON array), decoded in a single json.loads
+    extra = json.loads("[" + ",".join(cols[7]) + "]")
+    created, closed, done, spent = zip(*extra) if extra else [()] * 4
+    as_int = lambda values, dtype=np.int64: np.fromiter((int(v or 0) for v in values), dtype=dtype, count=n)
+    return TaskColumns(
+        task_ids=list(cols[0]),
+        list_names=[row[1] for row in lists],
+        list_code=np.fromiter((list_index[v] for v in cols[1]), dtype=np.int32, count=n),
+        subtask=as_int(cols[2], bool),
+        closed=as_int(cols[3], bool),
+        priority=as_int(cols[4], np.int8),
+        due=as_int(cols[5]),
+        estimate=as_int(cols[6]),
+        created=as_int(created),
+        closed_at=as_int(c or d for c, d in zip(closed, done)),
+        spent=as_int(spent),
+    )
+
+
+def load_due_history(history_path: Path, cols: TaskColumns) -> dict | None:
+    """Due date of every task at each snapshot where it changed, as arrays.
+
+    Returns {"task", "due", "list_code", "versions"} in (task, snapshot)
+    order, or None without a history. Only tasks with more than one stored
+    version are decompressed — a single version can't hold a due date change.
+    Tasks are attributed to their current list; tasks no longer in the store
+    get list code -1.
+    """
+    if not history_path.exists():
+        return None
+
+    conn = open_history(history_path)
+    current_list = dict(zip(cols.task_ids, cols.list_code.tolist()))
+    task_code, due, list_code = [], [], []
+    versions = conn.execute("SELECT COUNT(*) FROM task_versions").fetchone()[0]
+    code, current_id, current = -1, None, {}
+    for task_id, row_hash, blob in conn.execute(
+        "SELECT task_id, hash, delta FROM task_versions WHERE task_id IN "
+        "(SELECT task_id FROM task_versions GROUP BY task_id HAVING COUNT(*) > 1) "
+        "ORDER BY task_id, snap_id"
+    ):
+        if task_id != current_id:
+            current_id, current, code = task_id, {}, code + 1
+        if row_hash is None:
+            current = {}
+            continue
+        previous = current.get("due_date")
+        current = apply_delta(current, decompress(blob))
+        if not task_code or task_code[-1] != code or current.get("due_date") != previous:
+            task_code.append(code)
+            due.append(int(current.get("due_date") or 0))
+            list_code.append(current_list.get(task_id, -1))
+    conn.close()
+    return {
+        "task": np.array(task_code, dtype=np.int64),
+        "due": np.array(due, dtype=np.int64),
+        "list_code": np.array(list_code, dtype=np.int32),
+        "versions": versions,
+    }
+
+
+# ── Metrics ───────────────────────────────────────────────────────────────────
+
+def group_quantiles(codes: "np.ndarray", values: "np.ndarray", groups: int, qs=(0.5, 0.9)) -> "np.ndarray":
+    """Per-group quantiles via one lexsort; NaN for empty groups.
+
+    Linear interpolation between ranks, the same definition as np.percentile's
+    default, so per-list rows agree with the overall row.
+    """
+    out = np.full((groups, len(qs)), np.nan)
+    if not len(values):
+        return out
+    order = np.lexsort((values, codes))
+    sorted_codes, sorted_vals = codes[order], values[order]
+    starts = np.searchsorted(sorted_codes, np.arange(groups), side="left")
+    counts = np.searchsorted(sorted_codes, np.arange(groups), side="right") - starts
+    has = counts > 0
+    starts, counts = starts[has], counts[has]
+    for j, q in enumerate(qs):
+        pos = (counts - 1) * q
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, counts - 1)
+        frac = pos - lo
+        out[has, j] = sorted_vals[starts + lo] * (1 - frac) + sorted_vals[starts + hi] * frac
+    return out
+
+
+def velocity(cols: TaskColumns, now_ms: int, weeks: int = DEFAULT_WEEKS) -> "np.ndarray":
+    """[lists × weeks] tasks closed per week, oldest week first."""
+    n = len(cols.list_names)
+    age = now_ms - cols.closed_at
+    mask = cols.closed & (cols.closed_at > 0) & (age >= 0) & (age < weeks * WEEK_MS)
+    week = weeks - 1 - age[mask] // WEEK_MS
+    flat = cols.list_code[mask].astype(np.int64) * weeks + week
+    return np.bincount(flat, minlength=n * weeks).reshape(n, weeks)
+
+
+def cycle_times(cols: TaskColumns) -> dict:
+    """Created → closed days per list: count, mean, median, p90."""
+    n = len(cols.list_names)
+    mask = cols.closed & (cols.created > 0) & (cols.closed_at >= cols.created)
+    days = (cols.closed_at[mask] - cols.created[mask]) / DAY_MS
+    codes = cols.list_code[mask]
+    count = np.bincount(codes, minlength=n)
+    total = np.bincount(codes, weights=days, minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    quant = group_quantiles(codes, days, n)
+    overall = np.percentile(days, [50, 90]) if len(days) else [np.nan, np.nan]
+    return {"count": count, "mean": mean, "median": quant[:, 0], "p90": quant[:, 1],
+            "overall_median": overall[0], "overall_p90": overall[1]}
+
+
+def estimate_accuracy(cols: TaskColumns) -> dict:
+    """time_spent / time_estimate on closed tasks that have both."""
+    n = len(cols.list_names)
+    mask = cols.closed & (cols.estimate > 0) & (cols.spent > 0)
+    ratio = cols.spent[mask] / cols.estimate[mask]
+    codes = cols.list_code[mask]
+    count = np.bincount(codes, minlength=n)
+    within = np.bincount(codes, weights=(np.abs(ratio - 1) <= 0.25), minlength=n)
+    est_h = np.bincount(codes, weights=cols.estimate[mask] / 3_600_000, minlength=n)
+    spent_h = np.bincount(codes, weights=cols.spent[mask] / 3_600_000, minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        within_share = within / count
+    return {"count": count, "median_ratio": group_quantiles(codes, ratio, n, (0.5,))[:, 0],
+            "within_25": within_share, "estimate_hours": est_h, "spent_hours": spent_h,
+            "without_estimate": np.bincount(cols.list_code[cols.closed & (cols.estimate == 0)], minlength=n)}
+
+
+def due_slips(cols: TaskColumns, now_ms: int, history: dict | None) -> dict:
+    """Closed late, open overdue and (from history) due dates pushed back, per list."""
+    n = len(cols.list_names)
+    has_due = cols.due > 0
+    late = cols.closed & has_due & (cols.closed_at > cols.due)
+    overdue = ~cols.closed & has_due & (cols.due < now_ms)
+    result = {
+        "closed_late": np.bincount(cols.list_code[late], minlength=n),
+        "closed_with_due": np.bincount(cols.list_code[cols.closed & has_due], minlength=n),
+        "overdue": np.bincount(cols.list_code[overdue], minlength=n),
+        "overdue_days": np.bincount(cols.list_code[overdue], weights=(now_ms - cols.due[overdue]) / DAY_MS,
+                                    minlength=n),
+        "pushed_tasks": None,
+        "pushed_days": None,
+    }
+    if history and history["versions"]:
+        task, due, codes = history["task"], history["due"], history["list_code"]
+        same_task = task[1:] == task[:-1]
+        pushed = same_task & (due[:-1] > 0) & (due[1:] > due[:-1])
+        idx = np.nonzero(pushed)[0] + 1
+        idx = idx[codes[idx] >= 0]
+        # Count each task once per list, however often it slipped
+        first = np.unique(task[idx], return_index=True)[1]
+        result["pushed_tasks"] = np.bincount(codes[idx][first], minlength=n)
+        result["pushed_days"] = np.bincount(codes[idx], weights=(due[idx] - due[idx - 1]) / DAY_MS, minlength=n)
+    return result
+
+
+# ── Report ────────────────────────────────────────────────────────────────────
+
+def _fmt(value, digits=1) -> str:
+    return "–" if value is None or (isinstance(value, float) and np.isnan(value)) else f"{value:.{digits}f}"
+
+
+def render_report(cols: TaskColumns, history: dict | None, now_ms: int, weeks: int = DEFAULT_WEEKS,
+                  synced_at: str = "") -> tuple[str, float]:
+    """Compute every metric and render the markdown report; returns (text, compute ms)."""
+    start = time.perf_counter()
+    vel = velocity(cols, now_ms, weeks)
+    cyc = cycle_times(cols)
+    est = estimate_accuracy(cols)
+    slip = due_slips(cols, now_ms, history)
+    compute_ms = (time.perf_counter() - start) * 1000
+
+    names = cols.list_names
+    lines = ["# Project Analytics\n"]
+    lines.append(f"**Synced:** {synced_at}  ")
+    versions = f", {history['versions']} task-versions from history" if history else ""
+    lines.append(f"**Data:** {len(cols)} tasks{versions} — computed in {compute_ms:.0f} ms\n")
+
+    lines.append(f"## Velocity (tasks closed per week, last {weeks} weeks)\n")
+    lines.append("| List | " + " | ".join(f"W-{weeks - 1 - i}" if i < weeks - 1 else "This wk" for i in range(weeks))
+                 + " | Avg/wk |")
+    lines.append("|---" * (weeks + 2) + "|")
+    for i in np.argsort(-vel.sum(axis=1), kind="stable"):
+        if vel[i].sum():
+            lines.append(f"| {names[i]} | " + " | ".join(str(v) for v in vel[i]) + f" | {vel[i].mean():.1f} |")
+    lines.append(f"| **All lists** | " + " | ".join(str(v) for v in vel.sum(axis=0))
+                 + f" | {vel.sum(axis=0).mean():.1f} |\n")
+
+    lines.append("## Cycle Time (created → closed, days)\n")
+    lines.append("| List | Closed | Median | P90 | Mean |")
+    lines.append("|------|--------|--------|-----|------|")
+    for i in np.argsort(-cyc["count"], kind="stable"):
+        if cyc["count"][i]:
+            lines.append(f"| {names[i]} | {cyc['count'][i]} | {_fmt(cyc['median'][i])} | "
+                         f"{_fmt(cyc['p90'][i])} | {_fmt(cyc['mean'][i])} |")
+    lines.append(f"| **All lists** | {cyc['count'].sum()} | {_fmt(float(cyc['overall_median']))} | "
+                 f"{_fmt(float(cyc['overall_p90']))} | – |\n")
+
+    lines.append("## Estimate Accuracy (closed tasks with estimate and tracked time)\n")
+    lines.append("| List | Tasks | Spent/Est (median) | Within ±25% | Est h | Spent h | Closed w/o estimate |")
+    lines.append("|------|-------|--------------------|-------------|-------|---------|---------------------|")
+    for i in range(len(names)):
+        if est["count"][i] or est["without_estimate"][i]:
+            within = _fmt(est["within_25"][i] * 100, 0) + "%" if est["count"][i] else "–"
+            lines.append(f"| {names[i]} | {est['count'][i]} | {_fmt(est['median_ratio'][i], 2)} | {within} | "
+                         f"{est['estimate_hours'][i]:.0f} | {est['spent_hours'][i]:.0f} | "
+                         f"{est['without_estimate'][i]} |")
+    lines.append("")
+
+    lines.append("## Due Date Slips\n")
+    header = "| List | Closed late | Overdue (open) | Avg days overdue |"
+    rule = "|------|-------------|----------------|------------------|"
+    if slip["pushed_tasks"] is not None:
+        header += " Due date pushed | Days pushed |"
+        rule += "-----------------|-------------|"
+    lines += [header, rule]
+    for i in range(len(names)):
+        row_has = slip["closed_late"][i] or slip["overdue"][i]
+        if slip["pushed_tasks"] is not None:
+            row_has = row_has or slip["pushed_tasks"][i]
+        if not row_has:
+            continue
+        avg_overdue = slip["overdue_days"][i] / slip["overdue"][i] if slip["overdue"][i] else float("nan")
+        row = (f"| {names[i]} | {slip['closed_late'][i]}/{slip['closed_with_due'][i]} | {slip['overdue'][i]} | "
+               f"{_fmt(avg_overdue)} |")
+        if slip["pushed_tasks"] is not None:
+            row += f" {slip['pushed_tasks'][i]} | {slip['pushed_days'][i]:.0f} |"
+        lines.append(row)
+    if slip["pushed_tasks"] is None:
+        lines.append("\n_Due date changes need the snapshot history (written by each sync)._")
+    lines.append("")
+    return "\n".join(lines), compute_ms
+
+
+def write_report(state_db: Path = STATE_DB, history_db: Path = HISTORY_DB, output: Path = REPORT_FILE,
+                 weeks: int = DEFAULT_WEEKS) -> float | None:
+    """Load the store (+ history) and write the report; returns compute ms or None."""
+    conn = open_state_db(state_db)
+    if conn is None:
+        return None
+    cols = load_columns(conn)
+    synced_at = read_meta(conn).get("synced_at", "")
+    conn.close()
+    history = load_due_history(history_db, cols)
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    text, compute_ms = render_report(cols, history, now_ms, weeks, synced_at)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(text)
+    return compute_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized throughput analytics over synced ClickUp tasks")
+    parser.add_argument("--weeks", type=int, default=DEFAULT_WEEKS, help="Velocity window in weeks")
+    parser.add_argument("--output", type=Path, default=REPORT_FILE)
+    parser.add_argument("--db", type=Path, default=STATE_DB)
+    parser.add_argument("--history", type=Path, default=HISTORY_DB)
+    args = parser.parse_args()
+
+    if not HAVE_NUMPY:
+        print("❌ numpy is required: pip install numpy")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    compute_ms = write_report(args.db, args.history, args.output, args.weeks)
+    if compute_ms is None:
+        print(f"❌ {args.db} not found — run sync_clickup_state.py first")
+        sys.exit(1)
+    print(f"📊 Wrote {args.output} (metrics {compute_ms:.0f} ms, total {time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Query Synced ClickUp Tasks
+
+Ad-hoc filters over docs/clickup-project-state.sqlite, answered from the
+store's secondary indexes (due date, open-by-due-date, priority, list)
+without loading the JSON state or calling ClickUp.
+
+Examples:
+  # Due in the next 7 days, High or Urgent, not closed
+  python3 scripts/query_tasks.py --due-within 7 --priority high --open
+
+  # Tasks without estimates in Performance Optimization
+  python3 scripts/query_tasks.py --list "performance optimization" --no-estimate
+
+  # Everything overdue, subtasks included, as JSON
+  python3 scripts/query_tasks.py --overdue --open --subtasks --json
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from state_db import STATE_DB, open_state_db, query_tasks, read_meta
+
+PRIORITY_IDS = {"urgent": 1, "high": 2, "normal": 3, "low": 4}
+PRIORITY_LABELS = {v: k.capitalize() for k, v in PRIORITY_IDS.items()}
+
+
+def parse_priority(value: str) -> int:
+    """Accept a priority name or id (1 = Urgent ... 4 = Low)."""
+    key = value.strip().lower()
+    if key in PRIORITY_IDS:
+        return PRIORITY_IDS[key]
+    if key.isdigit() and 1 <= int(key) <= 4:
+        return int(key)
+    raise argparse.ArgumentTypeError(f"unknown priority {value!r} (urgent, high, normal, low or 1-4)")
+
+
+def parse_date_ms(value: str) -> int:
+    """YYYY-MM-DD (UTC midnight) → epoch ms."""
+    try:
+        dt = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+    return int(dt.timestamp() * 1000)
+
+
+def format_date(epoch_ms) -> str:
+    if not epoch_ms:
+        return ""
+    return datetime.fromtimestamp(epoch_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def format_estimate(ms) -> str:
+    return f"{ms / 3_600_000:.1f}h" if ms else ""
+
+
+def print_table(rows):
+    print(f"{'Due':<10}  {'Priority':<8}  {'Status':<14}  {'Est':>5}  {'List':<28}  Task")
+    for r in rows:
+        name = f"↳ {r['name']}" if r["parent"] else r["name"]
+        print(f"{format_date(r['due_date']):<10}  {PRIORITY_LABELS.get(r['priority'], ''):<8}  "
+              f"{(r['status'] or '')[:14]:<14}  {format_estimate(r['time_estimate']):>5}  "
+              f"{(r['list_name'] or '')[:28]:<28}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query synced ClickUp tasks from the SQLite store")
+    due = parser.add_argument_group("due date")
+    due.add_argument("--due-within", type=float, metavar="DAYS",
+                     help="Due within the next N days (overdue included, like the summary's deadline table)")
+    due.add_argument("--overdue", action="store_true", help="Due before now")
+    due.add_argument("--due-after", type=parse_date_ms, metavar="YYYY-MM-DD")
+    due.add_argument("--due-before", type=parse_date_ms, metavar="YYYY-MM-DD")
+    parser.add_argument("--priority", type=parse_priority, metavar="LEVEL",
+                        help="This priority or more urgent (urgent, high, normal, low)")
+    parser.add_argument("--open", action="store_true", help="Exclude closed tasks")
+    parser.add_argument("--status-type", choices=("open", "custom", "closed"),
+                        help="ClickUp status type")
+    parser.add_argument("--list", dest="list_name", metavar="NAME",
+                        help="List or folder name (case-insensitive substring)")
+    parser.add_argument("--no-estimate", action="store_true", help="Only tasks without a time estimate")
+    parser.add_argument("--subtasks", action="store_true", help="Include subtasks")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    parser.add_argument("--db", type=Path, default=STATE_DB, help="State store to query")
+    args = parser.parse_args()
+
+    conn = open_state_db(args.db)
+    if conn is None:
+        print(f"❌ {args.db} not found — run sync_clickup_state.py first")
+        sys.exit(1)
+
+    now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+    due_before = args.due_before
+    if args.due_within is not None:
+        cutoff = now_ms + int(timedelta(days=args.due_within).total_seconds() * 1000)
+        due_before = cutoff if due_before is None else min(due_before, cutoff)
+    if args.overdue:
+        due_before = now_ms if due_before is None else min(due_before, now_ms)
+
+    start = time.perf_counter()
+    rows = query_tasks(
+        conn,
+        due_after=args.due_after,
+        due_before=due_before,
+        max_priority=args.priority,
+        open_only=args.open,
+        status_type=args.status_type,
+        list_name=args.list_name,
+        no_estimate=args.no_estimate,
+        subtasks=args.subtasks,
+        limit=args.limit,
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps([dict(r) for r in rows], indent=2))
+        return
+
+    synced = read_meta(conn).get("synced_at", "?")
+    conn.close()
+    if rows:
+        print_table(rows)
+    print(f"\n🔎 {len(rows)} task(s) in {elapsed_ms:.1f} ms (state synced {synced})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Cross-Process ClickUp Rate Budget
+
+The sync (cron), the inbox sort and ad-hoc update scripts often run at the
+same time with the same CLICKUP_API_KEY. Paced separately, each one spends
+the whole per-token budget and they trigger each other's 429s. Every
+ClickUpClient with an API key therefore draws from one shared token bucket
+per API key, kept in a small JSON file under an exclusive flock:
+  - the bucket refills at BUDGET_HEADROOM of the token's per-minute limit,
+    so the combined rate stays just under it
+  - any process's 429 (or a response showing less budget left than the
+    bucket holds) drains the bucket for everyone until the reset
+  - callers register as waiters with a priority class; while an
+    "interactive" caller (sort, manual updates) waits, "background" ones
+    (sync, webhook reconciles) don't take tokens
+
+Waiter entries carry a heartbeat, so a killed process stops counting after
+WAITER_TTL seconds. The file holds a hash of the key, never the key itself.
+Without fcntl (Windows) each client falls back to its own header pacing.
+
+Usage:
+  python3 scripts/rate_budget.py                  (show every budget file)
+  CLICKUP_SHARED_BUDGET=0 python3 scripts/...     (opt a process out)
+
+Config: CLICKUP_TOKEN_RATE_LIMIT (req/min, default 100), CLICKUP_BUDGET_DIR
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # optional: shared_budget() returns None without it
+    fcntl = None
+
+HAVE_FCNTL = fcntl is not None
+
+BUDGET_DIR = Path(os.getenv("CLICKUP_BUDGET_DIR", Path(tempfile.gettempdir()) / "benefitguard-clickup"))
+TOKEN_RATE_LIMIT = int(os.getenv("CLICKUP_TOKEN_RATE_LIMIT", "100"))
+SHARED_BUDGET_ENABLED = os.getenv("CLICKUP_SHARED_BUDGET", "1") != "0"
+
+BUDGET_HEADROOM = 0.95      # share of the token's limit the processes may use together
+WAITER_TTL = 2.0            # seconds before a waiter without a heartbeat is dropped
+POLL_INTERVAL = 0.25        # longest sleep between checks while waiting
+MAX_BLOCK = 65.0            # cap on a header-imposed block (clock skew guard)
+
+# Lower number wins while both are waiting
+PRIORITIES = {"interactive": 0, "background": 1}
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Retry-After as seconds: either a number or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def budget_path(api_key: str, directory: Path = BUDGET_DIR) -> Path:
+    return directory / f"budget-{hashlib.sha256(api_key.encode()).hexdigest()[:16]}.json"
+
+
+class SharedBudget:
+    """One process's handle on the per-token bucket file."""
+
+    def __init__(self, path: Path, rate_per_min: int = TOKEN_RATE_LIMIT, priority: str = "background"):
+        if priority not in PRIORITIES:
+            raise ValueError(f"unknown priority {priority!r} (expected one of {', '.join(PRIORITIES)})")
+        self.path = path
+        self.rate = rate_per_min * BUDGET_HEADROOM / 60.0
+        self.capacity = float(max(1, rate_per_min // 10))
+        self.priority = priority
+        self.rank = PRIORITIES[priority]
+        self.dir_ready = False  # the directory is created on first use, not on construction
+
+    def _update(self, change):
+        """Run ``change(state, now)`` on the file's state under an exclusive lock."""
+        if not self.dir_ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.dir_ready = True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 1 << 16)
+            try:
+                state = json.loads(raw) if raw else {}
+            except ValueError:
+                state = {}
+            now = time.time()
+            tokens = state.get("tokens", self.capacity)
+            elapsed = max(0.0, now - state.get("updated", now))
+            state["tokens"] = min(self.capacity, tokens + elapsed * self.rate)
+            state["updated"] = now
+            state.setdefault("blocked_until", 0.0)
+            state["waiters"] = {k: w for k, w in state.get("waiters", {}).items() if now - w[1] <= WAITER_TTL}
+            result = change(state, now)
+            data = json.dumps(state, separators=(",", ":")).encode()
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, data)
+            return result
+        finally:
+            os.close(fd)  # releases the lock
+
+    def acquire(self) -> float:
+        """Block until this caller may send one request. Returns the seconds slept."""
+        me = f"{os.getpid()}:{threading.get_ident()}"
+
+        def take(state, now):
+            waiters = state["waiters"]
+            waiters[me] = [self.rank, now]
+            if state["blocked_until"] > now:
+                return min(state["blocked_until"] - now, POLL_INTERVAL)
+            if any(rank < self.rank for rank, _ in waiters.values()):
+                return POLL_INTERVAL  # a higher-priority caller goes first
+            if state["tokens"] >= 1:
+                state["tokens"] -= 1
+                del waiters[me]
+                return 0.0
+            return min((1 - state["tokens"]) / self.rate, POLL_INTERVAL)
+
+        slept = 0.0
+        while True:
+            wait = self._update(take)
+            if wait <= 0:
+                return slept
+            time.sleep(wait)
+            slept += wait
+
+    def observe(self, headers, status: int):
+        """Share what a response said about the token's budget with every process."""
+        if status == 429:
+            block = retry_after_seconds(headers.get("Retry-After"))
+            if block is None:
+                try:
+                    block = float(headers.get("X-RateLimit-Reset")) + 1 - time.time()
+                except (TypeError, ValueError):
+                    block = 1.0
+            block = min(max(block, 0.0), MAX_BLOCK)
+
+            def drain(state, now):
+                state["tokens"] = 0.0
+                state["blocked_until"] = max(state["blocked_until"], now + block)
+            self._update(drain)
+            return
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if remaining < self.capacity:  # someone outside the budget is spending it too
+
+            def clamp(state, now):
+                state["tokens"] = min(state["tokens"], float(remaining))
+            self._update(clamp)
+
+    def snapshot(self) -> dict:
+        return self._update(lambda state, now: dict(state))
+
+
+def shared_budget(api_key: str, priority: str = "background",
+                  rate_per_min: int = TOKEN_RATE_LIMIT) -> SharedBudget | None:
+    """The shared bucket for ``api_key``, or None when disabled, keyless or unsupported."""
+    if not api_key or not SHARED_BUDGET_ENABLED or not HAVE_FCNTL:
+        return None
+    return SharedBudget(budget_path(api_key), rate_per_min, priority)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the shared per-token ClickUp rate budgets")
+    parser.add_argument("--dir", type=Path, default=BUDGET_DIR)
+    args = parser.parse_args()
+
+    if not HAVE_FCNTL:
+        print("❌ Shared budgets need fcntl (POSIX)")
+        return
+    files = sorted(args.dir.glob("budget-*.json"))
+    if not files:
+        print(f"No budget files in {args.dir}")
+        return
+    for path in files:
+        state = SharedBudget(path).snapshot()
+        blocked = state["blocked_until"] - time.time()
+        print(f"🪣 {path.name}: {state['tokens']:.1f} token(s)"
+              + (f", blocked {blocked:.1f}s" if blocked > 0 else ""))
+        names = {rank: name for name, rank in PRIORITIES.items()}
+        for waiter, (rank, _) in state["waiters"].items():
+            print(f"   ⏳ {waiter} waiting ({names.get(rank, rank)})")
+
+
+if __name__ == "__main__":
+    main()
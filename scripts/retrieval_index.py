@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Existing-Task Retrieval Index
+
+Offline TF-IDF index over the names and descriptions of every synced task
+and subtask, so the inbox sorter can show the LLM the existing tasks that
+actually relate to each brain dump instead of the first 80 in list order.
+
+sync_clickup_state.py builds docs/clickup-task-index.bin after every sync.
+The file is a JSON header (vocabulary, task names, array offsets) followed
+by raw little-endian arrays — an inverted index of L2-normalized TF-IDF
+weights — which the sorter memory-maps instead of loading:
+  idf         float32[terms]
+  term_ptr    int64[terms + 1]   postings of term t: term_ptr[t]:term_ptr[t+1]
+  post_doc    int32[postings]    document (task) index
+  post_weight float32[postings]  tf-idf weight of the term in that document
+
+A query scores documents with one bincount over the postings of its terms;
+subtask hits count toward their top-level parent, since only top-level
+tasks can take new subtasks.
+
+Usage:
+  python3 scripts/retrieval_index.py "add tests for rate limiting" [--top 10]
+  python3 scripts/retrieval_index.py --build    (rebuild from the SQLite store)
+
+Requires: numpy (the sorter falls back to the first 80 task names without it)
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # optional: callers check HAVE_NUMPY
+    np = None
+
+HAVE_NUMPY = np is not None
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DOCS_DIR = PROJECT_ROOT / "docs"
+INDEX_FILE = DOCS_DIR / "clickup-task-index.bin"
+
+MAGIC = b"BGTIDX1\n"
+DESCRIPTION_CHARS = 2000   # description text indexed per task
+NAME_WEIGHT = 2            # name terms count this many times
+DEFAULT_TOP_K = 15
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or so that the their this
+to was were will with we our you your i not no all any can should would could do does via per
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def document_terms(name: str, description: str) -> Counter:
+    terms = Counter(tokenize(description[:DESCRIPTION_CHARS]))
+    for term in tokenize(name):
+        terms[term] += NAME_WEIGHT
+    return terms
+
+
+def _weights(counts: Counter, idf: dict[str, float]) -> dict[str, float]:
+    """Log-scaled tf × idf, L2-normalized."""
+    weights = {t: (1 + math.log(c)) * idf[t] for t, c in counts.items() if t in idf}
+    norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+    return {t: w / norm for t, w in weights.items()}
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+
+def iter_state_tasks(state: dict):
+    """Yield (task_id, name, description, parent_id) for every task and subtask in a state dict."""
+    for lst in state.get("lists", []):
+        for task in lst.get("tasks", []):
+            yield task["id"], task.get("name", ""), task.get("description") or "", None
+            for sub in task.get("_subtasks", []):
+                yield sub["id"], sub.get("name", ""), sub.get("description") or "", task["id"]
+
+
+def build_index(tasks, path: Path = INDEX_FILE) -> dict:
+    """Build the index from (task_id, name, description, parent_id) rows and write it atomically."""
+    ids, names, parent_ids, doc_terms = [], [], [], []
+    df: Counter = Counter()
+    for task_id, name, description, parent_id in tasks:
+        terms = document_terms(name, description)
+        ids.append(task_id)
+        names.append(name)
+        parent_ids.append(parent_id)
+        doc_terms.append(terms)
+        df.update(terms.keys())
+
+    n_docs = len(ids)
+    vocab = sorted(df)
+    term_index = {t: i for i, t in enumerate(vocab)}
+    idf = {t: math.log((1 + n_docs) / (1 + df[t])) + 1 for t in vocab}
+
+    # Invert doc → terms into term-major postings
+    postings: list[list[tuple[int, float]]] = [[] for _ in vocab]
+    for doc, terms in enumerate(doc_terms):
+        for term, weight in _weights(terms, idf).items():
+            postings[term_index[term]].append((doc, weight))
+    lengths = [len(p) for p in postings]
+    flat = [entry for p in postings for entry in p]
+
+    position = {task_id: i for i, task_id in enumerate(ids)}
+    arrays = {
+        "idf": np.array([idf[t] for t in vocab], dtype="<f4"),
+        "term_ptr": np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]).astype("<i8"),
+        "post_doc": np.array([d for d, _ in flat], dtype="<i4"),
+        "post_weight": np.array([w for _, w in flat], dtype="<f4"),
+        # Top-level task each document counts toward (itself for top-level tasks)
+        "root": np.array([position.get(p, i) if p else i for i, p in enumerate(parent_ids)], dtype="<i4"),
+    }
+    header = {"vocab": vocab, "ids": ids, "names": names, "built_at": time.time(), "arrays": {}}
+    offset = 0
+    for key, arr in arrays.items():
+        header["arrays"][key] = {"offset": offset, "dtype": arr.dtype.str, "length": len(arr)}
+        offset += (arr.nbytes + 7) // 8 * 8
+    header_bytes = json.dumps(header, separators=(",", ":"), ensure_ascii=False).encode()
+    header_bytes += b" " * (-(len(MAGIC) + 8 + len(header_bytes)) % 8)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header_bytes).to_bytes(8, "little"))
+            f.write(header_bytes)
+            for arr in arrays.values():
+                f.write(arr.tobytes())
+                f.write(b"\0" * (-arr.nbytes % 8))
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return {"documents": n_docs, "terms": len(vocab), "postings": len(flat), "bytes": path.stat().st_size}
+
+
+# ── Query ─────────────────────────────────────────────────────────────────────
+
+class RetrievalIndex:
+    """Memory-mapped view of an index file."""
+
+    def __init__(self, path: Path = INDEX_FILE):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a task index")
+            header_len = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_len))
+        base = len(MAGIC) + 8 + header_len
+        self.ids: list[str] = header["ids"]
+        self.names: list[str] = header["names"]
+        self.built_at: float = header["built_at"]
+        self.term_index = {t: i for i, t in enumerate(header["vocab"])}
+        for key, spec in header["arrays"].items():
+            arr = np.memmap(path, dtype=spec["dtype"], mode="r", offset=base + spec["offset"],
+                            shape=(spec["length"],)) if spec["length"] else np.zeros(0, dtype=spec["dtype"])
+            setattr(self, key, arr)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_FILE) -> "RetrievalIndex | None":
+        """Open the index, or None when it is missing, unreadable or numpy is unavailable."""
+        if not HAVE_NUMPY or not path.exists():
+            return None
+        try:
+            return cls(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"  ⚠️  Task index unusable ({e}); using the first existing tasks instead")
+            return None
+
+    def search(self, text: str, k: int = DEFAULT_TOP_K) -> list[tuple[str, float]]:
+        """Top-k top-level task names for ``text`` as (name, cosine score), best first."""
+        counts = Counter(tokenize(text))
+        terms = [self.term_index[t] for t in counts if t in self.term_index]
+        if not terms:
+            return []
+        tf = np.array([1 + math.log(counts[t]) for t in counts if t in self.term_index], dtype=np.float32)
+        q = tf * self.idf[terms]
+        q /= np.linalg.norm(q) or 1.0
+
+        starts, ends = self.term_ptr[terms], self.term_ptr[np.array(terms) + 1]
+        docs = np.concatenate([self.post_doc[s:e] for s, e in zip(starts, ends)])
+        weights = np.concatenate([self.post_weight[s:e] * w for s, e, w in zip(starts, ends, q)])
+        scores = np.bincount(docs, weights=weights, minlength=len(self.ids))
+
+        # A subtask hit makes its parent a candidate
+        by_root = np.zeros(len(self.ids))
+        np.maximum.at(by_root, self.root, scores)
+        hits = np.flatnonzero(by_root > 0)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-by_root[hits], k)[:k]]
+        hits = hits[np.argsort(-by_root[hits], kind="stable")]
+        return [(self.names[i], round(float(by_root[i]), 4)) for i in hits]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search or rebuild the existing-task retrieval index")
+    parser.add_argument("query", nargs="?", help="Brain dump text to find related existing tasks for")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP_K)
+    parser.add_argument("--build", action="store_true", help="Rebuild the index from the SQLite store")
+    parser.add_argument("--index", type=Path, default=INDEX_FILE)
+    args = parser.parse_args()
+
+    if not HAVE_NUMPY:
+        print("❌ numpy is required: pip install numpy")
+        sys.exit(1)
+
+    if args.build:
+        from state_db import STATE_DB, export_state, open_state_db
+
+        conn = open_state_db(STATE_DB)
+        if conn is None:
+            print(f"❌ {STATE_DB} not found — run sync_clickup_state.py first")
+            sys.exit(1)
+        start = time.perf_counter()
+        info = build_index(iter_state_tasks(export_state(conn)), args.index)
+        print(f"🔎 Indexed {info['documents']} tasks, {info['terms']} terms "
+              f"({info['bytes'] / 1024:.0f} KB) in {time.perf_counter() - start:.2f}s")
+    if args.query:
+        index = RetrievalIndex.load(args.index)
+        if index is None:
+            print(f"❌ {args.index} not found — run a sync or --build first")
+            sys.exit(1)
+        start = time.perf_counter()
+        results = index.search(args.query, args.top)
+        elapsed = (time.perf_counter() - start) * 1000
+        for name, score in results:
+            print(f"  {score:.3f}  {name}")
+        print(f"\n{len(results)} candidate(s) in {elapsed:.2f} ms")
+    elif not args.build:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
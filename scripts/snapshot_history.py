@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Compressed Snapshot History
+
+Keeps every synced state in docs/clickup-history.sqlite without storing a
+full copy per sync:
+  - the first snapshot stores every task in full
+  - later snapshots store, per task, only the fields that changed since the
+    task's previous version (keyed by task id, skipped when the content
+    hash is unchanged); deletions are tombstones
+  - list names, folders and task order are versioned per list the same way
+  - bodies are zlib-compressed with a shared preset dictionary, which
+    matters for small per-task records
+
+Storage grows with churn, not with syncs × project size. Any snapshot is
+rebuilt by folding each task's versions up to it, and diff() lists what
+changed between two sync times.
+
+Usage:
+  python3 scripts/snapshot_history.py list
+  python3 scripts/snapshot_history.py show 2026-04-11 [--output state.json] [--format pretty]
+  python3 scripts/snapshot_history.py diff 2026-04-01 2026-04-11
+  python3 scripts/snapshot_history.py record            # archive the current state store
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+from state_db import META_KEYS, STATE_DB, export_state, open_state_db
+from state_io import DEFAULT_STATE_FORMAT, STATE_FORMATS, write_state
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DOCS_DIR = PROJECT_ROOT / "docs"
+HISTORY_DB = DOCS_DIR / "clickup-history.sqlite"
+
+# Preset dictionary for compressing small task records. Stored bodies depend
+# on it byte for byte: never edit it, add a new version instead.
+ZDICT_VERSION = "1"
+ZDICT = json.dumps({
+    "id": "", "name": "", "parent": None, "list": {"id": "", "name": ""},
+    "folder": {"id": "", "name": ""}, "status": {"status": "to do", "type": "open"},
+    "priority": {"id": "3", "priority": "normal"}, "start_date": None, "due_date": None,
+    "time_estimate": None, "time_spent": None, "date_created": "", "date_updated": "",
+    "date_closed": None, "date_done": None, "tags": [], "url": "https://app.clickup.com/t/",
+    "in progress": "custom", "complete": "closed", "high": "2", "urgent": "1", "low": "4",
+}, separators=(",", ":")).encode()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS snapshots (
+    snap_id INTEGER PRIMARY KEY,
+    synced_at TEXT NOT NULL UNIQUE,
+    meta BLOB NOT NULL,
+    tasks INTEGER NOT NULL,
+    changed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_versions (
+    task_id TEXT NOT NULL,
+    snap_id INTEGER NOT NULL,
+    hash TEXT,              -- NULL: deleted in this snapshot
+    delta BLOB,             -- changed fields {"set": {...}, "unset": [...]}, full on first version
+    PRIMARY KEY (task_id, snap_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_task_versions_snap ON task_versions(snap_id);
+CREATE TABLE IF NOT EXISTS list_versions (
+    list_id TEXT NOT NULL,
+    snap_id INTEGER NOT NULL,
+    hash TEXT,              -- NULL: list gone in this snapshot
+    body BLOB,              -- name, folder, position and task order
+    PRIMARY KEY (list_id, snap_id)
+) WITHOUT ROWID;
+"""
+
+
+def compress(obj) -> bytes:
+    c = zlib.compressobj(9, zdict=ZDICT)
+    return c.compress(json.dumps(obj, separators=(",", ":"), default=str).encode()) + c.flush()
+
+
+def decompress(blob: bytes):
+    d = zlib.decompressobj(zdict=ZDICT)
+    return json.loads(d.decompress(blob) + d.flush())
+
+
+def content_hash(obj) -> str:
+    raw = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def field_delta(old: dict, new: dict) -> dict:
+    """Fields of ``new`` that differ from ``old`` plus fields it dropped."""
+    delta = {"set": {k: v for k, v in new.items() if k not in old or old[k] != v}}
+    unset = [k for k in old if k not in new]
+    if unset:
+        delta["unset"] = unset
+    return delta
+
+
+def apply_delta(task: dict, delta: dict) -> dict:
+    task = {**task, **delta["set"]}
+    for key in delta.get("unset", ()):
+        task.pop(key, None)
+    return task
+
+
+def flatten_state(state: dict) -> tuple[dict[str, dict], dict[str, dict]]:
+    """Split a state dict into {task_id: task} and {list_id: list layout}."""
+    tasks, layouts = {}, {}
+    for pos, lst in enumerate(state.get("lists", [])):
+        order = []
+        for task in lst.get("tasks", []):
+            tasks[task["id"]] = {k: v for k, v in task.items() if k != "_subtasks"}
+            subs = task.get("_subtasks", [])
+            for sub in subs:
+                tasks[sub["id"]] = sub
+            order.append([task["id"], [sub["id"] for sub in subs]])
+        layouts[lst["list_id"]] = {
+            "position": pos,
+            "list_name": lst.get("list_name"),
+            "folder_name": lst.get("folder_name"),
+            "folder_id": lst.get("folder_id"),
+            "order": order,
+        }
+    return tasks, layouts
+
+
+# ── Store ─────────────────────────────────────────────────────────────────────
+
+def open_history(path: Path = HISTORY_DB) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    row = conn.execute("SELECT value FROM info WHERE key = 'zdict'").fetchone()
+    if row is None:
+        conn.execute("INSERT INTO info VALUES ('zdict', ?)", (ZDICT_VERSION,))
+        conn.commit()
+    elif row[0] != ZDICT_VERSION:
+        raise RuntimeError(f"{path} uses compression dictionary v{row[0]}, expected v{ZDICT_VERSION}")
+    return conn
+
+
+def _fold_versions(conn: sqlite3.Connection, table: str, key: str, snap_id: int):
+    """Yield (key, hash, folded body) for rows alive at ``snap_id``."""
+    body_col = "delta" if table == "task_versions" else "body"
+    current_key, current, current_hash = None, None, None
+    rows = conn.execute(
+        f"SELECT {key}, hash, {body_col} FROM {table} WHERE snap_id <= ? ORDER BY {key}, snap_id",
+        (snap_id,),
+    )
+    for row_key, row_hash, blob in rows:
+        if row_key != current_key:
+            if current is not None:
+                yield current_key, current_hash, current
+            current_key, current, current_hash = row_key, None, None
+        if row_hash is None:
+            current, current_hash = None, None
+        elif table == "task_versions":
+            current = apply_delta(current or {}, decompress(blob))
+            current_hash = row_hash
+        else:
+            current, current_hash = decompress(blob), row_hash
+    if current is not None:
+        yield current_key, current_hash, current
+
+
+def _latest_hashes(conn: sqlite3.Connection, table: str, key: str) -> dict[str, str]:
+    """Current content hash of every live row (no decompression)."""
+    rows = conn.execute(f"SELECT {key}, hash, MAX(snap_id) FROM {table} GROUP BY {key}")
+    return {row_key: row_hash for row_key, row_hash, _ in rows if row_hash is not None}
+
+
+def _current_task(conn: sqlite3.Connection, task_id: str) -> dict:
+    """Fold one task's versions into its latest body."""
+    task: dict = {}
+    for row_hash, blob in conn.execute(
+        "SELECT hash, delta FROM task_versions WHERE task_id = ? ORDER BY snap_id", (task_id,)
+    ):
+        task = {} if row_hash is None else apply_delta(task, decompress(blob))
+    return task
+
+
+def latest_snapshot(conn: sqlite3.Connection) -> int | None:
+    return conn.execute("SELECT MAX(snap_id) FROM snapshots").fetchone()[0]
+
+
+def record_snapshot(state: dict, path: Path = HISTORY_DB) -> dict:
+    """Append ``state`` to the history; returns counts of what was stored."""
+    conn = open_history(path)
+    try:
+        synced_at = state["synced_at"]
+        if conn.execute("SELECT 1 FROM snapshots WHERE synced_at = ?", (synced_at,)).fetchone():
+            return {"snap_id": None, "changed": 0, "lists_changed": 0}
+
+        prev_tasks = _latest_hashes(conn, "task_versions", "task_id")
+        prev_lists = _latest_hashes(conn, "list_versions", "list_id")
+
+        tasks, layouts = flatten_state(state)
+        meta = {k: state.get(k) for k in META_KEYS}
+        cur = conn.execute("INSERT INTO snapshots (synced_at, meta, tasks, changed) VALUES (?, ?, ?, 0)",
+                           (synced_at, compress(meta), len(tasks)))
+        snap_id = cur.lastrowid
+
+        task_rows = []
+        for task_id, task in tasks.items():
+            h = content_hash(task)
+            old_hash = prev_tasks.get(task_id)
+            if old_hash == h:
+                continue
+            delta = field_delta(_current_task(conn, task_id), task) if old_hash else {"set": task}
+            task_rows.append((task_id, snap_id, h, compress(delta)))
+        task_rows += [(task_id, snap_id, None, None) for task_id in prev_tasks.keys() - tasks.keys()]
+
+        list_rows = []
+        for list_id, layout in layouts.items():
+            h = content_hash(layout)
+            if prev_lists.get(list_id) != h:
+                list_rows.append((list_id, snap_id, h, compress(layout)))
+        list_rows += [(list_id, snap_id, None, None) for list_id in prev_lists.keys() - layouts.keys()]
+
+        conn.executemany("INSERT INTO task_versions VALUES (?, ?, ?, ?)", task_rows)
+        conn.executemany("INSERT INTO list_versions VALUES (?, ?, ?, ?)", list_rows)
+        conn.execute("UPDATE snapshots SET changed = ? WHERE snap_id = ?", (len(task_rows), snap_id))
+        conn.commit()
+        return {"snap_id": snap_id, "changed": len(task_rows), "lists_changed": len(list_rows)}
+    finally:
+        conn.close()
+
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+
+def list_snapshots(conn: sqlite3.Connection) -> list[tuple]:
+    """(snap_id, synced_at, tasks, changed) for every snapshot, oldest first."""
+    return conn.execute("SELECT snap_id, synced_at, tasks, changed FROM snapshots ORDER BY snap_id").fetchall()
+
+
+def resolve_snapshot(conn: sqlite3.Connection, when: str) -> int | None:
+    """Snapshot id for ``when``: "#<id>", "latest", or the last sync at or before a date/time."""
+    if when == "latest":
+        return latest_snapshot(conn)
+    if when.startswith("#"):
+        return int(when[1:])
+    moment = datetime.fromisoformat(when)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    if len(when) == 10:  # a bare date means "by the end of that day"
+        moment = moment.replace(hour=23, minute=59, second=59, microsecond=999999)
+    best = None
+    for snap_id, synced_at, _, _ in list_snapshots(conn):
+        if datetime.fromisoformat(synced_at) <= moment:
+            best = snap_id
+    return best
+
+
+def rebuild_tasks(conn: sqlite3.Connection, snap_id: int) -> dict[str, dict]:
+    """Every task alive at ``snap_id`` (top-level and subtasks) keyed by id."""
+    return {task_id: task for task_id, _, task in _fold_versions(conn, "task_versions", "task_id", snap_id)}
+
+
+def rebuild_state(conn: sqlite3.Connection, snap_id: int) -> dict:
+    """Rebuild the state dict exactly as the sync wrote it at ``snap_id``."""
+    row = conn.execute("SELECT meta FROM snapshots WHERE snap_id = ?", (snap_id,)).fetchone()
+    if row is None:
+        raise KeyError(f"no snapshot #{snap_id}")
+    state = decompress(row[0])
+    if state.get("last_full_sync_at") is None:
+        state.pop("last_full_sync_at", None)
+
+    tasks = rebuild_tasks(conn, snap_id)
+    layouts = sorted(
+        ((list_id, layout) for list_id, _, layout in _fold_versions(conn, "list_versions", "list_id", snap_id)),
+        key=lambda item: item[1]["position"],
+    )
+    state["lists"] = [
+        {
+            "list_id": list_id,
+            "list_name": layout["list_name"],
+            "folder_name": layout["folder_name"],
+            "folder_id": layout["folder_id"],
+            "tasks": [{**tasks[tid], "_subtasks": [tasks[sid] for sid in subs]} for tid, subs in layout["order"]],
+        }
+        for list_id, layout in layouts
+    ]
+    return state
+
+
+def diff(conn: sqlite3.Connection, from_snap: int, to_snap: int) -> dict:
+    """Tasks created, deleted and changed (with field names) between two snapshots."""
+    before = rebuild_tasks(conn, from_snap)
+    changed_fields: dict[str, set] = {}
+    for task_id, h, blob in conn.execute(
+        "SELECT task_id, hash, delta FROM task_versions WHERE snap_id > ? AND snap_id <= ? ORDER BY snap_id",
+        (from_snap, to_snap),
+    ):
+        fields = changed_fields.setdefault(task_id, set())
+        if blob is not None:
+            delta = decompress(blob)
+            fields.update(delta["set"], delta.get("unset", ()))
+
+    after = rebuild_tasks(conn, to_snap)
+    created = [after[t] for t in changed_fields if t in after and t not in before]
+    deleted = [before[t] for t in changed_fields if t in before and t not in after]
+    changed = [
+        {"id": t, "name": after[t].get("name"), "fields": sorted(changed_fields[t] - {"date_updated"})}
+        for t in changed_fields if t in after and t in before
+    ]
+    return {"created": created, "deleted": deleted, "changed": [c for c in changed if c["fields"]]}
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressed history of synced ClickUp states")
+    parser.add_argument("--history", type=Path, default=HISTORY_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="List archived snapshots")
+    p_show = sub.add_parser("show", help="Rebuild a past snapshot")
+    p_show.add_argument("when", help='"latest", "#<id>", a date or an ISO time')
+    p_show.add_argument("--output", type=Path, help="Write the rebuilt state file here")
+    p_show.add_argument("--format", choices=STATE_FORMATS, default=DEFAULT_STATE_FORMAT)
+    p_diff = sub.add_parser("diff", help="What changed between two syncs")
+    p_diff.add_argument("start")
+    p_diff.add_argument("end", nargs="?", default="latest")
+    sub.add_parser("record", help="Archive the current SQLite state store")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        conn = open_state_db(STATE_DB)
+        if conn is None:
+            print(f"❌ {STATE_DB} not found — run sync_clickup_state.py first")
+            sys.exit(1)
+        result = record_snapshot(export_state(conn), args.history)
+        conn.close()
+        if result["snap_id"] is None:
+            print("ℹ️  This sync is already archived")
+        else:
+            print(f"🗄️  Snapshot #{result['snap_id']}: {result['changed']} task version(s), "
+                  f"{result['lists_changed']} list version(s)")
+        return
+
+    if not args.history.exists():
+        print(f"❌ {args.history} not found — it is written by sync_clickup_state.py")
+        sys.exit(1)
+    conn = open_history(args.history)
+
+    if args.command == "list":
+        for snap_id, synced_at, tasks, changed in list_snapshots(conn):
+            print(f"  #{snap_id:<5} {synced_at}  {tasks:>6} tasks  {changed:>6} stored")
+        print(f"\n🗄️  {args.history.stat().st_size / 1024:.0f} KB")
+    elif args.command == "show":
+        snap_id = resolve_snapshot(conn, args.when)
+        if snap_id is None:
+            print(f"❌ No snapshot at or before {args.when}")
+            sys.exit(1)
+        state = rebuild_state(conn, snap_id)
+        if args.output:
+            size = write_state(state, args.output, args.format)
+            print(f"💾 Snapshot #{snap_id} ({state['synced_at']}) → {args.output} ({size / 1024:.0f} KB)")
+        else:
+            stats = state.get("stats", {})
+            print(f"📦 Snapshot #{snap_id} synced {state['synced_at']}: {stats.get('total_tasks', 0)} tasks, "
+                  f"{stats.get('total_subtasks', 0)} subtasks, {len(state['lists'])} lists")
+    elif args.command == "diff":
+        start, end = resolve_snapshot(conn, args.start), resolve_snapshot(conn, args.end)
+        if start is None or end is None:
+            print("❌ No snapshot for one of the given times")
+            sys.exit(1)
+        changes = diff(conn, start, end)
+        print(f"🔀 #{start} → #{end}: {len(changes['created'])} created, "
+              f"{len(changes['changed'])} changed, {len(changes['deleted'])} deleted")
+        for task in changes["created"]:
+            print(f"  + {task.get('name')}")
+        for task in changes["changed"]:
+            print(f"  ~ {task['name']}  ({', '.join(task['fields'])})")
+        for task in changes["deleted"]:
+            print(f"  - {task.get('name')}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
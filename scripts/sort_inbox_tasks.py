@@ -5,12 +5,24 @@ BenefitGuard — ClickUp Brain Dump Auto-Sorter
 Monitors the "To Sort" inbox list, uses GPT-4o to classify and rewrite
 each task, then moves it to the correct list.
 
+Inbox tasks are classified several per request (--batch-size), and every
+classification is cached in docs/clickup-sort-cache.sqlite, so a rerun
+after a failure only pays for the tasks it hasn't classified yet. When the
+sync has built docs/clickup-task-index.bin, each task is sent with the
+existing tasks most related to it (retrieval_index.py) rather than the
+first 80 task names.
+
+Classification, moving and subtask creation run as a staged asyncio
+pipeline with bounded queues between the stages, so the LLM works on the
+next batch while ClickUp writes for earlier tasks are still in flight.
+
 Usage:
-  python3 scripts/sort_inbox_tasks.py
+  python3 scripts/sort_inbox_tasks.py [--batch-size N] [--no-cache]
 
 Requires: CLICKUP_API_KEY and OPENAI_API_KEY in .env
 """
 
+import argparse
 import json
 import os
 import re
@@ -19,9 +31,17 @@ import time
 from datetime import datetime, timezone
 from pathlib import Path
 
-import requests
 from dotenv import load_dotenv
 
+from classification_cache import ClassificationCache, cache_key, prompt_hash
+from clickup_client import ClickUpClient
+import sync_metrics
+from sync_metrics import finish_run, phase, start_run
+from name_matcher import DEFAULT_THRESHOLD, NameMatch, TrigramIndex
+from state_db import open_state_db
+from state_io import load_state
+from task_index import TaskEntry, TaskIndex
+
 # ── Config ────────────────────────────────────────────────────────────────────
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -29,16 +49,37 @@ load_dotenv(PROJECT_ROOT / ".env")
 
 CLICKUP_API_KEY = os.getenv("CLICKUP_API_KEY", "")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-BASE_URL = "https://api.clickup.com/api/v2"
-OPENAI_URL = "https://api.openai.com/v1/chat/completions"
-SPACE_ID = "90174101415"
-TO_SORT_LIST_ID = "901710871860"
-
-DOCS_DIR = PROJECT_ROOT / "docs"
-LOGS_DIR = PROJECT_ROOT / "logs"
+OPENAI_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1") + "/chat/completions"
+LLM_MODEL = "gpt-4o"
+LLM_TEMPERATURE = 0.3
+LLM_TIMEOUT = 30
+
+# Batched classification: tasks per request and token budgets per request
+BATCH_SIZE = int(os.getenv("SORT_BATCH_SIZE", "10"))
+LLM_INPUT_TOKEN_BUDGET = 24_000
+LLM_OUTPUT_TOKEN_BUDGET = 8_000
+LLM_OUTPUT_TOKENS_PER_TASK = 600
+# Defaults are the BenefitGuard space; sync_spaces.py sets these per space
+SPACE_ID = os.getenv("CLICKUP_SPACE_ID", "90174101415")
+TO_SORT_LIST_ID = os.getenv("CLICKUP_TO_SORT_LIST_ID", "901710871860")
+
+DOCS_DIR = Path(os.getenv("CLICKUP_DOCS_DIR", PROJECT_ROOT / "docs"))
+LOGS_DIR = Path(os.getenv("CLICKUP_LOGS_DIR", PROJECT_ROOT / "logs"))
 STATE_FILE = DOCS_DIR / "clickup-project-state.json"
+STATE_DB = DOCS_DIR / "clickup-project-state.sqlite"
 SUMMARY_FILE = DOCS_DIR / "clickup-daily-summary.md"
 SORT_LOG = LOGS_DIR / "sort-inbox.log"
+TASK_INDEX_FILE = DOCS_DIR / "clickup-task-index.bin"
+RELATED_TASKS_PER_PROMPT = 15
+CLASSIFICATION_CACHE_DB = DOCS_DIR / "clickup-sort-cache.sqlite"
+CACHE_MAX_ENTRIES = 5000
+CACHE_TTL_DAYS = 30
+
+# Sort pipeline: concurrent workers per stage and the queue between stages
+CLASSIFY_WORKERS = 2   # LLM requests in flight
+MOVE_WORKERS = 4       # inbox tasks being recreated in their list at once
+SUBTASK_WORKERS = 4    # tasks getting their suggested subtasks at once
+STAGE_QUEUE_SIZE = 8
 
 # List name -> List ID mapping (all lists in the BenefitGuard space)
 LIST_MAP = {
@@ -54,6 +95,9 @@ LIST_MAP = {
     "📥 To Sort": TO_SORT_LIST_ID,
 }
 
+# Where tasks go when the LLM names a list that doesn't exist
+DEFAULT_LIST = "Feature Development"
+
 # Descriptions for the LLM prompt
 LIST_DESCRIPTIONS = {
     "Infrastructure & Security": "Production infrastructure: OAuth, rate limiting, CI/CD, error monitoring, security headers, database backups, environment management, cost monitoring. Phase 1 tasks.",
@@ -69,111 +113,109 @@ LIST_DESCRIPTIONS = {
 
 # ── API helpers ───────────────────────────────────────────────────────────────
 
-cu_session = requests.Session()
-cu_session.headers.update({
-    "Authorization": CLICKUP_API_KEY,
-    "Content-Type": "application/json",
-})
-
-
-def cu_get(path: str, params: dict | None = None, retries: int = 3) -> dict:
-    """GET from ClickUp API with retry on 429."""
-    url = f"{BASE_URL}{path}"
-    for attempt in range(retries):
-        resp = cu_session.get(url, params=params)
-        if resp.status_code == 200:
-            return resp.json()
-        if resp.status_code == 429:
-            wait = 2 ** attempt + 1
-            print(f"  ⏳ Rate limited, waiting {wait}s...")
-            time.sleep(wait)
-            continue
-        resp.raise_for_status()
-    raise RuntimeError(f"Failed after {retries} retries: GET {path}")
-
-
-def cu_put(path: str, body: dict, retries: int = 3) -> dict:
-    """PUT to ClickUp API with retry on 429."""
-    url = f"{BASE_URL}{path}"
-    for attempt in range(retries):
-        resp = cu_session.put(url, json=body)
-        if resp.status_code in (200, 201):
-            return resp.json()
-        if resp.status_code == 429:
-            wait = 2 ** attempt + 1
-            print(f"  ⏳ Rate limited, waiting {wait}s...")
-            time.sleep(wait)
-            continue
-        resp.raise_for_status()
-    raise RuntimeError(f"Failed after {retries} retries: PUT {path}")
-
-
-def cu_post(path: str, body: dict, retries: int = 3) -> dict:
-    """POST to ClickUp API with retry on 429."""
-    url = f"{BASE_URL}{path}"
-    for attempt in range(retries):
-        resp = cu_session.post(url, json=body)
-        if resp.status_code in (200, 201):
-            return resp.json()
-        if resp.status_code == 429:
-            wait = 2 ** attempt + 1
-            print(f"  ⏳ Rate limited, waiting {wait}s...")
-            time.sleep(wait)
-            continue
-        resp.raise_for_status()
-    raise RuntimeError(f"Failed after {retries} retries: POST {path}")
-
-
-def cu_delete(path: str, retries: int = 3):
-    """DELETE from ClickUp API with retry on 429."""
-    url = f"{BASE_URL}{path}"
-    for attempt in range(retries):
-        resp = cu_session.delete(url)
-        if resp.status_code in (200, 204):
-            return
-        if resp.status_code == 429:
-            wait = 2 ** attempt + 1
-            print(f"  ⏳ Rate limited, waiting {wait}s...")
-            time.sleep(wait)
-            continue
-        resp.raise_for_status()
-    raise RuntimeError(f"Failed after {retries} retries: DELETE {path}")
-
-
-# ── Task name lookup ──────────────────────────────────────────────────────────
-
-def build_task_lookup() -> dict[str, str]:
-    """Build a task name → task ID lookup from the state JSON."""
-    lookup = {}
-    if not STATE_FILE.exists():
-        return lookup
+cu_client = ClickUpClient(CLICKUP_API_KEY, priority="interactive")
+
+
+def cu_get(path: str, params: dict | None = None, retries: int | None = None) -> dict:
+    """GET from ClickUp API (header-paced, retried on errors)."""
+    return cu_client.get(path, params, retries=retries)
+
+
+def cu_put(path: str, body: dict, retries: int | None = None) -> dict:
+    """PUT to ClickUp API (header-paced, retried on errors)."""
+    return cu_client.put(path, body, retries=retries)
+
+
+def cu_post(path: str, body: dict, retries: int | None = None) -> dict:
+    """POST to ClickUp API (header-paced, retried on errors)."""
+    return cu_client.post(path, body, retries=retries)
+
+
+def cu_delete(path: str, retries: int | None = None):
+    """DELETE from ClickUp API (header-paced, retried on errors)."""
+    cu_client.delete(path, retries=retries)
+
+
+# ── Task lookup ───────────────────────────────────────────────────────────────
+
+def load_task_index(conn=None) -> TaskIndex:
+    """Load every synced task with its list, folder, parent and status.
+
+    Uses the SQLite store when ``conn`` is given; otherwise walks the state file.
+    """
+    if conn is not None:
+        return TaskIndex.from_store(conn)
+    return TaskIndex.from_state(load_state(STATE_FILE))
+
+
+def resolve_parent(name: str, task_index: TaskIndex, name_index: TrigramIndex) -> tuple[str | None, NameMatch | None]:
+    """Resolve an LLM-returned parent name: exact (case-insensitive) first, then fuzzy.
+
+    Returns (task id or None, the fuzzy match when one was attempted).
+    """
+    entry = task_index.find(name)
+    if entry is not None:
+        return entry.task_id, None
+    match = name_index.match(name)
+    # Tasks dropped from the index (deleted in ClickUp) stay in the name index
+    return (match.task_id if match.accepted and match.task_id in task_index else None), match
+
+
+def fetch_task_entry(task_id: str, task_index: TaskIndex) -> TaskEntry:
+    """Fetch a task the index doesn't know (created since the last sync) and index it."""
+    data = cu_get(f"/task/{task_id}")
+    entry = TaskEntry(
+        data["id"], data.get("name", ""), (data.get("list") or {}).get("id", ""),
+        (data.get("list") or {}).get("name"), (data.get("folder") or {}).get("name"),
+        data.get("parent"), (data.get("status") or {}).get("status"),
+    )
+    task_index.add(entry)
+    return entry
+
+
+def task_deleted(task_id: str) -> bool:
+    """True when ClickUp answers 404 for ``task_id`` (deleted since the last sync)."""
+    import requests
+
     try:
-        with open(STATE_FILE) as f:
-            state = json.load(f)
-        for lst in state.get("lists", []):
-            for task in lst.get("tasks", []):
-                name = task.get("name", "").strip()
-                if name:
-                    lookup[name.lower()] = task["id"]
-                # Also index subtasks
-                for sub in task.get("_subtasks", []):
-                    sub_name = sub.get("name", "").strip()
-                    if sub_name:
-                        lookup[sub_name.lower()] = sub["id"]
-    except (json.JSONDecodeError, KeyError):
-        pass
-    return lookup
+        cu_get(f"/task/{task_id}", retries=1)
+    except requests.HTTPError as e:
+        return e.response is not None and e.response.status_code == 404
+    except Exception:
+        return False
+    return False
+
+
+def subtask_parent(task_id: str, task_index: TaskIndex) -> TaskEntry:
+    """The top-level task a new subtask of ``task_id`` goes under, and its list.
+
+    Answered from the index; the API is only asked about tasks it doesn't have.
+    """
+    parent = task_index.parent_for(task_id)
+    while parent is None:
+        entry = task_index.entry(task_id) or fetch_task_entry(task_id, task_index)
+        task_id = entry.parent or entry.task_id
+        parent = entry if entry.parent is None else task_index.parent_for(task_id)
+    return parent
 
 
 # ── LLM classification ───────────────────────────────────────────────────────
 
-def build_system_prompt(summary_text: str, existing_tasks: list[str]) -> str:
-    """Build the system prompt for GPT-4o task classification."""
+def build_system_prompt(summary_text: str, existing_tasks: list[str] | None) -> str:
+    """Build the system prompt for GPT-4o task classification.
+
+    ``existing_tasks=None`` means each brain dump carries its own related
+    existing tasks (from the retrieval index) instead of one shared list.
+    """
     list_descriptions = "\n".join(
         f'- **{name}**: {desc}' for name, desc in LIST_DESCRIPTIONS.items()
     )
 
-    existing_str = "\n".join(f"- {t}" for t in existing_tasks[:80])
+    if existing_tasks is None:
+        existing_str = ("Each brain dump comes with the existing tasks most related to it "
+                        "(\"Related existing tasks\"). Only those can be a parent_task_name.")
+    else:
+        existing_str = "\n".join(f"- {t}" for t in existing_tasks[:80])
 
     return f"""You are a project management assistant for BenefitGuard, a healthcare benefits AI app.
 
@@ -215,43 +257,238 @@ Return ONLY valid JSON (no markdown fencing, no explanation):
 }}"""
 
 
-def classify_task(task_name: str, task_desc: str, system_prompt: str) -> dict | None:
-    """Send task to GPT-4o for classification. Returns parsed JSON or None."""
+def task_user_content(task_name: str, task_desc: str, related: list[str] | None = None) -> str:
     user_content = f"Brain dump task:\nName: {task_name}"
     if task_desc:
         user_content += f"\nDescription: {task_desc}"
+    if related is not None:
+        user_content += "\nRelated existing tasks:\n" + ("\n".join(f"- {t}" for t in related) or "(none)")
+    return user_content
+
+
+def parse_llm_json(content: str):
+    """Parse a JSON reply, tolerating markdown fencing."""
+    content = content.strip()
+    content = re.sub(r'^```(?:json)?\s*', '', content)
+    content = re.sub(r'\s*```$', '', content)
+    return json.loads(content)
+
+
+def chat_completion(system_prompt: str, user_content: str, max_tokens: int | None = None) -> tuple[str, str]:
+    """One GPT-4o chat request. Returns (reply text, finish_reason)."""
+    import requests
+
+    body = {
+        "model": LLM_MODEL,
+        "temperature": LLM_TEMPERATURE,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content},
+        ],
+    }
+    if max_tokens:
+        body["max_tokens"] = max_tokens
+
+    run = sync_metrics.active()
+    start = time.perf_counter()
+    resp = requests.post(
+        OPENAI_URL,
+        headers={
+            "Authorization": f"Bearer {OPENAI_API_KEY}",
+            "Content-Type": "application/json",
+        },
+        json=body,
+        timeout=LLM_TIMEOUT + (15 if max_tokens else 0),
+    )
+    if run:
+        run.record_call("POST", "/openai/chat/completions", resp.status_code,
+                        time.perf_counter() - start, len(resp.content))
+    resp.raise_for_status()
+    choice = resp.json()["choices"][0]
+    return choice["message"]["content"], choice.get("finish_reason", "stop")
+
+
+def say(lines: list[str] | None, text: str):
+    """Print ``text`` now, or collect it in ``lines`` for the caller to print."""
+    if lines is None:
+        print(text)
+    else:
+        lines.append(text)
+
+
+def classify_task(task_name: str, task_desc: str, system_prompt: str,
+                  related: list[str] | None = None, lines: list[str] | None = None) -> dict | None:
+    """Send task to GPT-4o for classification. Returns parsed JSON or None."""
+    import requests
 
     try:
-        resp = requests.post(
-            OPENAI_URL,
-            headers={
-                "Authorization": f"Bearer {OPENAI_API_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "gpt-4o",
-                "temperature": 0.3,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_content},
-                ],
-            },
-            timeout=30,
-        )
-        resp.raise_for_status()
-        content = resp.json()["choices"][0]["message"]["content"]
-
-        # Strip markdown fencing if present
-        content = content.strip()
-        content = re.sub(r'^```(?:json)?\s*', '', content)
-        content = re.sub(r'\s*```$', '', content)
-
-        return json.loads(content)
+        content, _ = chat_completion(system_prompt, task_user_content(task_name, task_desc, related))
+        return parse_llm_json(content)
     except (requests.RequestException, json.JSONDecodeError, KeyError, IndexError) as e:
-        print(f"    ⚠️  LLM classification failed: {e}")
+        say(lines, f"    ⚠️  LLM classification failed: {e}")
         return None
 
 
+# ── Batched classification ───────────────────────────────────────────────────
+# One request classifies several inbox tasks, so the (large) system prompt is
+# sent once per batch instead of once per task. Batches are sized to stay
+# inside the token budget; a truncated or failed reply is split in half and
+# retried, and entries still missing or malformed fall back to classify_task.
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English/JSON)."""
+    return len(text) // 4 + 1
+
+
+def batch_user_content(tasks: list[dict]) -> str:
+    items = []
+    for t in tasks:
+        item = {"task_id": t["id"], "name": t.get("name", "Untitled"), "description": t.get("description", "") or ""}
+        if "_related" in t:
+            item["related_existing_tasks"] = t["_related"]
+        items.append(item)
+    return (
+        f"Brain dump tasks ({len(items)}), as JSON:\n"
+        f"{json.dumps(items, ensure_ascii=False, indent=1)}\n\n"
+        "Classify each task independently, following the rules above. Return ONLY a JSON array "
+        "(no markdown fencing) with one object per task: the Output Format object plus "
+        '"task_id" copied from the input.'
+    )
+
+
+def plan_batches(tasks: list[dict], system_prompt: str, batch_size: int) -> list[list[dict]]:
+    """Group tasks into batches of at most ``batch_size`` that fit the token budget."""
+    base = estimate_tokens(system_prompt) + estimate_tokens(batch_user_content([]))
+    batches, current, used = [], [], base
+    for task in tasks:
+        cost = estimate_tokens(task_user_content(task.get("name", ""), task.get("description", "") or "",
+                                                 task.get("_related")))
+        full = len(current) >= batch_size
+        over_input = used + cost > LLM_INPUT_TOKEN_BUDGET
+        over_output = (len(current) + 1) * LLM_OUTPUT_TOKENS_PER_TASK > LLM_OUTPUT_TOKEN_BUDGET
+        if current and (full or over_input or over_output):
+            batches.append(current)
+            current, used = [], base
+        current.append(task)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def valid_classification(entry) -> bool:
+    return isinstance(entry, dict) and bool(entry.get("refined_name")) and bool(entry.get("target_list"))
+
+
+def classify_batch(tasks: list[dict], system_prompt: str, stats: dict,
+                   lines: list[str] | None = None) -> dict[str, dict]:
+    """Classify ``tasks`` in one request; returns {task_id: classification} for valid entries.
+
+    A reply cut off at the token limit, or a failed request, is split in
+    half and retried; single tasks are left to the per-task fallback.
+    """
+    import requests
+
+    if len(tasks) == 1:
+        return {}
+    stats["batch_calls"] += 1
+    max_tokens = min(LLM_OUTPUT_TOKEN_BUDGET, len(tasks) * LLM_OUTPUT_TOKENS_PER_TASK)
+    try:
+        content, finish_reason = chat_completion(system_prompt, batch_user_content(tasks), max_tokens)
+        if finish_reason == "length":
+            raise ValueError("reply truncated at the token limit")
+        reply = parse_llm_json(content)
+    except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+        # json.JSONDecodeError is a ValueError
+        mid = len(tasks) // 2
+        say(lines, f"    ⚠️  Batch of {len(tasks)} failed ({e}); splitting")
+        stats["batch_splits"] += 1
+        return {**classify_batch(tasks[:mid], system_prompt, stats, lines),
+                **classify_batch(tasks[mid:], system_prompt, stats, lines)}
+
+    if isinstance(reply, dict):
+        reply = reply.get("classifications") or reply.get("tasks") or []
+    wanted = {t["id"] for t in tasks}
+    results = {}
+    for entry in reply if isinstance(reply, list) else []:
+        task_id = str(entry.get("task_id", "")) if isinstance(entry, dict) else ""
+        if task_id in wanted and valid_classification(entry):
+            results[task_id] = {k: v for k, v in entry.items() if k != "task_id"}
+    return results
+
+
+def new_llm_stats() -> dict:
+    return {"batch_calls": 0, "batch_splits": 0, "single_calls": 0}
+
+
+def cached_classifications(tasks: list[dict], system_prompt: str,
+                           cache: ClassificationCache) -> tuple[dict[str, dict], dict[str, str]]:
+    """Look every task up in ``cache``; returns ({task_id: cached classification}, {task_id: cache key})."""
+    results, keys = {}, {}
+    system_hash = prompt_hash(system_prompt)
+    for task in tasks:
+        # Related tasks are part of the prompt the model saw
+        task_hash = system_hash
+        if "_related" in task:
+            task_hash = prompt_hash(system_hash + "\n" + "\n".join(task["_related"]))
+        keys[task["id"]] = cache_key(task.get("name", ""), task.get("description", "") or "",
+                                     LLM_MODEL, LLM_TEMPERATURE, task_hash)
+        if (cached := cache.get(keys[task["id"]])) is not None:
+            results[task["id"]] = cached
+    if results:
+        print(f"💾 {len(results)} of {len(tasks)} classification(s) served from the cache")
+    return results, keys
+
+
+def classification_groups(tasks: list[dict], system_prompt: str, batch_size: int) -> list[list[dict]]:
+    """Split uncached tasks into LLM requests: token-budgeted batches, or one task each."""
+    if batch_size > 1 and len(tasks) > 1:
+        groups = plan_batches(tasks, system_prompt, batch_size)
+        print(f"🤖 Classifying {len(tasks)} task(s) in {len(groups)} batch request(s)...")
+        return groups
+    return [[task] for task in tasks]
+
+
+def classify_group(tasks: list[dict], system_prompt: str, stats: dict,
+                   lines: list[str] | None = None) -> dict[str, dict | None]:
+    """Classify one group: a batch request, then one by one for whatever it didn't return.
+
+    Warnings go to ``lines`` when given (the pipeline prints them from the event loop).
+    """
+    fresh: dict[str, dict | None] = classify_batch(tasks, system_prompt, stats, lines) if len(tasks) > 1 else {}
+    missing = [t for t in tasks if t["id"] not in fresh]
+    if fresh and missing:
+        say(lines, f"  ↩️  {len(missing)} task(s) missing from batch replies — classifying one by one")
+    for task in missing:
+        stats["single_calls"] += 1
+        fresh[task["id"]] = classify_task(task.get("name", "Untitled"), task.get("description", "") or "",
+                                          system_prompt, task.get("_related"), lines)
+    return fresh
+
+
+def store_classifications(cache: ClassificationCache | None, keys: dict[str, str], fresh: dict):
+    if cache is not None:
+        for task_id, classification in fresh.items():
+            if valid_classification(classification):
+                cache.put(keys[task_id], classification)
+
+
+def classify_tasks(tasks: list[dict], system_prompt: str, batch_size: int = BATCH_SIZE,
+                   cache: ClassificationCache | None = None) -> tuple[dict, dict]:
+    """Classify every inbox task, batched; returns ({task_id: classification | None}, call stats).
+
+    Tasks found in ``cache`` skip the LLM; new valid classifications are stored in it.
+    """
+    stats = new_llm_stats()
+    results, keys = cached_classifications(tasks, system_prompt, cache) if cache is not None else ({}, {})
+    todo = [t for t in tasks if t["id"] not in results]
+    for group in classification_groups(todo, system_prompt, batch_size):
+        fresh = classify_group(group, system_prompt, stats)
+        store_classifications(cache, keys, fresh)
+        results.update(fresh)
+    return results, stats
+
+
 # ── Task operations ───────────────────────────────────────────────────────────
 
 def update_task(task_id: str, updates: dict) -> dict:
@@ -291,7 +528,6 @@ def move_task_to_list(task_id: str, target_list_id: str, task_data: dict) -> str
         body["tags"] = [t["name"] if isinstance(t, dict) else t for t in tags]
 
     new_task = cu_post(f"/list/{target_list_id}/task", body)
-    time.sleep(0.5)
     cu_delete(f"/task/{task_id}")
     return new_task["id"]
 
@@ -305,10 +541,243 @@ def create_subtask(parent_id: str, list_id: str, name: str) -> dict:
     })
 
 
-def get_task_list_id(task_id: str) -> str:
-    """Get the list ID that a task belongs to."""
-    data = cu_get(f"/task/{task_id}")
-    return data.get("list", {}).get("id", "")
+# ── Filing ────────────────────────────────────────────────────────────────────
+# Each inbox task is filed in two steps, run as separate pipeline stages:
+# file_task() refines and moves it (or recreates it under a parent), then
+# create_suggested_subtasks() adds the subtasks the LLM suggested. Both run
+# on worker threads and collect their console lines in job["lines"], so the
+# output of tasks filed concurrently doesn't interleave.
+
+def file_task(task: dict, classification: dict | None, task_index: TaskIndex,
+              name_index: TrigramIndex) -> dict:
+    """Refine and move one classified inbox task. Returns the job for the subtask stage."""
+    task_id = task["id"]
+    task_name = task.get("name", "Untitled")
+    lines = [f"  🔄 Processing: \"{task_name}\""]
+    say = lines.append
+
+    # Classification from GPT-4o
+    if not classification:
+        say(f"    ❌ Failed to classify, skipping.")
+        return {"lines": lines, "result": {
+            "task_id": task_id,
+            "original_name": task_name,
+            "status": "failed",
+            "error": "LLM classification failed",
+        }}
+
+    refined_name = classification.get("refined_name", task_name)
+    description = classification.get("description", "")
+    target_list = classification.get("target_list", "")
+    priority = classification.get("priority", 3)
+    start_date = classification.get("start_date")
+    due_date = classification.get("due_date")
+    subtask_names = classification.get("subtasks", [])
+    add_as_subtask = classification.get("add_as_subtask", False)
+    parent_task_name = classification.get("parent_task_name")
+    reasoning = classification.get("reasoning", "")
+
+    say(f"    → \"{refined_name}\" → {target_list} (Priority: {priority})")
+    if add_as_subtask and parent_task_name:
+        say(f"    → As subtask of: \"{parent_task_name}\"")
+    if reasoning:
+        say(f"    → Reason: {reasoning}")
+
+    # Resolve target list ID
+    target_list_id = LIST_MAP.get(target_list)
+    if not target_list_id:
+        say(f"    ⚠️  Unknown list \"{target_list}\", defaulting to {DEFAULT_LIST}")
+        target_list = DEFAULT_LIST
+        target_list_id = LIST_MAP[DEFAULT_LIST]
+
+    # Build the refined task data for the recreate-and-delete move
+    task_data = {
+        "name": refined_name,
+        "description": description,
+        "priority": priority,
+    }
+    if start_date:
+        task_data["start_date"] = start_date
+    if due_date:
+        task_data["due_date"] = due_date
+
+    # Handle subtask-of-existing vs new top-level
+    became_subtask = False
+    new_task_id = task_id  # tracks the ID after potential recreate
+    parent_match = None
+
+    if add_as_subtask and parent_task_name:
+        # Find parent task ID (exact name, else closest trigram match)
+        parent_id, parent_match = resolve_parent(parent_task_name, task_index, name_index)
+        if parent_match and parent_match.accepted:
+            say(f"    🔍 Parent matched to \"{parent_match.name}\" (score {parent_match.score:.2f})")
+            parent_task_name = parent_match.name
+        if parent_match and parent_match.ambiguous:
+            close = ", ".join(f'"{n}" {sc:.2f}' for n, sc in parent_match.ambiguous)
+            say(f"    ⚠️  Ambiguous parent match; also close: {close}")
+        if parent_id:
+            try:
+                # The parent's list (and its own parent: no sub-subtasks) come from the index
+                parent = subtask_parent(parent_id, task_index)
+                if parent.task_id != parent_id:
+                    say(f"    ↪️  \"{parent_task_name}\" is a subtask; using its parent \"{parent.name}\"")
+                    parent_task_name = parent.name
+                # Recreate as subtask of parent in parent's list
+                task_data["parent"] = parent.task_id
+                new_task_id = move_task_to_list(task_id, parent.list_id, task_data)
+                say(f"    ✅ Added as subtask of \"{parent_task_name}\"")
+                became_subtask = True
+            except Exception as e:
+                # Incremental syncs don't see deletions, so the index may still hold a deleted parent
+                missing = task_data.get("parent", parent_id)
+                if task_deleted(missing):
+                    task_index.discard(missing)
+                    say(f"    ⚠️  Parent \"{parent_task_name}\" was deleted in ClickUp since the last sync, "
+                        f"creating as top-level")
+                else:
+                    say(f"    ⚠️  Failed to set parent, moving to list instead: {e}")
+                task_data.pop("parent", None)
+                try:
+                    new_task_id = move_task_to_list(task_id, target_list_id, task_data)
+                    say(f"    ✅ Moved to {target_list} (fallback)")
+                except Exception as e2:
+                    say(f"    ❌ Move also failed: {e2}")
+        else:
+            best = ""
+            if parent_match and parent_match.name:
+                best = f" (closest: \"{parent_match.name}\" {parent_match.score:.2f})"
+            say(f"    ⚠️  Parent \"{parent_task_name}\" not found{best}, creating as top-level")
+            try:
+                new_task_id = move_task_to_list(task_id, target_list_id, task_data)
+                say(f"    ✅ Moved to {target_list}")
+            except Exception as e:
+                say(f"    ❌ Move failed: {e}")
+    else:
+        # Move to target list
+        if target_list_id != TO_SORT_LIST_ID:
+            try:
+                new_task_id = move_task_to_list(task_id, target_list_id, task_data)
+                say(f"    ✅ Moved to {target_list}")
+            except Exception as e:
+                say(f"    ❌ Move failed: {e}")
+        else:
+            # Just update in place if staying in To Sort (shouldn't happen)
+            try:
+                update_task(task_id, task_data)
+            except Exception as e:
+                say(f"    ⚠️  Failed to update task: {e}")
+
+    return {
+        "lines": lines,
+        "new_task_id": new_task_id,
+        "target_list_id": target_list_id,
+        "subtask_names": subtask_names,
+        "became_subtask": became_subtask,
+        "result": {
+            "task_id": task_id,
+            "original_name": task_name,
+            "refined_name": refined_name,
+            "target_list": target_list,
+            "priority": priority,
+            "add_as_subtask": add_as_subtask,
+            "parent_task_name": parent_task_name,
+            "parent_match": parent_match.as_log() if parent_match else None,
+            "subtasks_created": len(subtask_names),
+            "reasoning": reasoning,
+            "status": "sorted",
+        },
+    }
+
+
+def create_suggested_subtasks(job: dict):
+    """Create the subtasks the LLM suggested (only for top-level tasks;
+    ClickUp does not allow sub-subtasks)."""
+    subtask_names = job.get("subtask_names") or []
+    say = job["lines"].append
+    if subtask_names and not job["became_subtask"]:
+        for sub_name in subtask_names:
+            try:
+                create_subtask(job["new_task_id"], job["target_list_id"], sub_name)
+                say(f"    📎 Created subtask: {sub_name}")
+            except Exception as e:
+                say(f"    ⚠️  Failed to create subtask \"{sub_name}\": {e}")
+    elif subtask_names and job["became_subtask"]:
+        say(f"    ℹ️  Skipping {len(subtask_names)} suggested subtasks (ClickUp forbids sub-subtasks)")
+
+
+# ── Pipeline ──────────────────────────────────────────────────────────────────
+
+async def sort_pipeline(inbox_tasks: list[dict], system_prompt: str, batch_size: int,
+                        cache: ClassificationCache | None, task_index: TaskIndex,
+                        name_index: TrigramIndex) -> tuple[list[dict], dict]:
+    """Classify → move → create subtasks, with bounded queues between the stages.
+
+    Each stage has its own worker count, so the LLM classifies the next
+    batch while ClickUp writes for earlier tasks are in flight. Blocking
+    HTTP calls run on threads; the cache is only touched from the event
+    loop. Returns (results in inbox order, LLM call stats).
+    """
+    import asyncio
+
+    order = {task["id"]: i for i, task in enumerate(inbox_tasks)}
+    results: list[dict | None] = [None] * len(inbox_tasks)
+    llm_stats = new_llm_stats()
+
+    cached, keys = cached_classifications(inbox_tasks, system_prompt, cache) if cache is not None else ({}, {})
+    groups = classification_groups([t for t in inbox_tasks if t["id"] not in cached], system_prompt, batch_size)
+
+    group_queue: asyncio.Queue = asyncio.Queue()
+    move_queue: asyncio.Queue = asyncio.Queue(maxsize=STAGE_QUEUE_SIZE)
+    subtask_queue: asyncio.Queue = asyncio.Queue(maxsize=STAGE_QUEUE_SIZE)
+    for group in groups:
+        group_queue.put_nowait(group)
+
+    async def classify_worker():
+        while (group := await group_queue.get()) is not None:
+            stats, lines = new_llm_stats(), []
+            fresh = await asyncio.to_thread(classify_group, group, system_prompt, stats, lines)
+            if lines:
+                print("\n".join(lines))
+            for key, value in stats.items():
+                llm_stats[key] += value
+            store_classifications(cache, keys, fresh)
+            for task in group:
+                await move_queue.put((task, fresh.get(task["id"])))
+
+    async def move_worker():
+        while (item := await move_queue.get()) is not None:
+            task, classification = item
+            job = await asyncio.to_thread(file_task, task, classification, task_index, name_index)
+            job["index"] = order[task["id"]]
+            await subtask_queue.put(job)
+
+    async def subtask_worker():
+        while (job := await subtask_queue.get()) is not None:
+            if job["result"]["status"] == "sorted":
+                await asyncio.to_thread(create_suggested_subtasks, job)
+            print("\n".join(job["lines"]) + "\n")
+            results[job["index"]] = job["result"]
+
+    async def run_stage(workers: list, next_queue: asyncio.Queue | None, next_workers: int):
+        await asyncio.gather(*workers)
+        if next_queue is not None:
+            for _ in range(next_workers):
+                await next_queue.put(None)
+
+    classifiers = [asyncio.create_task(classify_worker()) for _ in range(CLASSIFY_WORKERS)]
+    movers = [asyncio.create_task(move_worker()) for _ in range(MOVE_WORKERS)]
+    subtaskers = [asyncio.create_task(subtask_worker()) for _ in range(SUBTASK_WORKERS)]
+    print()
+
+    for task in inbox_tasks:  # cached classifications go straight to the move stage
+        if task["id"] in cached:
+            await move_queue.put((task, cached[task["id"]]))
+    for _ in classifiers:
+        group_queue.put_nowait(None)
+    await run_stage(classifiers, move_queue, MOVE_WORKERS)
+    await run_stage(movers, subtask_queue, SUBTASK_WORKERS)
+    await run_stage(subtaskers, None, 0)
+    return results, llm_stats
 
 
 # ── Logging ───────────────────────────────────────────────────────────────────
@@ -322,8 +791,13 @@ def log_sort(entry: dict):
 
 # ── Main sort logic ──────────────────────────────────────────────────────────
 
-def run_sort():
-    """Main entry point for the inbox sort. Called by sync script or standalone."""
+def run_sort(batch_size: int = BATCH_SIZE, use_cache: bool = True, parent_threshold: float = DEFAULT_THRESHOLD):
+    """Main entry point for the inbox sort. Called by sync script or standalone.
+
+    ``batch_size`` inbox tasks are classified per LLM request (1 = one request per task);
+    classifications are reused from the on-disk cache unless ``use_cache`` is False.
+    Parent names the LLM returns are fuzzy-matched at ``parent_threshold`` or better.
+    """
     if not CLICKUP_API_KEY:
         print("❌ CLICKUP_API_KEY not found in .env")
         return
@@ -347,181 +821,80 @@ def run_sort():
     if SUMMARY_FILE.exists():
         summary_text = SUMMARY_FILE.read_text()
 
-    # 3. Build task name → ID lookup
-    task_lookup = build_task_lookup()
-    existing_task_names = list(
-        name for name in (
-            k.title() for k in task_lookup.keys()
-        )
-    )
+    # 3. Load every synced task (id/name → list, parent, status) and the name matcher
+    conn = open_state_db(STATE_DB)
+    task_index = load_task_index(conn)
+    if conn is not None:
+        conn.close()
+    existing_task_names = task_index.top_level_names()
+    name_index = TrigramIndex(task_index.names(), parent_threshold)
+
+    # 4. Build system prompt; with the retrieval index each task carries its own related tasks
+    from retrieval_index import RetrievalIndex
+
+    index = RetrievalIndex.load(TASK_INDEX_FILE)
+    if index is not None:
+        for task in inbox_tasks:
+            query = f"{task.get('name', '')} {task.get('description', '') or ''}"
+            task["_related"] = [name for name, _ in index.search(query, RELATED_TASKS_PER_PROMPT)]
+        print(f"🔎 Picked up to {RELATED_TASKS_PER_PROMPT} related existing tasks per inbox task "
+              f"from {len(index.ids)} indexed\n")
+    system_prompt = build_system_prompt(summary_text, None if index is not None else existing_task_names)
+
+    # 5. Classify, move and create subtasks as a staged pipeline
+    cache = None
+    if use_cache:
+        cache = ClassificationCache(CLASSIFICATION_CACHE_DB, CACHE_MAX_ENTRIES, CACHE_TTL_DAYS * 86400)
+    try:
+        import asyncio
 
-    # Actually, let's get the real names from the state file
-    existing_task_names_real = []
-    if STATE_FILE.exists():
-        try:
-            with open(STATE_FILE) as f:
-                state = json.load(f)
-            for lst in state.get("lists", []):
-                for task in lst.get("tasks", []):
-                    existing_task_names_real.append(task.get("name", ""))
-        except (json.JSONDecodeError, KeyError):
-            pass
-
-    # 4. Build system prompt
-    system_prompt = build_system_prompt(
-        summary_text,
-        existing_task_names_real or existing_task_names,
-    )
+        results, llm_stats = asyncio.run(
+            sort_pipeline(inbox_tasks, system_prompt, batch_size, cache, task_index, name_index))
+    finally:
+        if cache is not None:
+            cache.close()
 
-    # 5. Process each task
-    sorted_count = 0
-    failed_count = 0
+    failed_count = sum(1 for r in results if r["status"] == "failed")
+    sorted_count = len(results) - failed_count
     run_log = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "tasks_found": len(inbox_tasks),
-        "results": [],
+        "llm": llm_stats,
+        "cache": cache.stats if cache is not None else None,
+        "results": results,
     }
 
-    for task in inbox_tasks:
-        task_id = task["id"]
-        task_name = task.get("name", "Untitled")
-        task_desc = task.get("description", "") or ""
-
-        print(f"  🔄 Processing: \"{task_name}\"")
-
-        # 5a. Classify with GPT-4o
-        classification = classify_task(task_name, task_desc, system_prompt)
-        if not classification:
-            print(f"    ❌ Failed to classify, skipping.")
-            failed_count += 1
-            run_log["results"].append({
-                "task_id": task_id,
-                "original_name": task_name,
-                "status": "failed",
-                "error": "LLM classification failed",
-            })
-            continue
-
-        refined_name = classification.get("refined_name", task_name)
-        description = classification.get("description", "")
-        target_list = classification.get("target_list", "")
-        priority = classification.get("priority", 3)
-        start_date = classification.get("start_date")
-        due_date = classification.get("due_date")
-        subtask_names = classification.get("subtasks", [])
-        add_as_subtask = classification.get("add_as_subtask", False)
-        parent_task_name = classification.get("parent_task_name")
-        reasoning = classification.get("reasoning", "")
-
-        print(f"    → \"{refined_name}\" → {target_list} (Priority: {priority})")
-        if add_as_subtask and parent_task_name:
-            print(f"    → As subtask of: \"{parent_task_name}\"")
-        if reasoning:
-            print(f"    → Reason: {reasoning}")
-
-        # 5b. Resolve target list ID
-        target_list_id = LIST_MAP.get(target_list)
-        if not target_list_id:
-            print(f"    ⚠️  Unknown list \"{target_list}\", defaulting to Feature Development")
-            target_list = "Feature Development"
-            target_list_id = LIST_MAP["Feature Development"]
-
-        # 5c. Build the refined task data for the recreate-and-delete move
-        task_data = {
-            "name": refined_name,
-            "description": description,
-            "priority": priority,
-        }
-        if start_date:
-            task_data["start_date"] = start_date
-        if due_date:
-            task_data["due_date"] = due_date
-
-        # 5d. Handle subtask-of-existing vs new top-level
-        became_subtask = False
-        new_task_id = task_id  # tracks the ID after potential recreate
-
-        if add_as_subtask and parent_task_name:
-            # Find parent task ID
-            parent_id = task_lookup.get(parent_task_name.lower())
-            if parent_id:
-                try:
-                    # Find which list the parent lives in
-                    parent_list_id = get_task_list_id(parent_id)
-                    time.sleep(0.3)
-                    # Recreate as subtask of parent in parent's list
-                    task_data["parent"] = parent_id
-                    new_task_id = move_task_to_list(task_id, parent_list_id, task_data)
-                    print(f"    ✅ Added as subtask of \"{parent_task_name}\"")
-                    became_subtask = True
-                except Exception as e:
-                    print(f"    ⚠️  Failed to set parent, moving to list instead: {e}")
-                    task_data.pop("parent", None)
-                    try:
-                        new_task_id = move_task_to_list(task_id, target_list_id, task_data)
-                        print(f"    ✅ Moved to {target_list} (fallback)")
-                    except Exception as e2:
-                        print(f"    ❌ Move also failed: {e2}")
-            else:
-                print(f"    ⚠️  Parent \"{parent_task_name}\" not found, creating as top-level")
-                try:
-                    new_task_id = move_task_to_list(task_id, target_list_id, task_data)
-                    print(f"    ✅ Moved to {target_list}")
-                except Exception as e:
-                    print(f"    ❌ Move failed: {e}")
-        else:
-            # Move to target list
-            if target_list_id != TO_SORT_LIST_ID:
-                try:
-                    new_task_id = move_task_to_list(task_id, target_list_id, task_data)
-                    print(f"    ✅ Moved to {target_list}")
-                except Exception as e:
-                    print(f"    ❌ Move failed: {e}")
-            else:
-                # Just update in place if staying in To Sort (shouldn't happen)
-                try:
-                    update_task(task_id, task_data)
-                except Exception as e:
-                    print(f"    ⚠️  Failed to update task: {e}")
-
-        # 5e. Create subtasks if suggested (only for top-level tasks;
-        #     ClickUp does not allow sub-subtasks)
-        if subtask_names and not became_subtask:
-            for sub_name in subtask_names:
-                try:
-                    create_subtask(new_task_id, target_list_id, sub_name)
-                    print(f"    📎 Created subtask: {sub_name}")
-                    time.sleep(0.5)
-                except Exception as e:
-                    print(f"    ⚠️  Failed to create subtask \"{sub_name}\": {e}")
-        elif subtask_names and became_subtask:
-            print(f"    ℹ️  Skipping {len(subtask_names)} suggested subtasks (ClickUp forbids sub-subtasks)")
-
-        sorted_count += 1
-        run_log["results"].append({
-            "task_id": task_id,
-            "original_name": task_name,
-            "refined_name": refined_name,
-            "target_list": target_list,
-            "priority": priority,
-            "add_as_subtask": add_as_subtask,
-            "parent_task_name": parent_task_name,
-            "subtasks_created": len(subtask_names),
-            "reasoning": reasoning,
-            "status": "sorted",
-        })
-        print()
-
     # 6. Log results
     run_log["tasks_sorted"] = sorted_count
     run_log["tasks_failed"] = failed_count
     log_sort(run_log)
 
-    print(f"📊 Sort complete: {sorted_count} sorted, {failed_count} failed")
-    print(f"📝 Log: {SORT_LOG.relative_to(PROJECT_ROOT)}")
+    llm_calls = llm_stats["batch_calls"] + llm_stats["single_calls"]
+    print(f"📊 Sort complete: {sorted_count} sorted, {failed_count} failed ({llm_calls} LLM request(s))")
+    print(f"📝 Log: {SORT_LOG.relative_to(PROJECT_ROOT) if SORT_LOG.is_relative_to(PROJECT_ROOT) else SORT_LOG}")
 
 
 # ── CLI entry point ──────────────────────────────────────────────────────────
 
+def main():
+    parser = argparse.ArgumentParser(description="Classify To Sort inbox tasks and move them to their lists")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"Inbox tasks per LLM request; 1 classifies one by one (default: {BATCH_SIZE})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Classify every task with the LLM, ignoring cached classifications")
+    parser.add_argument("--parent-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Minimum fuzzy match score (0-1) to accept an inexact parent task name "
+                             f"(default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    start_run("sort")
+    try:
+        with phase("run_sort"):
+            run_sort(max(1, args.batch_size), use_cache=not args.no_cache,
+                     parent_threshold=args.parent_threshold)
+    finally:
+        finish_run(LOGS_DIR)
+
+
 if __name__ == "__main__":
-    run_sort()
+    main()
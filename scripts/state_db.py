@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Indexed SQLite State Store
+
+Mirrors the synced project state into docs/clickup-project-state.sqlite so
+readers (inbox sorter, summary, queries) can look tasks up through indexes
+instead of loading and walking the whole JSON dump.
+
+Tables:
+  meta      key/value sync metadata (synced_at, space_id, stats, ...)
+  lists     one row per list, in state order, with a content hash
+  tasks     top-level tasks
+  subtasks  subtasks (parent → tasks.task_id)
+  all_tasks view over tasks + subtasks
+
+Secondary indexes on due date (all and open-only), priority, status type
+and list back the summary's deadline table and query_tasks.py.
+
+Every task row keeps its raw payload, so the JSON state can be rebuilt
+exactly with export_state().
+
+Usage:
+  python3 scripts/state_db.py --export [--format pretty|json|gzip|msgpack]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DOCS_DIR = PROJECT_ROOT / "docs"
+STATE_DB = DOCS_DIR / "clickup-project-state.sqlite"
+STATE_FILE = DOCS_DIR / "clickup-project-state.json"
+
+META_KEYS = ("synced_at", "last_full_sync_at", "workspace_id", "space_id", "space_name", "stats")
+
+TASK_COLUMNS = (
+    "task_id", "seq", "list_id", "parent", "name", "name_lower", "status",
+    "status_type", "priority", "start_date", "due_date", "time_estimate", "payload",
+)
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE lists (
+    list_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    list_name TEXT,
+    folder_name TEXT,
+    folder_id TEXT,
+    content_hash TEXT
+);
+CREATE TABLE tasks (
+    task_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    list_id TEXT NOT NULL,
+    parent TEXT,
+    name TEXT,
+    name_lower TEXT,
+    status TEXT,
+    status_type TEXT,
+    priority INTEGER,
+    start_date INTEGER,
+    due_date INTEGER,
+    time_estimate INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE TABLE subtasks (
+    task_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    list_id TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    name TEXT,
+    name_lower TEXT,
+    status TEXT,
+    status_type TEXT,
+    priority INTEGER,
+    start_date INTEGER,
+    due_date INTEGER,
+    time_estimate INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE VIEW all_tasks AS
+    SELECT * FROM tasks UNION ALL SELECT * FROM subtasks;
+"""
+
+INDEXES = """
+CREATE INDEX idx_tasks_name_lower ON tasks(name_lower);
+CREATE INDEX idx_tasks_list ON tasks(list_id, seq);
+CREATE INDEX idx_tasks_status_type ON tasks(status_type);
+CREATE INDEX idx_tasks_due ON tasks(due_date);
+CREATE INDEX idx_tasks_open_due ON tasks(due_date) WHERE status_type IS NOT 'closed';
+CREATE INDEX idx_tasks_priority ON tasks(priority, due_date);
+CREATE INDEX idx_subtasks_name_lower ON subtasks(name_lower);
+CREATE INDEX idx_subtasks_list ON subtasks(list_id);
+CREATE INDEX idx_subtasks_parent ON subtasks(parent, seq);
+CREATE INDEX idx_subtasks_status_type ON subtasks(status_type);
+CREATE INDEX idx_subtasks_due ON subtasks(due_date);
+CREATE INDEX idx_subtasks_open_due ON subtasks(due_date) WHERE status_type IS NOT 'closed';
+CREATE INDEX idx_subtasks_priority ON subtasks(priority, due_date);
+"""
+
+
+def list_content_hash(lst: dict) -> str:
+    """Stable hash of one ``state["lists"]`` entry (name, folder and all tasks)."""
+    raw = json.dumps(lst, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _int_or_none(value) -> int | None:
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _task_row(task: dict, seq: int, list_id: str, parent: str | None) -> tuple:
+    """Flatten a ClickUp task dict into a tasks/subtasks row."""
+    status = task.get("status") or {}
+    priority = task.get("priority")
+    name = task.get("name", "") or ""
+    payload = {k: v for k, v in task.items() if k != "_subtasks"}
+    return (
+        task["id"],
+        seq,
+        list_id,
+        parent,
+        name,
+        name.strip().lower(),
+        status.get("status"),
+        status.get("type"),
+        _int_or_none(priority.get("id")) if isinstance(priority, dict) else None,
+        _int_or_none(task.get("start_date")),
+        _int_or_none(task.get("due_date")),
+        _int_or_none(task.get("time_estimate")),
+        json.dumps(payload, separators=(",", ":"), default=str),
+    )
+
+
+# ── Writing ───────────────────────────────────────────────────────────────────
+
+def write_state_db(state: dict, path: Path = STATE_DB) -> Path:
+    """Build a fresh database for ``state`` beside ``path`` and swap it in atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(tmp_name)
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(SCHEMA)
+
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+            (key, json.dumps(state.get(key), default=str)) for key in META_KEYS
+        ])
+
+        list_rows, task_rows, subtask_rows = [], [], []
+        seq = 0
+        for pos, lst in enumerate(state.get("lists", [])):
+            list_id = lst["list_id"]
+            list_rows.append((list_id, pos, lst.get("list_name"), lst.get("folder_name"),
+                              lst.get("folder_id"), list_content_hash(lst)))
+            for task in lst.get("tasks", []):
+                task_rows.append(_task_row(task, seq, list_id, task.get("parent")))
+                seq += 1
+                for sub in task.get("_subtasks", []):
+                    subtask_rows.append(_task_row(sub, seq, list_id, task["id"]))
+                    seq += 1
+
+        placeholders = ", ".join("?" for _ in TASK_COLUMNS)
+        conn.executemany("INSERT INTO lists VALUES (?, ?, ?, ?, ?, ?)", list_rows)
+        conn.executemany(f"INSERT OR REPLACE INTO tasks VALUES ({placeholders})", task_rows)
+        conn.executemany(f"INSERT OR REPLACE INTO subtasks VALUES ({placeholders})", subtask_rows)
+        conn.executescript(INDEXES)
+        conn.commit()
+        conn.close()
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
+
+
+# ── Live updates ──────────────────────────────────────────────────────────────
+# Used by the webhook mirror to apply single-task changes between full writes.
+# Touched lists get a NULL content_hash so cached summary fragments re-render.
+
+def open_state_db_rw(path: Path = STATE_DB) -> sqlite3.Connection | None:
+    """Open the store for in-place updates, or None if it has not been written yet."""
+    if not path.exists():
+        return None
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _invalidate_lists(conn: sqlite3.Connection, list_ids):
+    conn.executemany("UPDATE lists SET content_hash = NULL WHERE list_id = ?",
+                     [(lid,) for lid in set(list_ids) if lid])
+
+
+def _remove_task_rows(conn: sqlite3.Connection, task_id: str) -> tuple[int | None, set[str]]:
+    """Delete a task row from either table; returns (its seq, touched list ids)."""
+    seq, touched = None, set()
+    for table in ("tasks", "subtasks"):
+        row = conn.execute(f"SELECT seq, list_id FROM {table} WHERE task_id = ?", (task_id,)).fetchone()
+        if row:
+            seq = row["seq"]
+            touched.add(row["list_id"])
+            conn.execute(f"DELETE FROM {table} WHERE task_id = ?", (task_id,))
+    return seq, touched
+
+
+def upsert_task(conn: sqlite3.Connection, task: dict) -> bool:
+    """Insert or replace one task (top-level or subtask) from a ClickUp payload.
+
+    The task keeps its position if it already existed; new tasks go last.
+    Returns False if the task's list is not part of the stored space.
+    """
+    list_id = (task.get("list") or {}).get("id")
+    if not conn.execute("SELECT 1 FROM lists WHERE list_id = ?", (list_id,)).fetchone():
+        return False
+    seq, touched = _remove_task_rows(conn, task["id"])
+    if seq is None:
+        seq = conn.execute(
+            "SELECT COALESCE(MAX(seq), -1) + 1 FROM (SELECT seq FROM tasks UNION ALL SELECT seq FROM subtasks)"
+        ).fetchone()[0]
+    parent = task.get("parent")
+    table = "subtasks" if parent else "tasks"
+    placeholders = ", ".join("?" for _ in TASK_COLUMNS)
+    conn.execute(f"INSERT INTO {table} VALUES ({placeholders})", _task_row(task, seq, list_id, parent))
+    _invalidate_lists(conn, touched | {list_id})
+    return True
+
+
+def delete_task(conn: sqlite3.Connection, task_id: str) -> int:
+    """Delete a task and its subtasks; returns the number of rows removed."""
+    seq, touched = _remove_task_rows(conn, task_id)
+    removed = 0 if seq is None else 1
+    for row in conn.execute("SELECT task_id, list_id FROM subtasks WHERE parent = ?", (task_id,)).fetchall():
+        conn.execute("DELETE FROM subtasks WHERE task_id = ?", (row["task_id"],))
+        touched.add(row["list_id"])
+        removed += 1
+    _invalidate_lists(conn, touched)
+    return removed
+
+
+def refresh_stats(conn: sqlite3.Connection) -> dict:
+    """Recompute the ``stats`` meta entry from the tables."""
+    count = lambda sql: conn.execute(sql).fetchone()[0]
+    stats = {
+        "total_tasks": count("SELECT COUNT(*) FROM tasks"),
+        "completed_tasks": count("SELECT COUNT(*) FROM tasks WHERE status_type = 'closed'"),
+        "total_subtasks": count("SELECT COUNT(*) FROM subtasks"),
+        "completed_subtasks": count("SELECT COUNT(*) FROM subtasks WHERE status_type = 'closed'"),
+        "total_lists": count("SELECT COUNT(*) FROM lists"),
+    }
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('stats', ?)", (json.dumps(stats),))
+    return stats
+
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+
+def open_state_db(path: Path = STATE_DB) -> sqlite3.Connection | None:
+    """Open the store read-only, or return None if it has not been written yet."""
+    if not path.exists():
+        return None
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        conn.execute("SELECT 1 FROM meta LIMIT 1")
+    except sqlite3.Error:
+        return None
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def read_meta(conn: sqlite3.Connection) -> dict:
+    """Return the sync metadata (synced_at, space_id, stats, ...)."""
+    return {row["key"]: json.loads(row["value"]) for row in conn.execute("SELECT key, value FROM meta")}
+
+
+def find_task_id(conn: sqlite3.Connection, name: str) -> str | None:
+    """Resolve a task or subtask name (case-insensitive) to its id.
+
+    When several tasks share a name the last one in state order wins,
+    matching the dict-based lookup this replaces.
+    """
+    key = name.strip().lower()
+    if not key:
+        return None
+    row = conn.execute(
+        "SELECT task_id, seq FROM tasks WHERE name_lower = ? "
+        "UNION ALL SELECT task_id, seq FROM subtasks WHERE name_lower = ? "
+        "ORDER BY seq DESC LIMIT 1",
+        (key, key),
+    ).fetchone()
+    return row["task_id"] if row else None
+
+
+def task_names(conn: sqlite3.Connection) -> list[tuple[str, str]]:
+    """(name, task_id) of every task and subtask in state order."""
+    return [(row["name"], row["task_id"]) for row in conn.execute(
+        "SELECT name, task_id, seq FROM tasks UNION ALL SELECT name, task_id, seq FROM subtasks ORDER BY seq")]
+
+
+def top_level_task_names(conn: sqlite3.Connection) -> list[str]:
+    """Names of all top-level tasks in list order."""
+    return [row["name"] for row in conn.execute("SELECT name FROM tasks ORDER BY seq")]
+
+
+def iter_lists(conn: sqlite3.Connection):
+    """Yield list rows in state order."""
+    yield from conn.execute("SELECT * FROM lists ORDER BY position")
+
+
+def list_task_rows(conn: sqlite3.Connection, list_id: str) -> list[sqlite3.Row]:
+    """Top-level tasks of a list with their subtask totals, in state order."""
+    return conn.execute(
+        """
+        SELECT t.*,
+               COUNT(s.task_id) AS sub_total,
+               COALESCE(SUM(s.status_type = 'closed'), 0) AS sub_done
+        FROM tasks t
+        LEFT JOIN subtasks s ON s.parent = t.task_id
+        WHERE t.list_id = ?
+        GROUP BY t.task_id
+        ORDER BY t.seq
+        """,
+        (list_id,),
+    ).fetchall()
+
+
+def upcoming_deadlines(conn: sqlite3.Connection, cutoff_ms: int) -> list[sqlite3.Row]:
+    """Open top-level tasks due on or before ``cutoff_ms``, soonest first."""
+    return conn.execute(
+        """
+        SELECT t.name, t.due_date, t.priority, l.list_name
+        FROM tasks t JOIN lists l ON l.list_id = t.list_id
+        WHERE t.due_date IS NOT NULL AND t.due_date <= ?
+          AND t.status_type IS NOT 'closed'
+        ORDER BY t.due_date, t.seq
+        """,
+        (cutoff_ms,),
+    ).fetchall()
+
+
+def query_tasks(
+    conn: sqlite3.Connection,
+    due_after: int | None = None,
+    due_before: int | None = None,
+    max_priority: int | None = None,
+    open_only: bool = False,
+    status_type: str | None = None,
+    list_name: str | None = None,
+    no_estimate: bool = False,
+    subtasks: bool = False,
+    limit: int | None = None,
+) -> list[sqlite3.Row]:
+    """Filter tasks through the store's indexes; dated tasks first, soonest due.
+
+    ``max_priority`` is a ClickUp priority id (1 = Urgent ... 4 = Low), so 2
+    means "High or more urgent". ``list_name`` matches list or folder names
+    (case-insensitive substring). With ``subtasks`` subtasks are included.
+    """
+    clauses, params = [], []
+    if due_after is not None:
+        clauses.append("t.due_date >= ?")
+        params.append(due_after)
+    if due_before is not None:
+        clauses.append("t.due_date <= ?")
+        params.append(due_before)
+    if max_priority is not None:
+        clauses.append("t.priority <= ?")
+        params.append(max_priority)
+    if open_only:
+        clauses.append("t.status_type IS NOT 'closed'")
+    if status_type:
+        clauses.append("t.status_type = ?")
+        params.append(status_type)
+    if list_name:
+        clauses.append("t.list_id IN (SELECT list_id FROM lists WHERE list_name LIKE ? OR folder_name LIKE ?)")
+        params += [f"%{list_name}%"] * 2
+    if no_estimate:
+        clauses.append("t.time_estimate IS NULL")
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    sql = f"""
+        SELECT t.task_id, t.parent, t.name, t.status, t.status_type, t.priority,
+               t.start_date, t.due_date, t.time_estimate, l.list_name, l.folder_name
+        FROM {'all_tasks' if subtasks else 'tasks'} t JOIN lists l ON l.list_id = t.list_id
+        {where}
+        ORDER BY t.due_date IS NULL, t.due_date, t.seq
+    """
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+
+def export_state(conn: sqlite3.Connection) -> dict:
+    """Rebuild the nested state dict (as written by the sync) from the store."""
+    state = read_meta(conn)
+    if not state.get("last_full_sync_at"):
+        state.pop("last_full_sync_at", None)
+
+    subtasks: dict[str, list[dict]] = {}
+    for row in conn.execute("SELECT parent, payload FROM subtasks ORDER BY seq"):
+        subtasks.setdefault(row["parent"], []).append(json.loads(row["payload"]))
+
+    tasks_by_list: dict[str, list[dict]] = {}
+    for row in conn.execute("SELECT task_id, list_id, payload FROM tasks ORDER BY seq"):
+        task = json.loads(row["payload"])
+        task["_subtasks"] = subtasks.get(row["task_id"], [])
+        tasks_by_list.setdefault(row["list_id"], []).append(task)
+
+    state["lists"] = [
+        {
+            "list_id": lst["list_id"],
+            "list_name": lst["list_name"],
+            "folder_name": lst["folder_name"],
+            "folder_id": lst["folder_id"],
+            "tasks": tasks_by_list.get(lst["list_id"], []),
+        }
+        for lst in iter_lists(conn)
+    ]
+    return state
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main():
+    from state_io import DEFAULT_STATE_FORMAT, STATE_FORMATS, state_path, write_state
+
+    parser = argparse.ArgumentParser(description="Inspect or export the SQLite state store")
+    parser.add_argument("--export", action="store_true",
+                        help="Export the store back to the JSON state file")
+    parser.add_argument("--format", choices=STATE_FORMATS, default=DEFAULT_STATE_FORMAT,
+                        help="State file format for --export")
+    args = parser.parse_args()
+
+    conn = open_state_db()
+    if conn is None:
+        print(f"❌ {STATE_DB.relative_to(PROJECT_ROOT)} not found — run sync_clickup_state.py first")
+        sys.exit(1)
+
+    if args.export:
+        path = state_path(STATE_FILE, args.format)
+        size = write_state(export_state(conn), path, args.format)
+        print(f"💾 Exported {path.relative_to(PROJECT_ROOT)} ({size / 1024:.0f} KB, {args.format})")
+    else:
+        meta = read_meta(conn)
+        stats = meta.get("stats") or {}
+        print(f"📦 {STATE_DB.relative_to(PROJECT_ROOT)} — synced {meta.get('synced_at')}")
+        print(f"  {stats.get('total_tasks', 0)} tasks, {stats.get('total_subtasks', 0)} subtasks, "
+              f"{stats.get('total_lists', 0)} lists")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — ClickUp State File I/O
+
+Streams the project state to disk list by list and atomically renames it
+into place, so a crash mid-write never leaves a truncated state file.
+
+Formats:
+  pretty   indented JSON (byte-identical to json.dump(indent=2))  .json
+  json     minified JSON                                           .json
+  gzip     minified JSON, gzip-compressed                          .json.gz
+  msgpack  MessagePack (msgpack package if installed, else the
+           pure-Python encoder below)                              .msgpack
+
+Readers call load_state(), which picks the newest state file and detects
+its format from the leading bytes.
+"""
+
+import gzip
+import io
+import json
+import os
+import struct
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import msgpack
+except ImportError:  # pure-Python fallback below
+    msgpack = None
+
+STATE_FORMATS = ("pretty", "json", "gzip", "msgpack")
+DEFAULT_STATE_FORMAT = "pretty"
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def state_path(base: Path, fmt: str) -> Path:
+    """Path for ``fmt`` next to ``base`` (the canonical .json state file)."""
+    if fmt == "gzip":
+        return base.with_name(base.name + ".gz")
+    if fmt == "msgpack":
+        return base.with_suffix(".msgpack")
+    return base
+
+
+def find_state_file(base: Path) -> Path | None:
+    """Return the most recently written state file in any format, if one exists."""
+    candidates = {state_path(base, fmt) for fmt in STATE_FORMATS}
+    existing = [p for p in candidates if p.exists()]
+    if not existing:
+        return None
+    return max(existing, key=lambda p: p.stat().st_mtime)
+
+
+# ── Writing ───────────────────────────────────────────────────────────────────
+
+@contextmanager
+def _text_stream(raw):
+    """UTF-8 text wrapper over a binary stream that leaves the stream open."""
+    f = io.TextIOWrapper(raw, encoding="utf-8")
+    try:
+        yield f
+    finally:
+        f.flush()
+        f.detach()
+
+
+def _write_json_stream(state: dict, f, pretty: bool):
+    """Write ``state`` as JSON, serializing one entry of ``lists`` at a time."""
+    if pretty:
+        dumps = lambda obj, pad: json.dumps(obj, indent=2, default=str).replace("\n", "\n" + pad)
+        open_obj, key_sep, item_sep, close_obj = "{\n  ", ": ", ",\n  ", "\n}"
+        open_list, list_sep, close_list = "[\n    ", ",\n    ", "\n  ]"
+    else:
+        dumps = lambda obj, pad: json.dumps(obj, separators=(",", ":"), default=str)
+        open_obj, key_sep, item_sep, close_obj = "{", ":", ",", "}"
+        open_list, list_sep, close_list = "[", ",", "]"
+
+    if not state:
+        f.write("{}")
+        return
+    f.write(open_obj)
+    for i, (key, value) in enumerate(state.items()):
+        if i:
+            f.write(item_sep)
+        f.write(json.dumps(key) + key_sep)
+        if key == "lists" and isinstance(value, list) and value:
+            f.write(open_list)
+            for j, lst in enumerate(value):
+                if j:
+                    f.write(list_sep)
+                f.write(dumps(lst, "    "))
+            f.write(close_list)
+        else:
+            f.write(dumps(value, "  "))
+    f.write(close_obj)
+
+
+def _write_msgpack_stream(state: dict, f):
+    """Write ``state`` as a MessagePack map, packing one entry of ``lists`` at a time."""
+    if msgpack is not None:
+        packer = msgpack.Packer(default=str)
+        pack, map_header, array_header = packer.pack, packer.pack_map_header, packer.pack_array_header
+    else:
+        pack = lambda obj: _pack(obj, bytearray())
+        map_header = lambda n: _container_header(n, 0x80, 0xDE, 0xDF)
+        array_header = lambda n: _container_header(n, 0x90, 0xDC, 0xDD)
+
+    f.write(map_header(len(state)))
+    for key, value in state.items():
+        f.write(pack(key))
+        if key == "lists" and isinstance(value, list):
+            f.write(array_header(len(value)))
+            for lst in value:
+                f.write(pack(lst))
+        else:
+            f.write(pack(value))
+
+
+def write_state(state: dict, path: Path, fmt: str = DEFAULT_STATE_FORMAT) -> int:
+    """Stream ``state`` to a temp file beside ``path`` and rename it into place.
+
+    Returns the number of bytes written.
+    """
+    if fmt not in STATE_FORMATS:
+        raise ValueError(f"Unknown state format: {fmt}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            if fmt == "msgpack":
+                _write_msgpack_stream(state, raw)
+            elif fmt == "gzip":
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as gz:
+                    with _text_stream(gz) as f:
+                        _write_json_stream(state, f, pretty=False)
+            else:
+                with _text_stream(raw) as f:
+                    _write_json_stream(state, f, pretty=fmt == "pretty")
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path.stat().st_size
+
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+
+def detect_format(head: bytes) -> str:
+    """Guess the on-disk format from the first bytes of a state file."""
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    stripped = head.lstrip()
+    if stripped.startswith(b"{"):
+        return "json"
+    if head and (0x80 <= head[0] <= 0x8F or head[0] in (0xDE, 0xDF)):
+        return "msgpack"
+    raise ValueError("Unrecognized state file format")
+
+
+def read_state(path: Path) -> dict:
+    """Read a state file in any supported format."""
+    with open(path, "rb") as f:
+        data = f.read()
+    fmt = detect_format(data[:16])
+    if fmt == "gzip":
+        return json.loads(gzip.decompress(data))
+    if fmt == "msgpack":
+        if msgpack is not None:
+            return msgpack.unpackb(data, raw=False, strict_map_key=False)
+        value, _ = _unpack(data, 0)
+        return value
+    return json.loads(data)
+
+
+def load_state(base: Path) -> dict | None:
+    """Load the newest state file next to ``base``; None if missing or unreadable."""
+    path = find_state_file(base)
+    if path is None:
+        return None
+    try:
+        return read_state(path)
+    except (OSError, ValueError, EOFError, struct.error):
+        return None
+
+
+# ── Pure-Python MessagePack ───────────────────────────────────────────────────
+# Covers the types json.load can produce (nil, bool, int, float, str, array,
+# map) plus bytes; anything else is packed as str, like json's default=str.
+
+def _container_header(n: int, fix: int, c16: int, c32: int) -> bytes:
+    if n < 16:
+        return bytes([fix | n])
+    if n < 0x10000:
+        return struct.pack(">BH", c16, n)
+    return struct.pack(">BI", c32, n)
+
+
+def _pack(obj, out: bytearray) -> bytearray:
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -32 <= obj < 0:
+            out.append(obj & 0xFF)
+        elif 0 <= obj < 2 ** 64:
+            out += struct.pack(">BQ", 0xCF, obj) if obj >= 2 ** 32 else struct.pack(">BI", 0xCE, obj)
+        elif -(2 ** 63) <= obj < 0:
+            out += struct.pack(">Bq", 0xD3, obj)
+        else:
+            _pack(str(obj), out)
+    elif isinstance(obj, float):
+        out += struct.pack(">Bd", 0xCB, obj)
+    elif isinstance(obj, str):
+        raw = obj.encode("utf-8")
+        n = len(raw)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n < 0x100:
+            out += struct.pack(">BB", 0xD9, n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xDA, n)
+        else:
+            out += struct.pack(">BI", 0xDB, n)
+        out += raw
+    elif isinstance(obj, (bytes, bytearray)):
+        n = len(obj)
+        if n < 0x100:
+            out += struct.pack(">BB", 0xC4, n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xC5, n)
+        else:
+            out += struct.pack(">BI", 0xC6, n)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        out += _container_header(len(obj), 0x90, 0xDC, 0xDD)
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        out += _container_header(len(obj), 0x80, 0xDE, 0xDF)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        _pack(str(obj), out)
+    return out
+
+
+_FIXED = {
+    0xCC: ">B", 0xCD: ">H", 0xCE: ">I", 0xCF: ">Q",
+    0xD0: ">b", 0xD1: ">h", 0xD2: ">i", 0xD3: ">q",
+    0xCA: ">f", 0xCB: ">d",
+}
+_STR_LEN = {0xD9: ">B", 0xDA: ">H", 0xDB: ">I", 0xC4: ">B", 0xC5: ">H", 0xC6: ">I"}
+
+
+def _unpack(data: bytes, pos: int):
+    """Decode one MessagePack value at ``pos``; returns (value, next_pos)."""
+    b = data[pos]
+    pos += 1
+    if b < 0x80:
+        return b, pos
+    if b >= 0xE0:
+        return b - 0x100, pos
+    if 0xA0 <= b <= 0xBF:
+        n = b & 0x1F
+        return data[pos:pos + n].decode("utf-8"), pos + n
+    if 0x90 <= b <= 0x9F:
+        return _unpack_array(data, pos, b & 0x0F)
+    if 0x80 <= b <= 0x8F:
+        return _unpack_map(data, pos, b & 0x0F)
+    if b == 0xC0:
+        return None, pos
+    if b == 0xC2:
+        return False, pos
+    if b == 0xC3:
+        return True, pos
+    if b in _FIXED:
+        fmt = _FIXED[b]
+        size = struct.calcsize(fmt)
+        return struct.unpack_from(fmt, data, pos)[0], pos + size
+    if b in _STR_LEN:
+        fmt = _STR_LEN[b]
+        size = struct.calcsize(fmt)
+        n = struct.unpack_from(fmt, data, pos)[0]
+        pos += size
+        raw = data[pos:pos + n]
+        return (raw.decode("utf-8") if b >= 0xD9 else bytes(raw)), pos + n
+    if b in (0xDC, 0xDD):
+        fmt = ">H" if b == 0xDC else ">I"
+        n = struct.unpack_from(fmt, data, pos)[0]
+        return _unpack_array(data, pos + struct.calcsize(fmt), n)
+    if b in (0xDE, 0xDF):
+        fmt = ">H" if b == 0xDE else ">I"
+        n = struct.unpack_from(fmt, data, pos)[0]
+        return _unpack_map(data, pos + struct.calcsize(fmt), n)
+    raise ValueError(f"Unsupported MessagePack type byte 0x{b:02x}")
+
+
+def _unpack_array(data: bytes, pos: int, n: int):
+    items = []
+    for _ in range(n):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(data: bytes, pos: int, n: int):
+    obj = {}
+    for _ in range(n):
+        key, pos = _unpack(data, pos)
+        obj[key], pos = _unpack(data, pos)
+    return obj, pos
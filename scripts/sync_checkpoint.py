@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Sync Checkpoints
+
+Scratch SQLite store of fetched task pages so an interrupted sync (429
+storm, network error, Ctrl-C) resumes where it stopped instead of starting
+over from the first folder.
+
+sync_clickup_state.py saves every page it fetches, keyed by the request
+(list or team page plus its date_updated_gt filter). A rerun serves those
+pages from the checkpoint and only requests the missing ones. The
+checkpoint is cleared once a sync has saved its output, and pages older
+than the configured max age are dropped on open, so a resume never mixes
+in data older than that.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS pages (
+    page_key TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    last_page INTEGER,
+    tasks TEXT NOT NULL
+);
+"""
+
+
+class CheckpointStore:
+    """Thread-safe page checkpoint shared by all fetch workers of one sync."""
+
+    def __init__(self, path: Path, max_age_seconds: float, scope: str = ""):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.saved = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+        # Pages fetched with other task fields (or expired) can't be reused
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'scope'").fetchone()
+        if row is None or row[0] != scope:
+            self.conn.execute("DELETE FROM pages")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('scope', ?)", (scope,))
+        self.conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - max_age_seconds,))
+        self.conn.commit()
+
+    def resumable(self) -> tuple[int, float | None]:
+        """(pages on hand, age in seconds of the oldest one)."""
+        with self.lock:
+            count, oldest = self.conn.execute("SELECT COUNT(*), MIN(fetched_at) FROM pages").fetchone()
+        return count, (time.time() - oldest) if oldest else None
+
+    def get(self, page_key: str) -> tuple[list[dict], bool | None] | None:
+        """Return (tasks, last_page) for a saved page, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT tasks, last_page FROM pages WHERE page_key = ?",
+                                    (page_key,)).fetchone()
+        if row is None:
+            return None
+        self.hits += 1
+        return json.loads(row[0]), (None if row[1] is None else bool(row[1]))
+
+    def put(self, page_key: str, tasks: list[dict], last_page: bool | None = None):
+        """Save one fetched page (committed immediately so a crash keeps it)."""
+        raw = json.dumps(tasks, separators=(",", ":"), default=str)
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                              (page_key, time.time(), last_page, raw))
+            self.conn.commit()
+            self.saved += 1
+
+    def clear(self):
+        """Forget all pages (after a sync has saved its output)."""
+        with self.lock:
+            self.conn.execute("DELETE FROM pages")
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -3,13 +3,22 @@
 BenefitGuard — ClickUp State Sync Script
 
 Fetches full project state from ClickUp API and saves:
-  - docs/clickup-project-state.json  (full state dump)
+  - docs/clickup-project-state.json  (full state dump; .json.gz / .msgpack
+                                      with --state-format gzip / msgpack)
+  - docs/clickup-project-state.sqlite (indexed store read by the sorter)
   - docs/clickup-daily-summary.md    (compact markdown summary)
+  - docs/clickup-history.sqlite      (compressed snapshot history, see snapshot_history.py)
+  - docs/clickup-task-index.bin      (TF-IDF index of existing tasks for the sorter, needs numpy)
+  - docs/clickup-analytics.md        (velocity / cycle time / estimate report, with --analytics)
 
-Optionally runs inbox sort first (if sort_inbox_tasks module is available).
+Every fetched page is checkpointed in docs/clickup-sync-checkpoint.sqlite
+until the outputs are saved, so an interrupted sync resumes where it stopped.
+
+Runs inbox sort first unless --skip-sort (sort_inbox_tasks is imported only then).
 
 Usage:
-  python3 scripts/sync_clickup_state.py [--skip-sort]
+  python3 scripts/sync_clickup_state.py [--skip-sort] [--workers N] [--engine list|team]
+                                        [--incremental [--full]]
 
 Requires: CLICKUP_API_KEY in .env
 """
@@ -17,54 +26,85 @@ Requires: CLICKUP_API_KEY in .env
 import json
 import os
 import sys
-import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
-import requests
-from dotenv import load_dotenv
+from clickup_client import ClickUpClient, TokenBucket, CLICKUP_RATE_LIMIT_PER_MIN
+from task_model import DEFAULT_TASK_FIELDS, parse_fields, project_tasks
+from snapshot_history import record_snapshot
+from sync_checkpoint import CheckpointStore
+from sync_metrics import finish_run, phase, start_run
+from state_db import export_state, iter_lists, list_content_hash, list_task_rows, open_state_db, upcoming_deadlines, write_state_db
+from state_io import DEFAULT_STATE_FORMAT, STATE_FORMATS, load_state, state_path, write_state
 
 # ── Config ────────────────────────────────────────────────────────────────────
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
-load_dotenv(PROJECT_ROOT / ".env")
 
+# Refreshed from .env by load_env(); already set when a parent process exported it
 CLICKUP_API_KEY = os.getenv("CLICKUP_API_KEY", "")
-BASE_URL = "https://api.clickup.com/api/v2"
-SPACE_ID = "90174101415"
-WORKSPACE_ID = "9017067210"
+# Defaults are the BenefitGuard space; sync_spaces.py sets these per space
+SPACE_ID = os.getenv("CLICKUP_SPACE_ID", "90174101415")
+WORKSPACE_ID = os.getenv("CLICKUP_WORKSPACE_ID", "9017067210")
+SPACE_NAME = os.getenv("CLICKUP_SPACE_NAME", "BenefitGuard")
 
-DOCS_DIR = PROJECT_ROOT / "docs"
-LOGS_DIR = PROJECT_ROOT / "logs"
+DOCS_DIR = Path(os.getenv("CLICKUP_DOCS_DIR", PROJECT_ROOT / "docs"))
+LOGS_DIR = Path(os.getenv("CLICKUP_LOGS_DIR", PROJECT_ROOT / "logs"))
 STATE_FILE = DOCS_DIR / "clickup-project-state.json"
 SUMMARY_FILE = DOCS_DIR / "clickup-daily-summary.md"
+STATE_DB = DOCS_DIR / "clickup-project-state.sqlite"
+SUMMARY_CACHE_FILE = DOCS_DIR / "clickup-summary-cache.json"
+CHECKPOINT_DB = DOCS_DIR / "clickup-sync-checkpoint.sqlite"
+HISTORY_DB = DOCS_DIR / "clickup-history.sqlite"
+ANALYTICS_FILE = DOCS_DIR / "clickup-analytics.md"
+TASK_INDEX_FILE = DOCS_DIR / "clickup-task-index.bin"
 
 PRIORITY_MAP = {1: "Urgent", 2: "High", 3: "Normal", 4: "Low"}
 
+PAGE_SIZE = 100
+
+# Incremental syncs re-request a small window before the last sync to absorb clock skew
+INCREMENTAL_OVERLAP_MS = 60_000
+FULL_SYNC_EVERY_HOURS = 24
+
+# Pages saved by an interrupted sync are reused by a rerun within this window
+CHECKPOINT_MAX_AGE_MINUTES = 60
+
+# Raw task fields kept in memory and on disk (None keeps full payloads; see --keep-raw)
+task_fields: tuple[str, ...] | None = DEFAULT_TASK_FIELDS
+
+# Page checkpoint of the running sync (None when disabled)
+checkpoint: CheckpointStore | None = None
+
 # ── API helpers ───────────────────────────────────────────────────────────────
 
-session = requests.Session()
-session.headers.update({
-    "Authorization": CLICKUP_API_KEY,
-    "Content-Type": "application/json",
-})
-
-
-def api_get(path: str, params: dict | None = None, retries: int = 3) -> dict:
-    """GET from ClickUp API with retry on 429 rate limit."""
-    url = f"{BASE_URL}{path}"
-    for attempt in range(retries):
-        resp = session.get(url, params=params)
-        if resp.status_code == 200:
-            return resp.json()
-        if resp.status_code == 429:
-            wait = 2 ** attempt + 1
-            print(f"  ⏳ Rate limited, waiting {wait}s...")
-            time.sleep(wait)
-            continue
-        resp.raise_for_status()
-    raise RuntimeError(f"Failed after {retries} retries: {url}")
+_client: ClickUpClient | None = None
+
+
+def load_env():
+    """Load .env into the environment (python-dotenv is only imported here)."""
+    global CLICKUP_API_KEY
+    from dotenv import load_dotenv
+
+    load_dotenv(PROJECT_ROOT / ".env")
+    CLICKUP_API_KEY = os.getenv("CLICKUP_API_KEY", "")
+
+
+def get_client() -> ClickUpClient:
+    """The module's ClickUp client, built on first use so importing makes no client."""
+    global _client
+    if _client is None:
+        if not CLICKUP_API_KEY:
+            load_env()
+        _client = ClickUpClient(CLICKUP_API_KEY)
+    return _client
+
+
+def api_get(path: str, params: dict | None = None, retries: int | None = None) -> dict:
+    """GET from ClickUp API, paced by its rate-limit headers and retried on errors."""
+    return get_client().get(path, params, retries=retries)
 
 
 # ── Data fetching ─────────────────────────────────────────────────────────────
@@ -81,138 +121,417 @@ def fetch_folderless_lists() -> list[dict]:
     return data.get("lists", [])
 
 
-def fetch_tasks_for_list(list_id: str) -> list[dict]:
+def fetch_task_page(list_id: str, page: int, updated_since: int | None = None) -> list[dict]:
+    """Fetch a single page (up to 100 tasks, including closed) for a list.
+
+    ``updated_since`` (epoch ms) restricts the page to tasks changed after it.
+    """
+    params = {
+        "include_closed": "true",
+        "subtasks": "true",
+        "page": str(page),
+    }
+    if updated_since is not None:
+        params["date_updated_gt"] = str(updated_since)
+    key = f"list/{list_id}/{page}/{updated_since}"
+    if checkpoint and (saved := checkpoint.get(key)) is not None:
+        return saved[0]
+    data = api_get(f"/list/{list_id}/task", params)
+    tasks = project_tasks(data.get("tasks", []), task_fields)
+    if checkpoint:
+        checkpoint.put(key, tasks)
+    return tasks
+
+
+def fetch_tasks_for_list(list_id: str, updated_since: int | None = None) -> list[dict]:
     """Fetch all tasks (including closed) for a list. Handles pagination."""
     all_tasks = []
     page = 0
     while True:
-        data = api_get(f"/list/{list_id}/task", {
-            "include_closed": "true",
-            "subtasks": "true",
-            "page": str(page),
-        })
-        tasks = data.get("tasks", [])
+        tasks = fetch_task_page(list_id, page, updated_since)
         if not tasks:
             break
         all_tasks.extend(tasks)
         # ClickUp returns up to 100 tasks per page
-        if len(tasks) < 100:
+        if len(tasks) < PAGE_SIZE:
             break
         page += 1
-        time.sleep(0.3)  # gentle rate limit respect
     return all_tasks
 
 
-def build_full_state() -> dict:
-    """Build the complete project state dictionary."""
-    print("📦 Fetching project state from ClickUp...")
-
+def fetch_lists_concurrent(list_ids: list[str], workers: int,
+                           updated_since: dict[str, int | None] | None = None) -> dict[str, list[dict]]:
+    """Fetch every page of every list on a thread pool.
+
+    Page 0 of every list is queued up front; each full page queues the next
+    page of the same list as soon as it lands, so pages of different lists
+    overlap. Pages are reassembled in page order, which keeps the result
+    identical to calling fetch_tasks_for_list() serially.
+    """
+    since = updated_since or {}
+    pages: dict[str, dict[int, list[dict]]] = {lid: {} for lid in list_ids}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {
+            pool.submit(fetch_task_page, lid, 0, since.get(lid)): (lid, 0) for lid in list_ids
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                lid, page = pending.pop(fut)
+                tasks = fut.result()
+                pages[lid][page] = tasks
+                if len(tasks) >= PAGE_SIZE:
+                    nxt = pool.submit(fetch_task_page, lid, page + 1, since.get(lid))
+                    pending[nxt] = (lid, page + 1)
+
+    results = {}
+    for lid, by_page in pages.items():
+        results[lid] = [t for page in sorted(by_page) for t in by_page[page]]
+    return results
+
+
+def fetch_space_targets() -> list[tuple[dict, dict | None]]:
+    """Return (list, folder) pairs in output order: folder lists, then folderless."""
     folders = fetch_folders()
     folderless_lists = fetch_folderless_lists()
+    targets = [(lst, folder) for folder in folders for lst in folder.get("lists", [])]
+    targets += [(lst, None) for lst in folderless_lists]
+    return targets
 
-    all_lists = []
-    total_tasks = 0
-    total_subtasks = 0
-    total_completed = 0
-    total_subtasks_completed = 0
-
-    # Process folders
-    for folder in folders:
-        folder_name = folder["name"]
-        for lst in folder.get("lists", []):
-            list_id = lst["id"]
-            list_name = lst["name"]
-            print(f"  📋 {folder_name} / {list_name}...")
-            tasks = fetch_tasks_for_list(list_id)
-
-            # Separate top-level tasks from subtasks
-            top_level = []
-            subtask_map = {}  # parent_id -> list of subtasks
-            for t in tasks:
-                parent = t.get("parent")
-                if parent:
-                    subtask_map.setdefault(parent, []).append(t)
-                    total_subtasks += 1
-                    if t.get("status", {}).get("type") == "closed":
-                        total_subtasks_completed += 1
+
+def fetch_team_page(page: int, updated_since: int | None = None) -> tuple[list[dict], bool]:
+    """Fetch one page of the space's tasks from the workspace filtered-tasks endpoint.
+
+    Returns (tasks, is_last_page).
+    """
+    params = {
+        "space_ids[]": [SPACE_ID],
+        "include_closed": "true",
+        "subtasks": "true",
+        "page": str(page),
+    }
+    if updated_since is not None:
+        params["date_updated_gt"] = str(updated_since)
+    key = f"team/{page}/{updated_since}"
+    if checkpoint and (saved := checkpoint.get(key)) is not None:
+        return saved
+    data = api_get(f"/team/{WORKSPACE_ID}/task", params)
+    tasks = data.get("tasks", [])
+    result = project_tasks(tasks, task_fields), data.get("last_page", len(tasks) < PAGE_SIZE)
+    if checkpoint:
+        checkpoint.put(key, *result)
+    return result
+
+
+def fetch_space_tasks(workers: int = 1, updated_since: int | None = None) -> list[dict]:
+    """Page through every task in the space, independent of how many lists it has.
+
+    With ``workers > 1`` pages are requested in windows of ``workers``
+    consecutive pages; the window containing the last page ends the loop.
+    """
+    all_tasks = []
+    page = 0
+    window = max(1, workers)
+    with ThreadPoolExecutor(max_workers=window) as pool:
+        while True:
+            batch = list(pool.map(lambda p: fetch_team_page(p, updated_since), range(page, page + window)))
+            for tasks, last_page in batch:
+                all_tasks.extend(tasks)
+                if last_page or not tasks:
+                    return all_tasks
+            page += window
+
+
+def fetch_target_tasks_team(targets: list[tuple[dict, dict | None]], workers: int,
+                            since: dict[str, int | None]) -> dict[str, list[dict]]:
+    """Fetch tasks through the team endpoint and regroup them by list.
+
+    Delta lists share one ``date_updated_gt`` query; lists that need a full
+    fetch during an incremental run (new lists) use the per-list path.
+    """
+    delta = {lid: ms for lid, ms in since.items() if ms is not None}
+    if delta:
+        wanted = set(delta)
+        full_targets = [(lst, folder) for lst, folder in targets if lst["id"] not in wanted]
+        space_since = min(delta.values())
+    else:
+        wanted = {lst["id"] for lst, _ in targets}
+        full_targets = []
+        space_since = None
+
+    print(f"  🌐 Fetching space tasks via /team/{WORKSPACE_ID}/task...")
+    results: dict[str, list[dict]] = {lid: [] for lid in wanted}
+    for t in fetch_space_tasks(workers, space_since):
+        lid = (t.get("list") or {}).get("id")
+        if lid in results:
+            results[lid].append(t)
+
+    if full_targets:
+        results.update(fetch_target_tasks(full_targets, workers, engine="list"))
+    return results
+
+
+def fetch_target_tasks(targets: list[tuple[dict, dict | None]], workers: int = 1,
+                       rate_per_min: int = CLICKUP_RATE_LIMIT_PER_MIN,
+                       updated_since: dict[str, int | None] | None = None,
+                       engine: str = "list") -> dict[str, list[dict]]:
+    """Fetch raw tasks for every target list, serially or on a worker pool.
+
+    ``updated_since`` maps list_id → epoch ms for delta fetches; lists missing
+    from it (or mapped to None) are fetched in full. ``engine`` selects
+    per-list requests ("list") or the space-wide filtered endpoint ("team").
+    """
+    since = updated_since or {}
+    client = get_client()
+    concurrent = workers > 1 and client.limiter is None
+    if concurrent:
+        client.limiter = TokenBucket(rate_per_min)
+        client.resize_pool(workers)
+
+    try:
+        if engine == "team":
+            return fetch_target_tasks_team(targets, workers, since)
+
+        if workers <= 1:
+            results = {}
+            for lst, folder in targets:
+                if folder:
+                    print(f"  📋 {folder['name']} / {lst['name']}...")
                 else:
-                    top_level.append(t)
-                    total_tasks += 1
-                    if t.get("status", {}).get("type") == "closed":
-                        total_completed += 1
-
-            # Attach subtasks to their parents
-            for t in top_level:
-                t["_subtasks"] = subtask_map.get(t["id"], [])
-
-            all_lists.append({
-                "list_id": list_id,
-                "list_name": list_name,
-                "folder_name": folder_name,
-                "folder_id": folder["id"],
-                "tasks": top_level,
-            })
-
-    # Process folderless lists
-    for lst in folderless_lists:
-        list_id = lst["id"]
-        list_name = lst["name"]
-        print(f"  📋 (folderless) {list_name}...")
-        tasks = fetch_tasks_for_list(list_id)
-
-        top_level = []
-        subtask_map = {}
-        for t in tasks:
-            parent = t.get("parent")
-            if parent:
-                subtask_map.setdefault(parent, []).append(t)
-                total_subtasks += 1
-                if t.get("status", {}).get("type") == "closed":
-                    total_subtasks_completed += 1
-            else:
-                top_level.append(t)
-                total_tasks += 1
-                if t.get("status", {}).get("type") == "closed":
-                    total_completed += 1
-
-        for t in top_level:
-            t["_subtasks"] = subtask_map.get(t["id"], [])
-
-        all_lists.append({
-            "list_id": list_id,
-            "list_name": list_name,
-            "folder_name": None,
-            "folder_id": None,
-            "tasks": top_level,
-        })
+                    print(f"  📋 (folderless) {lst['name']}...")
+                results[lst["id"]] = fetch_tasks_for_list(lst["id"], since.get(lst["id"]))
+            return results
+
+        print(f"  ⚡ Fetching {len(targets)} lists with {workers} workers...")
+        return fetch_lists_concurrent([lst["id"] for lst, _ in targets], workers, since)
+    finally:
+        if concurrent:
+            client.limiter = None
+
+
+def group_subtasks(tasks: list[dict]) -> list[dict]:
+    """Return top-level tasks with their subtasks attached under ``_subtasks``."""
+    top_level = []
+    subtask_map = {}  # parent_id -> list of subtasks
+    for t in tasks:
+        parent = t.get("parent")
+        if parent:
+            subtask_map.setdefault(parent, []).append(t)
+        else:
+            top_level.append(t)
+    for t in top_level:
+        t["_subtasks"] = subtask_map.get(t["id"], [])
+    return top_level
+
+
+def compute_stats(all_lists: list[dict]) -> dict:
+    """Recompute the ``stats`` block from nested list/task/subtask data."""
+    stats = {
+        "total_tasks": 0,
+        "completed_tasks": 0,
+        "total_subtasks": 0,
+        "completed_subtasks": 0,
+        "total_lists": len(all_lists),
+    }
+    for lst in all_lists:
+        for t in lst["tasks"]:
+            stats["total_tasks"] += 1
+            if t.get("status", {}).get("type") == "closed":
+                stats["completed_tasks"] += 1
+            for sub in t.get("_subtasks", []):
+                stats["total_subtasks"] += 1
+                if sub.get("status", {}).get("type") == "closed":
+                    stats["completed_subtasks"] += 1
+    return stats
+
+
+def list_entry(lst: dict, folder: dict | None, tasks: list[dict]) -> dict:
+    """Build one entry of ``state["lists"]``."""
+    return {
+        "list_id": lst["id"],
+        "list_name": lst["name"],
+        "folder_name": folder["name"] if folder else None,
+        "folder_id": folder["id"] if folder else None,
+        "tasks": tasks,
+    }
+
+
+def fetch_started_at() -> str:
+    """Timestamp to store as ``synced_at``: when this sync's data was read.
+
+    Taken before the first request, or at the oldest checkpointed page when
+    resuming, so a task edited mid-fetch is still newer than ``synced_at``
+    and the next incremental sync picks it up.
+    """
+    started = datetime.now(timezone.utc)
+    age = checkpoint.resumable()[1] if checkpoint else None
+    return (started - timedelta(seconds=age or 0)).isoformat()
+
+
+def build_full_state(workers: int = 1, rate_per_min: int = CLICKUP_RATE_LIMIT_PER_MIN,
+                     engine: str = "list") -> dict:
+    """Build the complete project state dictionary.
+
+    With ``workers > 1`` lists and pages are fetched concurrently, paced by a
+    single shared TokenBucket; the resulting state is identical to a serial run.
+    ``engine="team"`` pages through the whole space instead of list by list.
+    """
+    print("📦 Fetching project state from ClickUp...")
+
+    synced_at = fetch_started_at()
+    with phase("fetch"):
+        targets = fetch_space_targets()
+        fetched = fetch_target_tasks(targets, workers, rate_per_min, engine=engine)
+
+    with phase("build"):
+        all_lists = [list_entry(lst, folder, group_subtasks(fetched[lst["id"]])) for lst, folder in targets]
 
     state = {
-        "synced_at": datetime.now(timezone.utc).isoformat(),
+        "synced_at": synced_at,
+        "last_full_sync_at": synced_at,
         "workspace_id": WORKSPACE_ID,
         "space_id": SPACE_ID,
-        "space_name": "BenefitGuard",
-        "stats": {
-            "total_tasks": total_tasks,
-            "completed_tasks": total_completed,
-            "total_subtasks": total_subtasks,
-            "completed_subtasks": total_subtasks_completed,
-            "total_lists": len(all_lists),
-        },
+        "space_name": SPACE_NAME,
+        "stats": compute_stats(all_lists),
         "lists": all_lists,
     }
 
-    print(f"  ✅ {total_tasks} tasks, {total_subtasks} subtasks across {len(all_lists)} lists")
+    stats = state["stats"]
+    print(f"  ✅ {stats['total_tasks']} tasks, {stats['total_subtasks']} subtasks across {len(all_lists)} lists")
+    return state
+
+
+# ── Incremental sync ──────────────────────────────────────────────────────────
+
+def load_previous_state() -> dict | None:
+    """Load the last saved state, or None if missing or unreadable.
+
+    The SQLite store is always written, so it is preferred over the JSON
+    file (which --no-json skips).
+    """
+    conn = open_state_db(STATE_DB)
+    if conn is not None:
+        state = export_state(conn)
+        conn.close()
+    else:
+        state = load_state(STATE_FILE)
+    if not state or not state.get("synced_at") or "lists" not in state:
+        return None
+    return state
+
+
+def iso_to_ms(iso: str) -> int:
+    """Convert an ISO-8601 timestamp to ClickUp epoch milliseconds."""
+    return int(datetime.fromisoformat(iso).timestamp() * 1000)
+
+
+def needs_full_sync(previous: dict | None, full_every_hours: float) -> bool:
+    """Decide whether the schedule (or missing state) calls for a full resync."""
+    if previous is None:
+        return True
+    last_full = previous.get("last_full_sync_at")
+    if not last_full:
+        return True
+    age = datetime.now(timezone.utc) - datetime.fromisoformat(last_full)
+    return age >= timedelta(hours=full_every_hours)
+
+
+def flatten_list_tasks(lst: dict) -> list[dict]:
+    """Undo group_subtasks(): each parent followed by its subtasks, without ``_subtasks``."""
+    flat = []
+    for t in lst["tasks"]:
+        top = {k: v for k, v in t.items() if k != "_subtasks"}
+        flat.append(top)
+        flat.extend(t.get("_subtasks", []))
+    return flat
+
+
+def merge_task_changes(previous: dict, targets: list[tuple[dict, dict | None]],
+                       fetched: dict[str, list[dict]], fresh_lists: set[str]) -> list[dict]:
+    """Merge delta-fetched tasks into the previous state's lists.
+
+    ``fetched`` holds, per list, either the changed tasks (delta lists) or
+    every task (lists in ``fresh_lists``, which were not in the previous
+    state). A changed task replaces its old copy in place when it stayed in
+    the same list; if it moved, it is dropped from its old list and appended
+    to the new one. Lists that disappeared from the space are dropped.
+    """
+    old_by_list = {lst["list_id"]: flatten_list_tasks(lst) for lst in previous["lists"]}
+    moved_to = {t["id"]: lid for lid, tasks in fetched.items() for t in tasks}
+
+    all_lists = []
+    for lst, folder in targets:
+        lid = lst["id"]
+        if lid in fresh_lists:
+            merged = fetched[lid]
+        else:
+            incoming = {t["id"]: t for t in fetched.get(lid, [])}
+            merged = []
+            for t in old_by_list.get(lid, []):
+                if t["id"] in incoming:
+                    merged.append(incoming.pop(t["id"]))
+                elif t["id"] not in moved_to:
+                    merged.append(t)
+            merged.extend(incoming.values())
+        all_lists.append(list_entry(lst, folder, group_subtasks(merged)))
+    return all_lists
+
+
+def build_incremental_state(previous: dict, workers: int = 1,
+                            rate_per_min: int = CLICKUP_RATE_LIMIT_PER_MIN,
+                            engine: str = "list") -> dict:
+    """Fetch only tasks updated since the previous sync and merge them in.
+
+    Uses ClickUp's ``date_updated_gt`` filter, so the request count scales
+    with the number of changed tasks rather than the size of the space.
+    Moves are handled by task id; deletions are not reported by this filter
+    and are repaired by the next scheduled full sync (or at once by the
+    webhook mirror). Until then the sorter checks a parent it fails to file
+    under, and files the task top-level if the parent has been deleted.
+    """
+    print("📦 Fetching changes from ClickUp since last sync...")
+
+    since = iso_to_ms(previous["synced_at"]) - INCREMENTAL_OVERLAP_MS
+    known = {lst["list_id"] for lst in previous["lists"]}
+    synced_at = fetch_started_at()
+    with phase("fetch"):
+        targets = fetch_space_targets()
+        fresh_lists = {lst["id"] for lst, _ in targets if lst["id"] not in known}
+        updated_since = {lst["id"]: (None if lst["id"] in fresh_lists else since) for lst, _ in targets}
+        fetched = fetch_target_tasks(targets, workers, rate_per_min, updated_since, engine)
+
+    with phase("build"):
+        all_lists = merge_task_changes(previous, targets, fetched, fresh_lists)
+
+    changed = sum(len(tasks) for lid, tasks in fetched.items() if lid not in fresh_lists)
+    state = {
+        "synced_at": synced_at,
+        "last_full_sync_at": previous.get("last_full_sync_at"),
+        "workspace_id": WORKSPACE_ID,
+        "space_id": SPACE_ID,
+        "space_name": SPACE_NAME,
+        "stats": compute_stats(all_lists),
+        "lists": all_lists,
+    }
+
+    stats = state["stats"]
+    print(f"  🔁 {changed} changed task(s), {len(fresh_lists)} new list(s)")
+    print(f"  ✅ {stats['total_tasks']} tasks, {stats['total_subtasks']} subtasks across {len(all_lists)} lists")
     return state
 
 
 # ── File writing ──────────────────────────────────────────────────────────────
 
-def save_json(state: dict):
-    """Save full state to JSON."""
-    DOCS_DIR.mkdir(parents=True, exist_ok=True)
-    with open(STATE_FILE, "w") as f:
-        json.dump(state, f, indent=2, default=str)
-    print(f"  💾 Saved {STATE_FILE.relative_to(PROJECT_ROOT)}")
+def display_path(path: Path) -> Path:
+    """``path`` relative to the project root when it lives inside it."""
+    return path.relative_to(PROJECT_ROOT) if path.is_relative_to(PROJECT_ROOT) else path
+
+
+def save_json(state: dict, fmt: str = DEFAULT_STATE_FORMAT):
+    """Stream full state to disk (atomically) in the chosen format."""
+    path = state_path(STATE_FILE, fmt)
+    size = write_state(state, path, fmt)
+    print(f"  💾 Saved {display_path(path)} ({size / 1024:.0f} KB, {fmt})")
 
 
 def format_date(epoch_ms) -> str:
@@ -234,14 +553,137 @@ def task_priority_label(task: dict) -> str:
     return "Normal"
 
 
-def save_summary(state: dict):
-    """Generate and save compact markdown summary."""
+def summary_rows_from_state(lst_data: dict) -> list[dict]:
+    """Summary rows for one list, walking the nested state dict."""
+    rows = []
+    for t in lst_data["tasks"]:
+        subtasks = t.get("_subtasks", [])
+        rows.append({
+            "name": t.get("name", "Untitled"),
+            "closed": t.get("status", {}).get("type") == "closed",
+            "priority": task_priority_label(t),
+            "start_date": t.get("start_date"),
+            "due_date": t.get("due_date"),
+            "time_estimate": t.get("time_estimate"),
+            "sub_done": sum(1 for s in subtasks if s.get("status", {}).get("type") == "closed"),
+            "sub_total": len(subtasks),
+        })
+    return rows
+
+
+def summary_rows_from_db(conn, list_id: str) -> list[dict]:
+    """Summary rows for one list, via the indexed SQLite store."""
+    return [
+        {
+            "name": row["name"] or "Untitled",
+            "closed": row["status_type"] == "closed",
+            "priority": PRIORITY_MAP.get(row["priority"] or 3, "Normal"),
+            "start_date": row["start_date"],
+            "due_date": row["due_date"],
+            "time_estimate": row["time_estimate"],
+            "sub_done": row["sub_done"],
+            "sub_total": row["sub_total"],
+        }
+        for row in list_task_rows(conn, list_id)
+    ]
+
+
+def render_list_fragment(list_name: str, folder_name: str | None,
+                         tasks: list[dict]) -> tuple[list[str], list[list]]:
+    """Render one list's summary section.
+
+    Returns (markdown lines, deadline candidates). Candidates are every open
+    task with a due date as [due_ms, due, name, list, priority]; the 30-day
+    window is applied at render time so cached candidates never go stale.
+    """
+    lines = []
+    deadlines = []
+    completed = sum(1 for t in tasks if t["closed"])
+    total = len(tasks)
+
+    header = f"### {list_name}"
+    if folder_name:
+        header = f"### {folder_name} → {list_name}"
+    lines.append(header)
+    lines.append(f"{completed}/{total} tasks done\n")
+
+    for t in tasks:
+        is_done = t["closed"]
+        icon = "✅" if is_done else "⬜"
+        name = t["name"]
+        priority = t["priority"]
+        start = format_date(t["start_date"])
+        due = format_date(t["due_date"])
+        sub_done = t["sub_done"]
+        sub_total = t["sub_total"]
+
+        # Date string
+        date_str = ""
+        if start and due:
+            date_str = f" [{start} → {due}]"
+        elif due:
+            date_str = f" [due {due}]"
+        elif start:
+            date_str = f" [start {start}]"
+
+        # Subtask count
+        sub_str = ""
+        if sub_total > 0:
+            sub_str = f" [{sub_done}/{sub_total} subtasks]"
+
+        # Time estimate
+        time_est = t["time_estimate"]
+        time_str = ""
+        if time_est:
+            hrs = int(time_est) / 3_600_000
+            if hrs >= 1:
+                time_str = f" ~{hrs:.0f}h"
+
+        lines.append(f"- {icon} **{name}**{date_str} (Priority: {priority}){sub_str}{time_str}")
+
+        # Collect deadline candidates
+        if not is_done and t["due_date"]:
+            try:
+                deadlines.append([int(t["due_date"]), due, name, list_name, priority])
+            except (ValueError, TypeError):
+                pass
+
+    lines.append("")
+    return lines, deadlines
+
+
+def load_summary_cache() -> dict:
+    """Load cached per-list summary fragments keyed by list_id."""
+    try:
+        with open(SUMMARY_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def strip_sync_stamp(text: str) -> str:
+    """Drop the "Last synced" line so summaries can be compared by content."""
+    return "\n".join(line for line in text.split("\n") if not line.startswith("**Last synced:**"))
+
+
+def save_summary(state: dict, conn=None):
+    """Generate and save compact markdown summary.
+
+    With ``conn`` (the SQLite state store) list contents and the deadline
+    table are read through its indexes instead of walking ``state``.
+
+    Each list's markdown is cached in SUMMARY_CACHE_FILE under its content
+    hash and reused when the list has not changed, so an unchanged space
+    costs no fragment rendering. The file is still rewritten on every sync
+    so its "Last synced" stamp (which the sync workflow reads to judge
+    staleness) stays current; only an identical file is left alone.
+    """
     DOCS_DIR.mkdir(parents=True, exist_ok=True)
     stats = state["stats"]
     synced = state["synced_at"]
 
     lines = []
-    lines.append("# BenefitGuard: Project Status\n")
+    lines.append(f"# {SPACE_NAME}: Project Status\n")
     lines.append(f"**Last synced:** {synced}")
     lines.append(f"**Space ID:** {state['space_id']}")
     lines.append(f"**Workspace:** Jeff C's Workspace ({state['workspace_id']})")
@@ -254,127 +696,235 @@ def save_summary(state: dict):
 
     lines.append("## Lists\n")
 
-    # Collect upcoming deadlines
-    upcoming = []
     now = datetime.now(timezone.utc)
-    cutoff = now + timedelta(days=30)
-
-    for lst_data in state["lists"]:
-        list_name = lst_data["list_name"]
-        folder_name = lst_data["folder_name"]
-        tasks = lst_data["tasks"]
-
-        completed = sum(1 for t in tasks if t.get("status", {}).get("type") == "closed")
-        total = len(tasks)
-
-        header = f"### {list_name}"
-        if folder_name:
-            header = f"### {folder_name} → {list_name}"
-        lines.append(header)
-        lines.append(f"{completed}/{total} tasks done\n")
-
-        for t in tasks:
-            is_done = t.get("status", {}).get("type") == "closed"
-            icon = "✅" if is_done else "⬜"
-            name = t.get("name", "Untitled")
-            priority = task_priority_label(t)
-            start = format_date(t.get("start_date"))
-            due = format_date(t.get("due_date"))
-            subtasks = t.get("_subtasks", [])
-            sub_done = sum(1 for s in subtasks if s.get("status", {}).get("type") == "closed")
-            sub_total = len(subtasks)
-
-            # Date string
-            date_str = ""
-            if start and due:
-                date_str = f" [{start} → {due}]"
-            elif due:
-                date_str = f" [due {due}]"
-            elif start:
-                date_str = f" [start {start}]"
-
-            # Subtask count
-            sub_str = ""
-            if sub_total > 0:
-                sub_str = f" [{sub_done}/{sub_total} subtasks]"
-
-            # Time estimate
-            time_est = t.get("time_estimate")
-            time_str = ""
-            if time_est:
-                hrs = int(time_est) / 3_600_000
-                if hrs >= 1:
-                    time_str = f" ~{hrs:.0f}h"
-
-            lines.append(f"- {icon} **{name}**{date_str} (Priority: {priority}){sub_str}{time_str}")
-
-            # Collect upcoming deadlines
-            if not is_done and t.get("due_date"):
-                try:
-                    due_dt = datetime.fromtimestamp(int(t["due_date"]) / 1000, tz=timezone.utc)
-                    if due_dt <= cutoff:
-                        upcoming.append({
-                            "due": format_date(t["due_date"]),
-                            "due_dt": due_dt,
-                            "name": name,
-                            "list": list_name,
-                            "priority": priority,
-                        })
-                except (ValueError, TypeError, OSError):
-                    pass
-
-        lines.append("")
+    cutoff_ms = int((now + timedelta(days=30)).timestamp() * 1000)
+
+    # (list_id, list_name, folder_name, content_hash, row loader) per list
+    if conn is not None:
+        sections = [
+            (row["list_id"], row["list_name"], row["folder_name"], row["content_hash"],
+             lambda lid=row["list_id"]: summary_rows_from_db(conn, lid))
+            for row in iter_lists(conn)
+        ]
+    else:
+        sections = [
+            (lst_data["list_id"], lst_data["list_name"], lst_data["folder_name"],
+             list_content_hash(lst_data), lambda lst_data=lst_data: summary_rows_from_state(lst_data))
+            for lst_data in state["lists"]
+        ]
+
+    cache = load_summary_cache()
+    new_cache = {}
+    reused = 0
+    deadlines = []
+    for list_id, list_name, folder_name, content_hash, load_rows in sections:
+        entry = cache.get(list_id)
+        if entry and content_hash and entry.get("hash") == content_hash:
+            reused += 1
+        else:
+            fragment, candidates = render_list_fragment(list_name, folder_name, load_rows())
+            entry = {"hash": content_hash, "lines": fragment, "deadlines": candidates}
+        new_cache[list_id] = entry
+        lines.extend(entry["lines"])
+        deadlines.extend(entry["deadlines"])
+
+    # Upcoming deadlines (the store answers this with an index)
+    if conn is not None:
+        upcoming = [
+            (format_date(row["due_date"]), row["name"] or "Untitled", row["list_name"],
+             PRIORITY_MAP.get(row["priority"] or 3, "Normal"))
+            for row in upcoming_deadlines(conn, cutoff_ms)
+        ]
+    else:
+        due_soon = sorted((d for d in deadlines if d[0] <= cutoff_ms), key=lambda d: d[0])
+        upcoming = [(due, name, list_name, priority) for _, due, name, list_name, priority in due_soon]
 
     # Upcoming deadlines table
     if upcoming:
-        upcoming.sort(key=lambda x: x["due_dt"])
         lines.append("## Upcoming Deadlines (Next 30 Days)\n")
         lines.append("| Due | Task | List | Priority |")
         lines.append("|-----|------|------|----------|")
-        for item in upcoming:
-            lines.append(f"| {item['due']} | {item['name']} | {item['list']} | {item['priority']} |")
+        for due, name, list_name, priority in upcoming:
+            lines.append(f"| {due} | {name} | {list_name} | {priority} |")
         lines.append("")
 
     summary_text = "\n".join(lines)
+    if new_cache != cache:
+        write_state(new_cache, SUMMARY_CACHE_FILE, "json")
+
+    previous = SUMMARY_FILE.read_text() if SUMMARY_FILE.exists() else None
+    if previous == summary_text:
+        print(f"  ✓ {display_path(SUMMARY_FILE)} unchanged ({reused}/{len(sections)} lists cached)")
+        return
     with open(SUMMARY_FILE, "w") as f:
         f.write(summary_text)
-    print(f"  💾 Saved {SUMMARY_FILE.relative_to(PROJECT_ROOT)}")
+    if previous is not None and strip_sync_stamp(previous) == strip_sync_stamp(summary_text):
+        print(f"  🕒 {display_path(SUMMARY_FILE)} content unchanged, sync stamp refreshed "
+              f"({reused}/{len(sections)} lists cached)")
+    else:
+        print(f"  💾 Saved {display_path(SUMMARY_FILE)} ({reused}/{len(sections)} lists cached)")
+
+
+def save_db(state: dict):
+    """Write the indexed SQLite state store."""
+    write_state_db(state, STATE_DB)
+    print(f"  💾 Saved {display_path(STATE_DB)}")
+
+
+def save_history(state: dict):
+    """Append this sync to the compressed snapshot history."""
+    result = record_snapshot(state, HISTORY_DB)
+    if result["snap_id"] is not None:
+        print(f"  🗄️  Archived snapshot #{result['snap_id']} in {display_path(HISTORY_DB)} "
+              f"({result['changed']} task version(s) stored)")
+
+
+def save_index(state: dict):
+    """Rebuild the sorter's related-task retrieval index (skipped without numpy)."""
+    import retrieval_index
+
+    if not retrieval_index.HAVE_NUMPY:
+        print("  ℹ️  numpy not installed — skipping the task index")
+        return
+    info = retrieval_index.build_index(retrieval_index.iter_state_tasks(state), TASK_INDEX_FILE)
+    print(f"  🔎 Saved {display_path(TASK_INDEX_FILE)} ({info['documents']} tasks, {info['terms']} terms)")
+
+
+def save_analytics():
+    """Write the throughput report from the store and history (skipped without numpy)."""
+    import project_analytics
+
+    if not project_analytics.HAVE_NUMPY:
+        print("  ℹ️  numpy not installed — skipping analytics")
+        return
+    compute_ms = project_analytics.write_report(STATE_DB, HISTORY_DB, ANALYTICS_FILE)
+    if compute_ms is not None:
+        print(f"  📊 Saved {display_path(ANALYTICS_FILE)} (metrics {compute_ms:.0f} ms)")
 
 
 # ── Main ──────────────────────────────────────────────────────────────────────
 
+def add_sync_arguments(parser: argparse.ArgumentParser):
+    """Register the fetch/store options shared by every entry point that syncs."""
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Fetch lists and pages concurrently with N workers (default: 1, serial)")
+    parser.add_argument("--rate-limit", type=int, default=CLICKUP_RATE_LIMIT_PER_MIN,
+                        help="Shared request budget per minute for concurrent fetching")
+    parser.add_argument("--engine", choices=("list", "team"), default="list",
+                        help="Fetch per list (default) or page through the whole space via "
+                             "the workspace filtered-tasks endpoint")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only fetch tasks updated since the last sync and merge them in")
+    parser.add_argument("--full", action="store_true",
+                        help="With --incremental, force a full resync this run")
+    parser.add_argument("--full-every", type=float, default=FULL_SYNC_EVERY_HOURS, metavar="HOURS",
+                        help=f"With --incremental, run a full resync when the last one is older "
+                             f"than this (default: {FULL_SYNC_EVERY_HOURS})")
+    parser.add_argument("--state-format", choices=STATE_FORMATS, default=DEFAULT_STATE_FORMAT,
+                        help="On-disk format for the state file (default: pretty JSON)")
+    parser.add_argument("--task-fields", default=",".join(DEFAULT_TASK_FIELDS),
+                        help="Comma-separated raw task fields to keep (default: the fields the "
+                             "summary, sorter and store read)")
+    parser.add_argument("--keep-raw", action="store_true",
+                        help="Keep full raw ClickUp task payloads (debugging)")
+    parser.add_argument("--no-json", action="store_true",
+                        help="Only write the SQLite store (export JSON later with state_db.py --export)")
+    parser.add_argument("--checkpoint-max-age", type=float, default=CHECKPOINT_MAX_AGE_MINUTES,
+                        metavar="MINUTES",
+                        help=f"Resume an interrupted sync from pages saved within this window "
+                             f"(default: {CHECKPOINT_MAX_AGE_MINUTES})")
+    parser.add_argument("--no-checkpoint", action="store_true",
+                        help="Don't save or reuse fetched pages")
+    parser.add_argument("--no-history", action="store_true",
+                        help="Don't archive this sync in the snapshot history")
+    parser.add_argument("--analytics", action="store_true",
+                        help="Also write the velocity / cycle time report (needs numpy)")
+
+
+def sync_state(args: argparse.Namespace) -> dict:
+    """Fetch (full or incremental) and save the store, state file and summary."""
+    global task_fields, checkpoint
+    task_fields = None if args.keep_raw else parse_fields(args.task_fields)
+
+    if not args.no_checkpoint:
+        scope = f"{SPACE_ID}:{','.join(task_fields) if task_fields else 'raw'}"
+        checkpoint = CheckpointStore(CHECKPOINT_DB, args.checkpoint_max_age * 60, scope)
+        pages, age = checkpoint.resumable()
+        if pages:
+            print(f"♻️  Resuming: {pages} page(s) checkpointed {age / 60:.0f} min ago")
+
+    try:
+        previous = load_previous_state() if args.incremental and not args.full else None
+        if previous and not needs_full_sync(previous, args.full_every):
+            state = build_incremental_state(previous, workers=args.workers, rate_per_min=args.rate_limit,
+                                            engine=args.engine)
+        else:
+            state = build_full_state(workers=args.workers, rate_per_min=args.rate_limit, engine=args.engine)
+        if checkpoint and checkpoint.hits:
+            print(f"  ♻️  {checkpoint.hits} page(s) served from the checkpoint")
+        with phase("save_db"):
+            save_db(state)
+        with phase("save_index"):
+            save_index(state)
+        if not args.no_history:
+            with phase("save_history"):
+                save_history(state)
+        if not args.no_json:
+            with phase("save_json"):
+                save_json(state, args.state_format)
+        with phase("save_summary"):
+            conn = open_state_db(STATE_DB)
+            save_summary(state, conn)
+            conn.close()
+        if args.analytics:
+            with phase("analytics"):
+                save_analytics()
+    except BaseException:
+        if checkpoint:
+            print(f"💾 Checkpoint kept ({checkpoint.resumable()[0]} page(s)) — rerun to resume")
+        raise
+    else:
+        if checkpoint:
+            checkpoint.clear()
+    finally:
+        if checkpoint:
+            checkpoint.close()
+            checkpoint = None
+    return state
+
+
 def main():
     parser = argparse.ArgumentParser(description="Sync ClickUp project state")
     parser.add_argument("--skip-sort", action="store_true",
                         help="Skip running inbox sort before syncing")
+    parser.add_argument("--prom-file", type=Path, default=None,
+                        help="Also write run metrics as a Prometheus textfile to this path")
+    add_sync_arguments(parser)
     args = parser.parse_args()
 
+    load_env()
     if not CLICKUP_API_KEY:
         print("❌ CLICKUP_API_KEY not found in .env")
         sys.exit(1)
 
+    start_run("sync")
+
     # Step 1: Run inbox sort (unless skipped)
     if not args.skip_sort:
+        print("📥 Running inbox sort first...\n")
         try:
-            sort_script = PROJECT_ROOT / "scripts" / "sort_inbox_tasks.py"
-            if sort_script.exists():
-                print("📥 Running inbox sort first...\n")
-                # Import and run the sort module
-                sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
-                from sort_inbox_tasks import run_sort
+            from sort_inbox_tasks import run_sort
+            with phase("run_sort"):
                 run_sort()
-                print()
-            else:
-                print("ℹ️  sort_inbox_tasks.py not found, skipping inbox sort.\n")
-        except ImportError:
-            print("ℹ️  sort_inbox_tasks module not available, skipping.\n")
+            print()
         except Exception as e:
             print(f"⚠️  Inbox sort failed: {e}\n")
 
     # Step 2: Fetch and save state
-    state = build_full_state()
-    save_json(state)
-    save_summary(state)
+    try:
+        state = sync_state(args)
+    finally:
+        finish_run(LOGS_DIR, args.prom_file)
 
     print(f"\n✅ Sync complete at {state['synced_at']}")
 
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Sync & Sort Run Metrics
+
+Collects per-run instrumentation for sync_clickup_state.py and
+sort_inbox_tasks.py:
+  - request count, latency histogram and bytes per endpoint
+  - 429 responses and total backoff seconds
+  - pages fetched per list
+  - wall time per phase (fetch, build, save_json, save_summary, run_sort, ...)
+
+A run is started with start_run(); while it is active the ClickUp client
+records every call into it and phase() blocks time themselves. At the end
+finish_run() appends a JSON record to logs/sync-metrics.jsonl, optionally
+writes a Prometheus textfile, and prints a timing table.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus-style
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Path segments that are ClickUp ids (numeric, or short alphanumerics with digits)
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[0-9a-z]{6,}$")
+_LIST_TASKS = re.compile(r"^/list/([^/]+)/task$")
+
+
+def endpoint_template(method: str, path: str) -> str:
+    """Collapse ids in a request path: GET /list/901710848941/task → GET /list/{id}/task."""
+    parts = [("{id}" if _ID_SEGMENT.match(p) else p) for p in path.split("?")[0].split("/")]
+    return f"{method} {'/'.join(parts)}"
+
+
+class RunMetrics:
+    """Thread-safe metrics for one sync or sort run."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        self.endpoints: dict[str, dict] = {}
+        self.phases: dict[str, float] = {}
+        self.pages: dict[str, int] = {}
+        self.rate_limited = 0
+        self.backoff_seconds = 0.0
+
+    def record_call(self, method: str, path: str, status: int, seconds: float, nbytes: int):
+        """Record one HTTP attempt (including ones answered with 429)."""
+        key = endpoint_template(method, path)
+        with self.lock:
+            ep = self.endpoints.setdefault(key, {
+                "requests": 0,
+                "errors": 0,
+                "bytes": 0,
+                "seconds": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+            })
+            ep["requests"] += 1
+            ep["bytes"] += nbytes
+            ep["seconds"] += seconds
+            if status >= 400:
+                ep["errors"] += 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    ep["buckets"][i] += 1
+                    break
+            else:
+                ep["buckets"][-1] += 1
+            if status == 429:
+                self.rate_limited += 1
+            match = _LIST_TASKS.match(path)
+            if match and method == "GET" and status == 200:
+                self.pages[match.group(1)] = self.pages.get(match.group(1), 0) + 1
+
+    def record_backoff(self, seconds: float):
+        """Record time spent sleeping because of rate limiting."""
+        with self.lock:
+            self.backoff_seconds += seconds
+
+    def add_phase(self, name: str, seconds: float):
+        with self.lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def to_record(self) -> dict:
+        """JSON-serializable snapshot of the run."""
+        with self.lock:
+            return {
+                "run": self.name,
+                "started_at": self.started_at,
+                "wall_seconds": round(time.perf_counter() - self.start, 3),
+                "phases": {k: round(v, 3) for k, v in self.phases.items()},
+                "requests": sum(ep["requests"] for ep in self.endpoints.values()),
+                "rate_limited": self.rate_limited,
+                "backoff_seconds": round(self.backoff_seconds, 3),
+                "bytes_received": sum(ep["bytes"] for ep in self.endpoints.values()),
+                "pages_per_list": dict(self.pages),
+                "endpoints": {
+                    key: {
+                        "requests": ep["requests"],
+                        "errors": ep["errors"],
+                        "bytes": ep["bytes"],
+                        "mean_ms": round(ep["seconds"] / ep["requests"] * 1000, 1),
+                        "latency_buckets": dict(zip(
+                            [str(b) for b in LATENCY_BUCKETS] + ["+Inf"], ep["buckets"],
+                        )),
+                    }
+                    for key, ep in self.endpoints.items()
+                },
+            }
+
+    def write_json(self, logs_dir: Path) -> Path:
+        """Append this run's record to logs/sync-metrics.jsonl."""
+        logs_dir.mkdir(parents=True, exist_ok=True)
+        path = logs_dir / "sync-metrics.jsonl"
+        with open(path, "a") as f:
+            f.write(json.dumps(self.to_record()) + "\n")
+        return path
+
+    def write_prometheus(self, path: Path):
+        """Write a node_exporter textfile-collector file (atomically)."""
+        rec = self.to_record()
+        run = rec["run"]
+        lines = [
+            "# HELP clickup_run_wall_seconds Wall time of the last run.",
+            "# TYPE clickup_run_wall_seconds gauge",
+            f'clickup_run_wall_seconds{{run="{run}"}} {rec["wall_seconds"]}',
+            "# HELP clickup_run_phase_seconds Wall time per phase of the last run.",
+            "# TYPE clickup_run_phase_seconds gauge",
+        ]
+        lines += [f'clickup_run_phase_seconds{{run="{run}",phase="{k}"}} {v}' for k, v in rec["phases"].items()]
+        lines += [
+            "# HELP clickup_run_rate_limited_total 429 responses in the last run.",
+            "# TYPE clickup_run_rate_limited_total gauge",
+            f'clickup_run_rate_limited_total{{run="{run}"}} {rec["rate_limited"]}',
+            "# HELP clickup_run_backoff_seconds Seconds slept on rate limits in the last run.",
+            "# TYPE clickup_run_backoff_seconds gauge",
+            f'clickup_run_backoff_seconds{{run="{run}"}} {rec["backoff_seconds"]}',
+            "# HELP clickup_request_duration_seconds Request latency per endpoint in the last run.",
+            "# TYPE clickup_request_duration_seconds histogram",
+        ]
+        with self.lock:
+            for key, ep in self.endpoints.items():
+                labels = f'run="{run}",endpoint="{key}"'
+                cumulative = 0
+                for bound, count in zip(list(LATENCY_BUCKETS) + ["+Inf"], ep["buckets"]):
+                    cumulative += count
+                    lines.append(f'clickup_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"clickup_request_duration_seconds_sum{{{labels}}} {ep['seconds']:.6f}")
+                lines.append(f"clickup_request_duration_seconds_count{{{labels}}} {ep['requests']}")
+                lines.append(f"clickup_response_bytes{{{labels}}} {ep['bytes']}")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_name, path)
+
+    def print_table(self):
+        """Short console timing table."""
+        rec = self.to_record()
+        print(f"\n⏱️  {rec['run']} timing ({rec['wall_seconds']:.2f}s total)")
+        for name, seconds in rec["phases"].items():
+            print(f"  {name:<14} {seconds:>8.2f}s")
+        if rec["endpoints"]:
+            print(f"  {'endpoint':<34} {'reqs':>5} {'mean':>8} {'KB':>8}")
+            for key, ep in sorted(rec["endpoints"].items(), key=lambda kv: -kv[1]["requests"]):
+                print(f"  {key:<34} {ep['requests']:>5} {ep['mean_ms']:>6.0f}ms {ep['bytes'] / 1024:>8.0f}")
+        if rec["rate_limited"]:
+            print(f"  ⏳ {rec['rate_limited']} rate-limited response(s), {rec['backoff_seconds']:.1f}s backoff")
+
+
+# ── Active run ────────────────────────────────────────────────────────────────
+
+_active: RunMetrics | None = None
+
+
+def start_run(name: str) -> RunMetrics:
+    """Start collecting metrics; nested calls keep the outer run."""
+    global _active
+    if _active is None:
+        _active = RunMetrics(name)
+    return _active
+
+
+def active() -> RunMetrics | None:
+    """The run currently collecting metrics, if any."""
+    return _active
+
+
+def finish_run(logs_dir: Path, prom_file: Path | None = None) -> dict | None:
+    """Emit the active run's metrics (JSON log, optional textfile, table) and clear it."""
+    global _active
+    run, _active = _active, None
+    if run is None:
+        return None
+    path = run.write_json(logs_dir)
+    if prom_file:
+        run.write_prometheus(prom_file)
+    run.print_table()
+    print(f"  📈 Metrics: {path}")
+    return run.to_record()
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block as a named phase of the active run (no-op without one)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if _active is not None:
+            _active.add_phase(name, time.perf_counter() - start)
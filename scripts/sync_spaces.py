@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Multi-Space Sync Orchestrator
+
+Runs the inbox sort + state sync pipeline for every space listed in a JSON
+config, one worker process per space, several at a time:
+  - each space gets its own output directory (state file, SQLite store,
+    summary, checkpoint) and logs directory (run log, metrics)
+  - spaces sharing an API token draw from that token's cross-process
+    budget (rate_budget.py), so concurrent workers — and a sort or update
+    script started by hand meanwhile — never exceed ClickUp's per-token
+    rate limit, while a space with more work isn't held to a fixed share
+  - per-space timing and request counts are aggregated into one table
+
+Wall time is bounded by each token's total work and the number of
+processes, not by the number of spaces.
+
+Config (see scripts/clickup-spaces.example.json):
+  processes   worker processes (default: CPU count)
+  tokens      name → {"env": VAR holding the API key, "rate_limit": req/min}
+  defaults    options merged into every space (e.g. "sync": {"workers": 4})
+  spaces      name, token, workspace_id, space_id, optional space_name,
+              docs_dir / logs_dir (default docs/spaces/<name>, logs/spaces/<name>),
+              sync (sync_clickup_state.py flags), sort + to_sort_list_id
+              (+ lists {name: {"id", "description"}} and default_list for
+              spaces other than BenefitGuard)
+
+Usage:
+  python3 scripts/sync_spaces.py [--config clickup-spaces.json] [--only NAME ...] [--processes N]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# ── Config ────────────────────────────────────────────────────────────────────
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+load_dotenv(PROJECT_ROOT / ".env")
+
+DEFAULT_CONFIG = PROJECT_ROOT / "clickup-spaces.json"
+LOGS_DIR = PROJECT_ROOT / "logs"
+DEFAULT_TOKEN_RATE_LIMIT = 100
+
+# The space the sort module's built-in LIST_MAP describes
+BUILTIN_SORT_SPACE_ID = "90174101415"
+
+
+class ConfigError(ValueError):
+    pass
+
+
+def merge(defaults: dict, overrides: dict) -> dict:
+    """Merge one level deep: nested dicts (e.g. "sync") are combined key by key."""
+    merged = dict(defaults)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+def resolve_dir(value: str | None, fallback: Path) -> str:
+    path = Path(value) if value else fallback
+    return str(path if path.is_absolute() else PROJECT_ROOT / path)
+
+
+def load_config(path: Path, only: list[str] | None = None) -> tuple[dict, list[dict]]:
+    """Read and validate the config; returns (config, resolved space jobs)."""
+    try:
+        config = json.loads(path.read_text())
+    except FileNotFoundError:
+        raise ConfigError(f"{path} not found — copy scripts/clickup-spaces.example.json")
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"{path}: {e}")
+
+    tokens = config.get("tokens") or {"default": {"env": "CLICKUP_API_KEY"}}
+    spaces = [merge(config.get("defaults", {}), s) for s in config.get("spaces", [])]
+    if only:
+        spaces = [s for s in spaces if s.get("name") in only]
+    if not spaces:
+        raise ConfigError("no spaces to sync")
+
+    names = [s.get("name") for s in spaces]
+    if len(set(names)) != len(names):
+        raise ConfigError("space names must be unique")
+
+    jobs = []
+    for space in spaces:
+        name = space.get("name")
+        missing = [k for k in ("name", "workspace_id", "space_id") if not space.get(k)]
+        if missing:
+            raise ConfigError(f"space {name or '?'}: missing {', '.join(missing)}")
+        token_name = space.get("token", next(iter(tokens)))
+        token = tokens.get(token_name)
+        if token is None:
+            raise ConfigError(f"space {name}: unknown token {token_name!r}")
+        if space.get("sort"):
+            if not space.get("to_sort_list_id"):
+                raise ConfigError(f"space {name}: sort needs to_sort_list_id")
+            if space["space_id"] != BUILTIN_SORT_SPACE_ID and not space.get("lists"):
+                raise ConfigError(f"space {name}: sort needs a lists map for this space")
+
+        jobs.append({
+            "name": name,
+            "token": token_name,
+            "token_env": token.get("env", "CLICKUP_API_KEY"),
+            "workspace_id": str(space["workspace_id"]),
+            "space_id": str(space["space_id"]),
+            "space_name": space.get("space_name", name),
+            "docs_dir": resolve_dir(space.get("docs_dir"), Path("docs") / "spaces" / name),
+            "logs_dir": resolve_dir(space.get("logs_dir"), Path("logs") / "spaces" / name),
+            "sync": space.get("sync", {}),
+            "sort": bool(space.get("sort")),
+            "to_sort_list_id": space.get("to_sort_list_id"),
+            "lists": space.get("lists"),
+            "default_list": space.get("default_list"),
+        })
+    return config, jobs
+
+
+def assign_budgets(jobs: list[dict], tokens: dict):
+    """Give each job its token's whole per-minute budget; the shared bucket divides it at run time."""
+    for job in jobs:
+        job["rate_limit"] = (tokens.get(job["token"]) or {}).get("rate_limit", DEFAULT_TOKEN_RATE_LIMIT)
+
+
+# ── Worker ────────────────────────────────────────────────────────────────────
+
+def sync_argv(options: dict) -> list[str]:
+    """Turn a config "sync" dict into sync_clickup_state.py flags."""
+    argv = []
+    for key, value in options.items():
+        flag = "--" + key.replace("_", "-")
+        if value is True:
+            argv.append(flag)
+        elif value not in (False, None):
+            argv += [flag, str(value)]
+    return argv
+
+
+def run_space(job: dict) -> dict:
+    """Run one space's pipeline in this (fresh, spawned) process."""
+    start = time.perf_counter()
+    logs_dir = Path(job["logs_dir"])
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    log_path = logs_dir / "sync.log"
+
+    # The sync and sort modules read these at import time
+    os.environ.update({
+        "CLICKUP_API_KEY": os.getenv(job["token_env"], ""),
+        "CLICKUP_WORKSPACE_ID": job["workspace_id"],
+        "CLICKUP_SPACE_ID": job["space_id"],
+        "CLICKUP_SPACE_NAME": job["space_name"],
+        "CLICKUP_DOCS_DIR": job["docs_dir"],
+        "CLICKUP_LOGS_DIR": job["logs_dir"],
+        "CLICKUP_TOKEN_RATE_LIMIT": str(job["rate_limit"]),
+    })
+    if job["to_sort_list_id"]:
+        os.environ["CLICKUP_TO_SORT_LIST_ID"] = job["to_sort_list_id"]
+
+    result = {"name": job["name"], "ok": False, "error": None, "log": str(log_path)}
+    with open(log_path, "a") as log:
+        sys.stdout = sys.stderr = log
+        print(f"\n=== {datetime.now(timezone.utc).isoformat()} {job['name']} ===")
+        try:
+            from sync_metrics import finish_run, phase, start_run
+            import sync_clickup_state as sync
+
+            if not sync.CLICKUP_API_KEY:
+                raise RuntimeError(f"{job['token_env']} is not set")
+
+            parser = argparse.ArgumentParser()
+            sync.add_sync_arguments(parser)
+            args = parser.parse_args(sync_argv(job["sync"]) + ["--rate-limit", str(job["rate_limit"])])
+
+            # Every call made with this token draws from its shared cross-process bucket
+            sync.get_client().resize_pool(max(1, args.workers))
+
+            start_run(f"sync:{job['name']}")
+            try:
+                if job["sort"]:
+                    import sort_inbox_tasks as sort
+                    if job["lists"]:
+                        sort.LIST_MAP = {n: v["id"] for n, v in job["lists"].items()}
+                        sort.LIST_DESCRIPTIONS = {n: v.get("description", "") for n, v in job["lists"].items()}
+                        sort.DEFAULT_LIST = job["default_list"] or next(iter(job["lists"]))
+                    with phase("run_sort"):
+                        sort.run_sort()
+                state = sync.sync_state(args)
+            finally:
+                record = finish_run(logs_dir)
+            result.update(ok=True, stats=state["stats"], metrics=record)
+        except BaseException as e:
+            print(f"❌ {type(e).__name__}: {e}")
+            result["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+    result["wall_seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+# ── Main ──────────────────────────────────────────────────────────────────────
+
+def print_results(results: list[dict], wall: float):
+    print(f"\n{'space':<24} {'result':<7} {'wall':>8} {'reqs':>6} {'429':>4} {'tasks':>7}  log / error")
+    for r in sorted(results, key=lambda r: r["name"]):
+        metrics = r.get("metrics") or {}
+        stats = r.get("stats") or {}
+        tasks = stats.get("total_tasks", 0) + stats.get("total_subtasks", 0)
+        detail = r["error"] or r["log"]
+        print(f"{r['name']:<24} {'ok' if r['ok'] else 'FAILED':<7} {r['wall_seconds']:>7.1f}s "
+              f"{metrics.get('requests', 0):>6} {metrics.get('rate_limited', 0):>4} {tasks:>7}  {detail}")
+    serial = sum(r["wall_seconds"] for r in results)
+    print(f"\n⏱️  {wall:.1f}s wall for {serial:.1f}s of space syncs ({serial / wall if wall else 0:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync several ClickUp spaces in parallel worker processes")
+    parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG,
+                        help=f"Spaces config (default: {DEFAULT_CONFIG.name} in the project root)")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="Only sync these spaces")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Worker processes (default: config 'processes' or CPU count)")
+    args = parser.parse_args()
+
+    try:
+        config, jobs = load_config(args.config, args.only)
+    except ConfigError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    processes = max(1, min(len(jobs), args.processes or config.get("processes") or os.cpu_count() or 1))
+    assign_budgets(jobs, config.get("tokens") or {})
+
+    print(f"🚀 Syncing {len(jobs)} space(s) with {processes} process(es)")
+    for job in jobs:
+        print(f"  • {job['name']}: space {job['space_id']} via {job['token']} "
+              f"(shared {job['rate_limit']} req/min) → {Path(job['docs_dir'])}")
+
+    start = time.perf_counter()
+    results = []
+    # spawn + one task per child: every space imports the sync modules fresh with its own env
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=ctx, max_tasks_per_child=1) as pool:
+        futures = {pool.submit(run_space, job): job["name"] for job in jobs}
+        for fut in as_completed(futures):
+            result = fut.result()
+            results.append(result)
+            icon = "✅" if result["ok"] else "❌"
+            print(f"  {icon} {result['name']} ({result['wall_seconds']:.1f}s)", flush=True)
+    wall = time.perf_counter() - start
+
+    print_results(results, wall)
+
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LOGS_DIR / "sync-spaces.jsonl", "a") as f:
+        f.write(json.dumps({
+            "run_at": datetime.now(timezone.utc).isoformat(),
+            "wall_seconds": round(wall, 3),
+            "processes": processes,
+            "spaces": results,
+        }, default=str) + "\n")
+
+    if not all(r["ok"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
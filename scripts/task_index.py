@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — In-Memory Task Index
+
+Every synced task and subtask keyed by id and by lower-cased name, with the
+list, folder, parent and status the sorter needs to file a brain dump as a
+subtask. Loaded once per sort run from the SQLite store (or the state file
+when the store is missing), so resolving a parent, the list it lives in and
+ClickUp's no-sub-subtasks rule takes no API calls.
+
+Usage:
+  python3 scripts/task_index.py "Rate limiting and abuse prevention"
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class TaskEntry:
+    task_id: str
+    name: str
+    list_id: str
+    list_name: str | None
+    folder_name: str | None
+    parent: str | None
+    status: str | None
+
+    @property
+    def is_subtask(self) -> bool:
+        return self.parent is not None
+
+
+STORE_QUERY = """
+SELECT t.task_id, t.name, t.list_id, l.list_name, l.folder_name, t.parent, t.status, t.seq
+FROM (SELECT task_id, name, list_id, parent, status, seq FROM tasks
+      UNION ALL SELECT task_id, name, list_id, parent, status, seq FROM subtasks) t
+LEFT JOIN lists l ON l.list_id = t.list_id
+ORDER BY t.seq
+"""
+
+
+class TaskIndex:
+    """Task id / name → TaskEntry for one sort run."""
+
+    def __init__(self, entries=()):
+        self.by_id: dict[str, TaskEntry] = {}
+        self.by_name: dict[str, str] = {}
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def from_store(cls, conn) -> "TaskIndex":
+        """One query over tasks and subtasks in state order."""
+        return cls(TaskEntry(*row[:7]) for row in conn.execute(STORE_QUERY))
+
+    @classmethod
+    def from_state(cls, state: dict | None) -> "TaskIndex":
+        """Walk a state dict (lists → tasks → _subtasks)."""
+        def entries():
+            for lst in (state or {}).get("lists", []):
+                where = (lst.get("list_id", ""), lst.get("list_name"), lst.get("folder_name"))
+                for task in lst.get("tasks", []):
+                    yield TaskEntry(task["id"], task.get("name", ""), *where, None,
+                                    (task.get("status") or {}).get("status"))
+                    for sub in task.get("_subtasks", []):
+                        yield TaskEntry(sub["id"], sub.get("name", ""), *where, task["id"],
+                                        (sub.get("status") or {}).get("status"))
+        return cls(entries())
+
+    def add(self, entry: TaskEntry):
+        """Index one task; for duplicate names the last one added wins."""
+        self.by_id[entry.task_id] = entry
+        key = (entry.name or "").strip().lower()
+        if key:
+            self.by_name[key] = entry.task_id
+
+    def discard(self, task_id: str):
+        """Forget a task deleted in ClickUp, and its subtasks (deleted along with it)."""
+        gone = {task_id} | {e.task_id for e in self.by_id.values() if e.parent == task_id}
+        for tid in gone:
+            entry = self.by_id.pop(tid, None)
+            key = (entry.name or "").strip().lower() if entry else ""
+            if self.by_name.get(key) == tid:
+                del self.by_name[key]
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.by_id
+
+    def entry(self, task_id: str) -> TaskEntry | None:
+        return self.by_id.get(task_id)
+
+    def find(self, name: str) -> TaskEntry | None:
+        """Exact (case-insensitive) name lookup."""
+        task_id = self.by_name.get((name or "").strip().lower())
+        return self.by_id[task_id] if task_id else None
+
+    def names(self) -> list[tuple[str, str]]:
+        """(name, task_id) of every task and subtask, for the fuzzy name matcher."""
+        return [(e.name, e.task_id) for e in self.by_id.values()]
+
+    def top_level_names(self) -> list[str]:
+        return [e.name for e in self.by_id.values() if e.parent is None]
+
+    def parent_for(self, task_id: str) -> TaskEntry | None:
+        """The task a new subtask of ``task_id`` should hang off.
+
+        ClickUp forbids sub-subtasks, so a subtask hands over to its own
+        top-level parent. None if the task (or that parent) isn't indexed.
+        """
+        entry = self.by_id.get(task_id)
+        while entry is not None and entry.parent is not None:
+            entry = self.by_id.get(entry.parent)
+        return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up a task by name in the synced store")
+    parser.add_argument("name")
+    args = parser.parse_args()
+
+    from state_db import STATE_DB, open_state_db
+
+    conn = open_state_db(STATE_DB)
+    if conn is None:
+        print(f"❌ {STATE_DB} not found — run sync_clickup_state.py first")
+        sys.exit(1)
+    start = time.perf_counter()
+    index = TaskIndex.from_store(conn)
+    built = time.perf_counter()
+    entry = index.find(args.name)
+    if entry is None:
+        print(f"❌ No task named {args.name!r}")
+    else:
+        parent = index.parent_for(entry.task_id)
+        print(f"✅ {entry.name!r} ({entry.task_id}) — {entry.status}")
+        print(f"   List: {entry.list_name} ({entry.list_id}), folder: {entry.folder_name or '–'}")
+        if entry.is_subtask:
+            print(f"   Subtask of {parent.name if parent else entry.parent!r}; new subtasks go there instead")
+    print(f"\nIndexed {len(index)} tasks in {(built - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+BenefitGuard — Slim ClickUp Task Model
+
+ClickUp task payloads carry custom fields, assignees, watchers, checklists,
+descriptions and more, but the summary, sorter and store only read about a
+dozen fields. project_task() keeps a configurable subset and shares one
+interned object per distinct status / priority / list value, so a synced
+space holds a fraction of the memory and writes a much smaller state file.
+
+Projected tasks stay plain dicts with the raw payload's keys. Nested values
+keep their shape, trimmed to the keys the readers use, except ``tags``: it
+becomes a list of tag names instead of {"name", "tag_fg", ...} objects.
+Readers that touch tags (e.g. move_task_to_list) accept both forms.
+"""
+
+import sys
+
+DEFAULT_TASK_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "status",
+    "priority",
+    "parent",
+    "list",
+    "folder",
+    "start_date",
+    "due_date",
+    "time_estimate",
+    "time_spent",
+    "date_created",
+    "date_updated",
+    "date_closed",
+    "date_done",
+    "tags",
+    "url",
+)
+
+# Flyweights: identical status/priority/list/folder values share one dict
+_shared: dict[tuple, dict] = {}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _flyweight(kind: str, value: dict, keys: tuple[str, ...]) -> dict:
+    slim = {k: _intern(value[k]) for k in keys if k in value}
+    key = (kind, *slim.items())
+    return _shared.setdefault(key, slim)
+
+
+def _project_value(field: str, value):
+    if field == "status" and isinstance(value, dict):
+        return _flyweight("status", value, ("status", "type"))
+    if field == "priority" and isinstance(value, dict):
+        return _flyweight("priority", value, ("id", "priority"))
+    if field in ("list", "folder") and isinstance(value, dict):
+        return _flyweight(field, value, ("id", "name"))
+    if field == "tags" and isinstance(value, list):
+        return [_intern(t["name"]) if isinstance(t, dict) else _intern(t) for t in value]
+    return value
+
+
+def project_task(raw: dict, fields: tuple[str, ...] = DEFAULT_TASK_FIELDS) -> dict:
+    """Return a slim copy of a raw ClickUp task holding only ``fields``."""
+    return {f: _project_value(f, raw[f]) for f in fields if f in raw}
+
+
+def project_tasks(raw_tasks: list[dict], fields: tuple[str, ...] | None = DEFAULT_TASK_FIELDS) -> list[dict]:
+    """Project a page of raw tasks; ``fields=None`` keeps raw payloads (debugging)."""
+    if fields is None:
+        return raw_tasks
+    return [project_task(t, fields) for t in raw_tasks]
+
+
+def parse_fields(spec: str) -> tuple[str, ...]:
+    """Parse a comma-separated field list; "id", "name" and "parent" are always kept."""
+    fields = [f.strip() for f in spec.split(",") if f.strip()]
+    for required in ("parent", "name", "id"):
+        if required not in fields:
+            fields.insert(0, required)
+    return tuple(fields)